@@ -1,14 +1,11 @@
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Optional
 
-from propan.brokers.model import BrokerUsecase
-from propan.brokers.model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model import BrokerUsecase
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.codecs import BaseCodec
 from propan.types import HandlerWrapper, SendableMessage
 
 
-T = TypeVar("T")
-
-
 class MyBroker(BrokerUsecase):
     async def _connect(self, *args: Any, **kwargs: Any) -> Any:
         pass
@@ -25,11 +22,12 @@ class MyBroker(BrokerUsecase):
     async def _parse_message(self, message: Any) -> PropanMessage:
         pass
 
-    async def _process_message(
+    async def _send_reply(
         self,
-        func: Callable[[PropanMessage], T],
-        watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]:
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
         pass
 
     async def publish(
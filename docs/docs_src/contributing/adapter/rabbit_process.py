@@ -1,40 +1,40 @@
-from functools import wraps
-from typing import Optional, TypeVar, Callable
+from typing import AsyncContextManager, Optional
 
-from propan.brokers.model import BrokerUsecase
-from propan.brokers.model.schemas import PropanMessage
+from propan.brokers._model import BrokerUsecase
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.codecs import BaseCodec
 from propan.brokers.push_back_watcher import BaseWatcher, WatcherContext
+from propan.types import SendableMessage
 
-T = TypeVar("T")
 
 class RabbitBroker(BrokerUsecase):
     ...
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher]
-    ) -> Callable[[PropanMessage], T]:
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            pika_message = message.raw_message
-            if watcher is None:
-                context = pika_message.process()
-            else:
-                context = WatcherContext(
-                    watcher,
-                    message.message_id,
-                    on_success=pika_message.ack,
-                    on_error=pika_message.nack,
-                    on_max=pika_message.reject,
-                )
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]:
+        pika_message = message.raw_message
+        if watcher is None:
+            return pika_message.process()
+        else:
+            return WatcherContext(
+                watcher,
+                message.message_id,
+                on_success=pika_message.ack,
+                on_error=pika_message.nack,
+                on_max=pika_message.reject,
+            )
 
-            async with context:
-                r = await func(message)
-                if message.reply_to:
-                    await self.publish(
-                        message=r,
-                        routing_key=message.reply_to,
-                        correlation_id=pika_message.correlation_id,
-                    )
-
-                return r
-
-        return wrapper
\ No newline at end of file
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(
+            message=result,
+            routing_key=message.reply_to,
+            correlation_id=message.raw_message.correlation_id,
+            codec=codec,
+        )
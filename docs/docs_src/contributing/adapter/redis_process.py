@@ -1,24 +1,17 @@
-from functools import wraps
-from typing import Optional, TypeVar, Callable
+from typing import Optional
 
-from propan.brokers.model import BrokerUsecase
-from propan.brokers.model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model import BrokerUsecase
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.codecs import BaseCodec
+from propan.types import SendableMessage
 
-T = TypeVar("T")
 
 class RedisProcess(BrokerUsecase):
     ...
-    def _process_message(
-            self,
-            func: Callable[[PropanMessage], T],
-            watcher: Optional[BaseWatcher],
-        ) -> Callable[[PropanMessage], T]:
-            @wraps(func)
-            async def wrapper(message: PropanMessage) -> T:
-                r = await func(message)
-                if message.reply_to:
-                    await self.publish(r or "", message.reply_to)
-                return r
-
-            return wrapper
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(result or "", message.reply_to, codec=codec)
@@ -1,4 +1,4 @@
 from propan.brokers._model.broker_usecase import BrokerUsecase
-from propan.brokers._model.schemas import ContentTypes, Queue
+from propan.brokers._model.schemas import ContentTypes, PublishResult, Queue
 
-__all__ = ("Queue", "BrokerUsecase", "ContentTypes")
+__all__ = ("Queue", "BrokerUsecase", "ContentTypes", "PublishResult")
@@ -1,42 +1,61 @@
-import json
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from functools import wraps
+from contextvars import ContextVar
+from functools import partial, wraps
+from time import perf_counter
 from typing import (
     Any,
+    AsyncContextManager,
     Awaitable,
     Callable,
     Dict,
+    Hashable,
     List,
     Mapping,
     Optional,
     Sequence,
     Tuple,
-    TypeVar,
     Union,
 )
 
 from fast_depends.construct import get_dependant
 from fast_depends.model import Dependant
-from fast_depends.utils import args_to_kwargs
-from pydantic.fields import ModelField
+from fast_depends.utils import args_to_kwargs, is_coroutine_callable
 from typing_extensions import Self
 
 from propan.brokers._model.schemas import (
     ContentType,
-    ContentTypes,
     PropanMessage,
+    PublishResult,
     SendableModel,
 )
 from propan.brokers._model.utils import (
+    FakeContext,
+    batch_context,
     change_logger_handlers,
+    get_batch_headers,
     get_watcher,
-    set_message_context,
-    suppress_decor,
 )
+from propan.brokers.codecs import BaseCodec, CodecType, default_codecs
+from propan.brokers.dead_letter import (
+    DeadLetterForwarder,
+    RateLimiter,
+    get_content_type,
+    strip_dead_letter_headers,
+)
+from propan.brokers.dedup import Dedup
 from propan.brokers.exceptions import SkipMessage
-from propan.brokers.push_back_watcher import BaseWatcher
-from propan.log import access_logger
+from propan.brokers.metrics import HandlerMetrics, Metrics
+from propan.brokers.profiler import HandlerProfile, Profiler
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    BaseWatcherStore,
+    RetryPolicy,
+)
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling, access_logger, use_async_logging
+from propan.log.formatter import add_log_context_filter
 from propan.types import (
     AnyCallable,
     AnyDict,
@@ -44,12 +63,15 @@ from propan.types import (
     DecoratedAsync,
     HandlerWrapper,
     SendableMessage,
-    Wrapper,
 )
-from propan.utils import apply_types, context
-from propan.utils.functions import get_function_arguments, to_async
+from propan.utils import context
+from propan.utils.functions import get_function_arguments, maybe_await, to_async
+from propan.utils.injector import compile_apply_types
 
-T = TypeVar("T")
+# RPC replies go to per request (or per client) destinations, so their publish
+# metrics are collected under the single label value to keep the series bounded
+REPLY_DESTINATION = "reply"
+_replying: ContextVar[bool] = ContextVar("replying", default=False)
 
 
 class BrokerUsecase(ABC):
@@ -58,22 +80,46 @@ class BrokerUsecase(ABC):
     handlers: List[Any]
     _connection: Any
     _fmt: Optional[str]
+    # `message_id` is the same for the message redeliveries
+    _stable_message_id: bool = True
 
     def __init__(
         self,
         *args: Any,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = "%(asctime)s %(levelname)s - %(message)s",
+        async_logging: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
         **kwargs: Any,
     ) -> None:
         self.logger = logger
+        if logger is not None:
+            add_log_context_filter(logger)
         self.log_level = log_level
         self._fmt = log_fmt
+        self._async_logging = async_logging
+
+        self.codecs = default_codecs.copy()
+        for c in codecs:
+            self.codecs.register(c)
+        self.codec = self._get_codec(codec)
+
+        self.metrics = metrics
+        self._instrument_publish()
+        self.profiler = profiler
+        self.watcher_store = watcher_store
+        self._dead_letters: Optional[DeadLetterForwarder] = None
 
         self._connection = None
         self._is_apply_types = apply_types
+        self._skip_raw_validation = skip_raw_validation
         self.handlers = []
 
         self._connection_args = args
@@ -112,6 +158,137 @@ class BrokerUsecase(ABC):
     ) -> Optional[DecodedMessage]:
         raise NotImplementedError()
 
+    async def publish_batch(
+        self,
+        messages: Sequence[SendableMessage],
+        *args: Any,
+        message_headers: Optional[Sequence[AnyDict]] = None,
+        **kwargs: Any,
+    ) -> List[PublishResult]:
+        """Publishes the messages concurrently
+
+        `message_headers` are the headers of each message updating the shared
+        `headers`. Brokers override it to use the transport native bulk methods.
+        """
+        if message_headers is None:
+            publishes = (self.publish(m, *args, **kwargs) for m in messages)
+        else:
+            publishes = (
+                self.publish(
+                    m,
+                    *args,
+                    **{
+                        **kwargs,
+                        "headers": get_batch_headers(
+                            kwargs.get("headers"), message_headers, i
+                        ),
+                    },
+                )
+                for i, m in enumerate(messages)
+            )
+
+        results = await asyncio.gather(*publishes, return_exceptions=True)
+        return [PublishResult.from_result(m, r) for m, r in zip(messages, results)]
+
+    def _instrument_publish(self) -> None:
+        """Wraps the publish methods to collect metrics if they are enabled"""
+        metrics = self.metrics
+        if metrics is None:
+            return
+
+        get_labels = self._get_publish_log_context
+        reply_labels = dict.fromkeys(get_labels(), REPLY_DESTINATION)
+        publish = self.publish
+
+        @wraps(publish)
+        async def publish_wrapper(
+            message: SendableMessage = "", *args: Any, **kwargs: Any
+        ) -> Any:
+            if _replying.get():
+                m = metrics.publisher(**reply_labels)
+            else:
+                m = metrics.publisher(**get_labels(*args, **kwargs))
+            start = perf_counter()
+            try:
+                r = await publish(message, *args, **kwargs)
+            except Exception as e:
+                m.failed += 1
+                raise e
+            finally:
+                m.latency.observe(perf_counter() - start)
+            m.published += 1
+            return r
+
+        self.publish = publish_wrapper  # type: ignore
+
+        publish_batch = self.publish_batch
+        if getattr(publish_batch, "__func__", None) is BrokerUsecase.publish_batch:
+            # the default implementation is instrumented by `publish` already
+            return
+
+        @wraps(publish_batch)
+        async def publish_batch_wrapper(
+            messages: Sequence[SendableMessage], *args: Any, **kwargs: Any
+        ) -> List[PublishResult]:
+            m = metrics.publisher(**get_labels(*args, **kwargs))
+            start = perf_counter()
+            try:
+                results = await publish_batch(messages, *args, **kwargs)
+            except Exception as e:
+                m.failed += len(messages)
+                raise e
+            finally:
+                m.latency.observe(perf_counter() - start)
+
+            for r in results:
+                if r.ok:
+                    m.published += 1
+                else:
+                    m.failed += 1
+            return results
+
+        self.publish_batch = publish_batch_wrapper  # type: ignore
+
+    def _get_publish_log_context(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Publish destination labels by the `publish` arguments except message"""
+        return {}
+
+    def _get_handler_metrics(
+        self,
+        func: AnyCallable,
+        **broker_args: Any,
+    ) -> Optional[HandlerMetrics]:
+        if self.metrics is None:
+            return None
+        return self.metrics.handler(**self._get_handler_labels(func, **broker_args))
+
+    def _get_apply_types(
+        self,
+    ) -> Optional[Callable[[DecoratedAsync], DecoratedAsync]]:
+        if self._is_apply_types is False:
+            return None
+        return partial(
+            compile_apply_types, skip_raw_validation=self._skip_raw_validation
+        )
+
+    def _get_handler_profile(
+        self,
+        func: AnyCallable,
+        **broker_args: Any,
+    ) -> Optional[HandlerProfile]:
+        if self.profiler is None:
+            return None
+        return self.profiler.handler(**self._get_handler_labels(func, **broker_args))
+
+    def _get_handler_labels(
+        self,
+        func: AnyCallable,
+        **broker_args: Any,
+    ) -> Dict[str, Any]:
+        labels = self._get_log_context(None, **broker_args)
+        labels.pop("message_id", None)
+        return {"handler": func.__name__, **labels}
+
     @abstractmethod
     async def close(self) -> None:
         raise NotImplementedError()
@@ -120,14 +297,48 @@ class BrokerUsecase(ABC):
     async def _parse_message(self, message: Any) -> PropanMessage:
         raise NotImplementedError()
 
-    @abstractmethod
-    def _process_message(
+    def _get_watcher(
+        self,
+        retry: Union[bool, int, RetryPolicy],
+        **broker_args: Any,
+    ) -> Optional[BaseWatcher]:
+        return get_watcher(self.logger, retry, self.watcher_store)
+
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]:
+        return FakeContext()
+
+    def _get_batch_process_context(
         self,
-        func: Callable[[PropanMessage], T],
+        messages: Sequence[PropanMessage],
         watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]:
+    ) -> AsyncContextManager[None]:
+        return batch_context(self._get_process_context(m, watcher) for m in messages)
+
+    @abstractmethod
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
         raise NotImplementedError()
 
+    async def _reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        token = _replying.set(True)
+        try:
+            await self._send_reply(message, result, codec)
+        finally:
+            _replying.reset(token)
+
     def _get_log_context(
         self,
         message: Optional[PropanMessage],
@@ -137,30 +348,65 @@ class BrokerUsecase(ABC):
             "message_id": message.message_id[:10] if message else "",
         }
 
+    def _get_log_context_factory(
+        self,
+        **broker_args: Any,
+    ) -> Callable[[PropanMessage], Dict[str, Any]]:
+        """Builds the handler log context once to copy it for each message"""
+        template = self._get_log_context(None, **broker_args)
+
+        def get_log_context(message: PropanMessage) -> Dict[str, Any]:
+            log_context = template.copy()
+            log_context["message_id"] = message.message_id[:10]
+            return log_context
+
+        return get_log_context
+
     @abstractmethod
     def handle(
         self,
         *broker_args: Any,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
         _raw: bool = False,
         **broker_kwargs: Any,
     ) -> HandlerWrapper:
         raise NotImplementedError()
 
-    @staticmethod
-    async def _decode_message(message: PropanMessage) -> DecodedMessage:
-        body = message.body
-        m: DecodedMessage = body
-        if message.content_type is not None:
-            if ContentTypes.text.value in message.content_type:
-                m = body.decode()
-            elif ContentTypes.json.value in message.content_type:  # pragma: no branch
-                m = json.loads(body.decode())
-        return m
+    async def _decode_message(
+        self,
+        message: PropanMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> DecodedMessage:
+        return self._decode_body(message, codec)
+
+    def _decode_body(
+        self,
+        message: PropanMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> DecodedMessage:
+        if message.content_type:
+            codec = self.codecs.get(message.content_type)
+
+        if codec is None:
+            return message.body
+        return codec.decode(message.body)
 
     @staticmethod
-    def _encode_message(msg: SendableMessage) -> Tuple[bytes, Optional[ContentType]]:
-        return SendableModel.to_send(msg)
+    def _encode_message(
+        msg: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> Tuple[bytes, Optional[ContentType]]:
+        return SendableModel.to_send(msg, codec)
+
+    def _get_codec(self, codec: Optional[CodecType] = None) -> Optional[BaseCodec]:
+        """Resolves the codec by content type and registers it to decode messages"""
+        if codec is None:
+            return getattr(self, "codec", None)
+
+        c = self.codecs.resolve(codec)
+        if c is not None:
+            self.codecs.register(c)
+        return c
 
     @property
     def fmt(self) -> str:  # pragma: no cover
@@ -169,6 +415,8 @@ class BrokerUsecase(ABC):
     async def start(self) -> None:
         if self.logger is not None:
             change_logger_handlers(self.logger, self.fmt)
+            if self._async_logging is True:
+                use_async_logging(self.logger)
 
         await self.connect()
 
@@ -182,98 +430,465 @@ class BrokerUsecase(ABC):
     def _wrap_handler(
         self,
         func: AnyCallable,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
         _raw: bool = False,
+        batch: bool = False,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Any = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         **broker_args: Any,
     ) -> DecoratedAsync:
-        dependant: Dependant = get_dependant(path="", call=func)
+        """Compiles the whole message processing pipeline to a single coroutine
 
-        f = to_async(func)
+        Disabled stages (logging, retries, arguments unpacking, types casting)
+        are dropped at registration time, so the message pays only for the
+        stages it really uses.
+        """
+        dependant: Dependant = get_dependant(path="", call=func)
 
-        if self._is_apply_types is True:
+        f = func if is_coroutine_callable(func) else to_async(func)
+        apply_types = self._get_apply_types()
+        profile = self._get_handler_profile(func, **broker_args)
+        if profile is not None:
+            f = profile.wrap_call(f, apply_types)
+        elif apply_types is not None:
             f = apply_types(f)
 
-        f = self._wrap_decode_message(
-            f,
-            _raw=_raw,
-            params=dependant.real_params,
+        watcher = self._get_watcher(retry, **broker_args)
+        handler_codec = self._get_codec(codec)
+        metrics = self._get_handler_metrics(func, **broker_args)
+        dead_letters = self._get_dead_letters(dead_letter)
+        handler_name = func.__name__
+
+        if (
+            dedup is not None
+            and dedup.key == "message_id"
+            and not self._stable_message_id
+        ):
+            raise ValueError(
+                f"{type(self).__name__} messages have no redelivery stable "
+                "`message_id`: pass the `Dedup` key explicitly"
+            )
+
+        if batch is True:
+            if cache is not None:
+                raise ValueError("Batch handlers results can't be cached")
+
+            return self._wrap_batch_handler(
+                func,
+                f,
+                watcher=watcher,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                _raw=_raw,
+                codec=handler_codec,
+                metrics=metrics,
+                profile=profile,
+                log_sampling=log_sampling,
+                **broker_args,
+            )
+
+        params = dependant.real_params
+        is_unwrap = _raw is False and len(params) > 1
+        # handlers without body argument or consuming raw bytes do not need
+        # the decoded body, so it is decoded only at `decoded_body` access
+        is_lazy = (
+            _raw is True
+            or not params
+            or (len(params) == 1 and params[0].outer_type_ is bytes)
         )
 
-        if self.logger is not None:
-            f = self._log_execution(**broker_args)(f)
+        logger = self.logger
+        log = self._log
+        log_received, log_done = self._get_access_log(log_sampling)
+        get_log_context = self._get_log_context_factory(**broker_args)
+        parse_message = self._parse_message
+        decode_body = self._decode_body
+        get_process_context = self._get_process_context
+        send_reply = self._reply
 
-        f = self._process_message(f, get_watcher(self.logger, retry))
+        if profile is not None:
+            parse_message = profile.wrap_async("parse", parse_message)
+            decode_body = profile.wrap_sync("decode", decode_body)
+            get_process_context = profile.wrap_context(get_process_context)
+            send_reply = profile.wrap_async("reply", send_reply)
 
-        f = self._wrap_parse_message(f)
+        def decoder(message: PropanMessage) -> DecodedMessage:
+            return decode_body(message, handler_codec)
 
-        f = set_message_context(f)
+        set_local = context.set_local
+        reset_local = context.reset_local
 
-        f = suppress_decor(f)
+        @wraps(func)
+        async def handler_wrapper(message: Any, reraise_exc: bool = False) -> Any:
+            if metrics is not None:
+                metrics.received += 1
+                metrics.in_flight += 1
+                start = perf_counter()
+
+            msg: Optional[PropanMessage] = None
+            dedup_key: Optional[str] = None
+            cache_key: Optional[Hashable] = None
+            cached: Optional[Tuple[Any]] = None
+            message_token = set_local("message", message)
+            try:
+                msg = await parse_message(message)
+
+                async with get_process_context(msg, watcher):
+                    if logger is not None:
+                        log_context = get_log_context(msg)
+                        log_token = set_local("log_context", log_context)
+                        received = log_received(log_context, "Received")
 
-        return f
+                    try:
+                        if dedup is not None:
+                            # the body is decoded once if the key is its field
+                            msg.set_decoder(decoder)
+                            # RPC requests are processed again to send the reply
+                            if not msg.reply_to:
+                                dedup_key = dedup.get_key(msg)
+                            if dedup_key is not None and await dedup.is_duplicate(
+                                dedup_key
+                            ):
+                                if logger is not None:
+                                    log_done("Duplicate", log_context, received)
+                                if metrics is not None:
+                                    metrics.duplicates += 1
+                                return None
+
+                        if cache is not None:
+                            msg.set_decoder(decoder)
+                            # only RPC replies are reused, other messages are
+                            # processed for the handler side effects
+                            if msg.reply_to:
+                                cache_key = cache.get_key(msg)
+                            if cache_key is not None:
+                                cached = await cache.get(cache_key)
+
+                        if cached is not None:
+                            r = cached[0]
+
+                        elif is_lazy is True:
+                            msg.set_decoder(decoder)
+                            if _raw is True:
+                                r = await f(msg)
+                            else:
+                                r = await f(msg.body)
+
+                        else:
+                            if dedup is None and cache is None:
+                                decoded = msg.decoded_body = decoder(msg)
+                            else:
+                                decoded = msg.decoded_body
+                            if is_unwrap is True and isinstance(decoded, Mapping):
+                                r = await f(**decoded)
+                            else:
+                                r = await f(decoded)
 
-    def _wrap_decode_message(
-        self,
-        func: Callable[..., Awaitable[T]],
-        params: Sequence[ModelField] = (),
-        _raw: bool = False,
-    ) -> Callable[[PropanMessage], Awaitable[T]]:
-        is_unwrap = len(params) > 1
+                    except SkipMessage as e:
+                        if logger is not None:
+                            log_done("Skipped", log_context, received)
+                        raise e
 
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            msg = await self._decode_message(message)
-            message.decoded_body = msg
+                    except Exception as e:
+                        if logger is not None:
+                            log(repr(e), logging.ERROR)
+                        raise e
 
-            if _raw is True:
-                return await func(message)
+                    else:
+                        if logger is not None:
+                            log_done("Processed", log_context, received)
 
-            elif is_unwrap is True and isinstance(msg, Mapping):
-                return await func(**msg)
+                    finally:
+                        if logger is not None:
+                            reset_local("log_context", log_token)
 
-            else:
-                return await func(msg)
+                    if msg.reply_to:
+                        await send_reply(msg, r, handler_codec)
 
-        return wrapper
+                    if dedup_key is not None:
+                        await dedup.add(dedup_key)  # type: ignore[union-attr]
 
-    def _wrap_parse_message(
-        self, func: Callable[[PropanMessage], Awaitable[T]]
-    ) -> Callable[[Any], Awaitable[T]]:
-        @wraps(func)
-        async def parse_wrapper(message: Any) -> T:
-            return await func(await self._parse_message(message))
+                    if cache_key is not None and cached is None:
+                        await cache.set(cache_key, r)  # type: ignore[union-attr]
+
+            except Exception as e:
+                if isinstance(e, SkipMessage):
+                    if metrics is not None:
+                        metrics.skipped += 1
+
+                elif metrics is not None or dead_letters is not None:
+                    pushed_back = (
+                        watcher is not None
+                        and msg is not None
+                        and await maybe_await(watcher.is_pushed_back(msg.message_id))
+                    )
+
+                    if metrics is not None:
+                        metrics.failed += 1
+                        if pushed_back:
+                            metrics.retried += 1
 
-        return parse_wrapper
+                    if dead_letters is not None and msg is not None and not pushed_back:
+                        dead_letters.put(dead_letter, msg, e, handler_name)
 
-    def _log_execution(
+                if reraise_exc is True:
+                    raise e
+                return None
+
+            finally:
+                reset_local("message", message_token)
+                if metrics is not None:
+                    metrics.in_flight -= 1
+                    metrics.latency.observe(perf_counter() - start)
+
+            if metrics is not None:
+                metrics.processed += 1
+            return r
+
+        if profile is not None:
+            return profile.wrap_async("total", handler_wrapper)
+        return handler_wrapper
+
+    def _wrap_batch_handler(
         self,
+        func: AnyCallable,
+        f: Callable[..., Awaitable[Any]],
+        watcher: Optional[BaseWatcher],
+        dead_letter: Any = None,
+        dedup: Optional[Dedup] = None,
+        _raw: bool = False,
+        codec: Optional[BaseCodec] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        profile: Optional[HandlerProfile] = None,
+        log_sampling: Optional[LogSampling] = None,
         **broker_args: Any,
-    ) -> Wrapper:
-        def decor(
-            func: Callable[[PropanMessage], Awaitable[T]]
-        ) -> Callable[[PropanMessage], Awaitable[T]]:
-            @wraps(func)
-            async def log_wrapper(message: PropanMessage) -> T:
-                log_context = self._get_log_context(message=message, **broker_args)
+    ) -> DecoratedAsync:
+        """Compiles a handler consuming a list of messages at once
+
+        The whole list is validated as a single argument and the messages are
+        acknowledged together: all of them on success, all of them are pushed
+        back on error.
+        """
+        logger = self.logger
+        log = self._log
+        log_received, log_done = self._get_access_log(log_sampling)
+        get_log_context = self._get_log_context_factory(**broker_args)
+        parse_message = self._parse_message
+        decode_body = self._decode_body
+        get_process_context = self._get_batch_process_context
+        set_local = context.set_local
+        dead_letters = self._get_dead_letters(dead_letter)
+        handler_name = func.__name__
+
+        if profile is not None:
+            parse_message = profile.wrap_async("parse", parse_message)
+            decode_body = profile.wrap_sync("decode", decode_body)
+            get_process_context = profile.wrap_context(get_process_context)
+
+        reset_local = context.reset_local
 
-                with context.scope("log_context", log_context):
-                    self._log("Received", extra=log_context)
+        @wraps(func)
+        async def batch_handler_wrapper(
+            messages: Sequence[Any], reraise_exc: bool = False
+        ) -> Any:
+            if metrics is not None:
+                count = len(messages)
+                metrics.received += count
+                metrics.in_flight += count
+                start = perf_counter()
+
+            msgs: List[PropanMessage] = []
+            dedup_keys: List[str] = []
+            message_token = set_local("message", messages)
+            try:
+                msgs = [await parse_message(m) for m in messages]
+
+                async with get_process_context(msgs, watcher):
+                    if logger is not None:
+                        log_context = get_log_context(msgs[0])
+                        log_token = set_local("log_context", log_context)
+                        received = log_received(
+                            log_context, f"Received {len(msgs)} messages"
+                        )
 
                     try:
-                        r = await func(message)
+                        decoded = []
+                        for m in msgs:
+                            m.decoded_body = decode_body(m, codec)
+                            decoded.append(m.decoded_body)
+
+                        batch = msgs
+                        if dedup is not None:
+                            batch = []
+                            for m in msgs:
+                                key = dedup.get_key(m)
+                                if key is not None:
+                                    if await dedup.is_duplicate(key):
+                                        continue
+                                    dedup_keys.append(key)
+                                batch.append(m)
+
+                            if metrics is not None:
+                                metrics.duplicates += len(msgs) - len(batch)
+                            if not batch:
+                                if logger is not None:
+                                    log_done("Duplicate", log_context, received)
+                                return None
+                            decoded = [m.decoded_body for m in batch]
+
+                        if _raw is True:
+                            r = await f(batch)
+                        else:
+                            r = await f(decoded)
+
                     except SkipMessage as e:
-                        self._log("Skipped", extra=log_context)
+                        if logger is not None:
+                            log_done("Skipped", log_context, received)
                         raise e
+
                     except Exception as e:
-                        self._log(repr(e), logging.ERROR)
+                        if logger is not None:
+                            log(repr(e), logging.ERROR)
                         raise e
+
                     else:
-                        self._log("Processed", extra=log_context)
-                        return r
+                        if logger is not None:
+                            log_done("Processed", log_context, received)
+
+                    finally:
+                        if logger is not None:
+                            reset_local("log_context", log_token)
+
+                    for key in dedup_keys:
+                        await dedup.add(key)  # type: ignore[union-attr]
+
+            except Exception as e:
+                if isinstance(e, SkipMessage):
+                    if metrics is not None:
+                        metrics.skipped += count
+
+                elif metrics is not None or dead_letters is not None:
+                    pushed_back = False
+                    if watcher is not None:
+                        for m in msgs:
+                            if await maybe_await(watcher.is_pushed_back(m.message_id)):
+                                pushed_back = True
+                                break
+
+                    if metrics is not None:
+                        metrics.failed += count
+                        if pushed_back:
+                            metrics.retried += count
+
+                    if dead_letters is not None and not pushed_back:
+                        for m in msgs:
+                            dead_letters.put(dead_letter, m, e, handler_name)
+
+                if reraise_exc is True:
+                    raise e
+                return None
+
+            finally:
+                reset_local("message", message_token)
+                if metrics is not None:
+                    metrics.in_flight -= count
+                    metrics.latency.observe(perf_counter() - start)
+
+            if metrics is not None:
+                metrics.processed += count
+            return r
+
+        if profile is not None:
+            return profile.wrap_async("total", batch_handler_wrapper)
+        return batch_handler_wrapper
+
+    def _get_dead_letters(self, dead_letter: Any) -> Optional[DeadLetterForwarder]:
+        if dead_letter is None:
+            return None
+
+        if self._dead_letters is None:
+            self._dead_letters = DeadLetterForwarder(self)
+        return self._dead_letters
+
+    async def _close_dead_letters(self) -> None:
+        if self._dead_letters is not None:
+            await self._dead_letters.close()
+
+    def redrive(
+        self,
+        dead_letter: Any,
+        source: Any,
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Messages are published as is without the dead-letter metadata headers
+        no more than `rate` per second.
+        """
+        limiter = RateLimiter(rate) if rate is not None else None
+
+        async def redrive(message: Any) -> None:
+            if limiter is not None:
+                await limiter.acquire()
+
+            await self.publish(
+                message.body,
+                source,
+                headers=strip_dead_letter_headers(message),
+                codec=get_content_type(self.codecs, message),
+            )
 
-            return log_wrapper
+        return self.handle(dead_letter, _raw=True, **handle_kwargs)(redrive)  # type: ignore[no-any-return]
 
-        return decor
+    def _get_access_log(
+        self,
+        log_sampling: Optional[LogSampling] = None,
+    ) -> Tuple[Callable[[AnyDict, str], float], Callable[[str, AnyDict, float], None]]:
+        """Builds the message receiving and processing end access log callbacks
+
+        The records are not built at all if the logger level is disabled.
+        """
+        logger = self.logger
+        level = self.log_level
+        if logger is None:
+            return (lambda *_: 0.0), (lambda *_: None)
+
+        is_enabled = logger.isEnabledFor
+        log = logger.log
+
+        if log_sampling is None:
+
+            def received(log_context: AnyDict, message: str) -> float:
+                if is_enabled(level):
+                    log(level, message, extra=log_context)
+                return 0.0
+
+            def done(message: str, log_context: AnyDict, received: float) -> None:
+                if is_enabled(level):
+                    log(level, message, extra=log_context)
+
+        else:
+            is_sampled = log_sampling.is_sampled
+
+            def received(log_context: AnyDict, message: str) -> float:
+                return perf_counter()
+
+            def done(message: str, log_context: AnyDict, received: float) -> None:
+                if is_enabled(level):
+                    duration = perf_counter() - received
+                    if is_sampled(duration):
+                        log(
+                            level,
+                            f"{message} in {duration * 1000:.1f} ms",
+                            extra=log_context,
+                        )
+
+        return received, done
 
     def _log(
         self,
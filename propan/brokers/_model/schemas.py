@@ -1,13 +1,13 @@
-import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
 from uuid import uuid4
 
 from pydantic import BaseModel, Field, Json
-from pydantic.dataclasses import dataclass as pydantic_dataclass
 from typing_extensions import TypeAlias, assert_never
 
+from propan.brokers._model.utils import ConcurrentDispatcher
+from propan.brokers.codecs import BaseCodec, json_codec
 from propan.types import AnyDict, DecodedMessage, DecoratedCallable, SendableMessage
 
 ContentType: TypeAlias = str
@@ -17,10 +17,20 @@ ContentType: TypeAlias = str
 class BaseHandler:
     callback: DecoratedCallable
 
+    dispatcher: Optional[ConcurrentDispatcher] = field(default=None, init=False)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of messages the handler is processing right now"""
+        if self.dispatcher is None:
+            return 0
+        return self.dispatcher.in_flight
+
 
 class ContentTypes(str, Enum):
     text = "text/plain"
     json = "application/json"
+    msgpack = "application/msgpack"
 
 
 class NameRequired(BaseModel):
@@ -41,34 +51,171 @@ class SendableModel(BaseModel):
     message: DecodedMessage
 
     @classmethod
-    def to_send(cls, msg: SendableMessage) -> Tuple[bytes, Optional[ContentType]]:
+    def to_send(
+        cls,
+        msg: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> Tuple[bytes, Optional[ContentType]]:
         if msg is None:
             return b"", None
 
         if isinstance(msg, bytes):
-            return msg, None
+            # bytes are considered as already encoded by the codec
+            return msg, codec.content_type if codec is not None else None
+
+        m: Any
+        if isinstance(msg, (str, dict, list, tuple)):
+            # common types are sending as is without pydantic validation
+            m = msg
+
+        elif isinstance(msg, BaseModel):
+            if msg.__config__.json_encoders and (
+                codec is None or codec.content_type == ContentTypes.json.value
+            ):
+                # model custom serialization rules
+                return msg.json().encode(), ContentTypes.json.value
+            m = msg.dict()
 
-        m = cls(message=msg).message  # type: ignore
+        else:
+            m = cls(message=msg).message  # type: ignore
+
+        if codec is not None:
+            return codec.encode(m), codec.content_type
 
         if isinstance(m, str):
             return m.encode(), ContentTypes.text.value
 
         if isinstance(m, (Dict, Sequence)):
-            return json.dumps(m).encode(), ContentTypes.json.value
+            return json_codec.encode(m), ContentTypes.json.value
 
         assert_never()  # pragma: no cover
 
 
+@dataclass
+class PublishResult:
+    """Result of a single message publishing in a batch"""
+
+    message: SendableMessage
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @classmethod
+    def from_result(cls, message: SendableMessage, result: Any) -> "PublishResult":
+        """Builds from `asyncio.gather(..., return_exceptions=True)` result"""
+        if isinstance(result, BaseException):
+            return cls(message, error=result)
+        return cls(message, result=result)
+
+
 class RawDecoced(BaseModel):
     message: Union[Json[Any], str]
 
 
-@pydantic_dataclass
 class PropanMessage:
-    body: bytes
-    raw_message: Any
-    content_type: Optional[str] = None
-    reply_to: str = ""
-    headers: AnyDict = Field(default_factory=dict)
-    message_id: str = Field(default_factory=lambda: str(uuid4()))
-    decoded_body: Optional[DecodedMessage] = None
+    """Broker independent incoming message
+
+    The message is created for each consumed message, so it is a plain slotted
+    object without validation. `message_id` is generated, `headers` are built
+    (if a factory is passed) and `decoded_body` is decoded (if a decoder is set)
+    only at first access.
+    """
+
+    __slots__ = (
+        "body",
+        "raw_message",
+        "content_type",
+        "reply_to",
+        "_decoded_body",
+        "_decoder",
+        "_headers",
+        "_message_id",
+    )
+
+    def __init__(
+        self,
+        body: bytes,
+        raw_message: Any,
+        content_type: Optional[str] = None,
+        reply_to: str = "",
+        headers: Union[AnyDict, Callable[[], AnyDict], None] = None,
+        message_id: Optional[str] = None,
+        decoded_body: Optional[DecodedMessage] = None,
+    ) -> None:
+        self.body = body
+        self.raw_message = raw_message
+        self.content_type = content_type
+        self.reply_to = reply_to
+        self._decoded_body = decoded_body
+        self._decoder: Optional[Callable[["PropanMessage"], DecodedMessage]] = None
+        self._headers = headers
+        self._message_id = message_id
+
+    @property
+    def body_view(self) -> memoryview:
+        """Zero-copy view over the message body
+
+        Handlers receive the body as `bytes`: `memoryview` is not a valid
+        argument annotation, so the view is available to `_raw` handlers only.
+        """
+        return memoryview(self.body)
+
+    @property
+    def decoded_body(self) -> Optional[DecodedMessage]:
+        decoder = self._decoder
+        if decoder is not None:
+            self._decoder = None
+            self._decoded_body = decoder(self)
+        return self._decoded_body
+
+    @decoded_body.setter
+    def decoded_body(self, value: Optional[DecodedMessage]) -> None:
+        self._decoder = None
+        self._decoded_body = value
+
+    def set_decoder(self, decoder: Callable[["PropanMessage"], DecodedMessage]) -> None:
+        """Decode the body by the decoder at first `decoded_body` access"""
+        self._decoder = decoder
+
+    @property
+    def headers(self) -> AnyDict:
+        headers = self._headers
+        if headers is None:
+            headers = self._headers = {}
+        elif callable(headers):
+            headers = self._headers = headers()
+        return headers
+
+    @headers.setter
+    def headers(self, value: AnyDict) -> None:
+        self._headers = value
+
+    @property
+    def message_id(self) -> str:
+        if self._message_id is None:
+            self._message_id = str(uuid4())
+        return self._message_id
+
+    @message_id.setter
+    def message_id(self, value: str) -> None:
+        self._message_id = value
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[[Any], "PropanMessage"]]:
+        # the message is used as a pydantic field type by handlers annotations
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> "PropanMessage":
+        if not isinstance(value, cls):
+            raise TypeError(f"{cls.__name__} instance expected")
+        return value
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(message_id={self.message_id!r}, "
+            f"content_type={self.content_type!r}, body={self.body!r})"
+        )
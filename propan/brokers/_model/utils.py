@@ -1,20 +1,39 @@
+import asyncio
 import logging
-from functools import wraps
-from typing import Any, Awaitable, Callable, Optional, TypeVar, Union
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+    TypeVar,
+    Union,
+)
 
 from propan.brokers.push_back_watcher import (
     BaseWatcher,
+    BaseWatcherStore,
     FakePushBackWatcher,
     PushBackWatcher,
+    RetryPolicy,
+    RetryWatcher,
 )
-from propan.utils import context
+from propan.log.handlers import AsyncLogHandler
+from propan.types import AnyDict
 
 T = TypeVar("T")
-P = TypeVar("P")
 
 
 def change_logger_handlers(logger: logging.Logger, fmt: str) -> None:
-    for handler in logger.handlers:
+    for handler in _get_handlers(logger):
         formatter = handler.formatter
         if formatter is not None:
             use_colors = getattr(formatter, "use_colors", None)
@@ -25,41 +44,164 @@ def change_logger_handlers(logger: logging.Logger, fmt: str) -> None:
             handler.setFormatter(type(formatter)(fmt, **kwargs))
 
 
+def _get_handlers(logger: logging.Logger) -> Iterator[logging.Handler]:
+    for handler in logger.handlers:
+        if isinstance(handler, AsyncLogHandler):
+            yield from handler.handlers
+        else:
+            yield handler
+
+
+def get_batch_headers(
+    headers: Optional[AnyDict],
+    message_headers: Optional[Sequence[AnyDict]],
+    index: int,
+) -> AnyDict:
+    """Headers of the batch message: the shared ones updated by its own"""
+    if message_headers is None:
+        return dict(headers or {})
+    return {**(headers or {}), **message_headers[index]}
+
+
 def get_watcher(
     logger: Optional[logging.Logger],
-    try_number: Union[bool, int] = True,
+    try_number: Union[bool, int, RetryPolicy] = True,
+    store: Optional[BaseWatcherStore] = None,
+    destination: Any = None,
 ) -> Optional[BaseWatcher]:
     watcher: Optional[BaseWatcher]
-    if try_number is True:
+    if isinstance(try_number, RetryPolicy):
+        watcher = RetryWatcher(
+            try_number,
+            logger=logger,
+            store=store,
+            destination=destination,
+        )
+    elif try_number is True:
         watcher = FakePushBackWatcher()
     elif try_number is False:
         watcher = None
     else:
-        watcher = PushBackWatcher(logger=logger, max_tries=try_number)
+        watcher = PushBackWatcher(logger=logger, max_tries=try_number, store=store)
     return watcher
 
 
-def suppress_decor(
-    func: Callable[[Any], Awaitable[T]]
-) -> Callable[[Any, bool], Awaitable[Optional[T]]]:
-    @wraps(func)
-    async def wrapper(message: Any, reraise_exc: bool = False) -> Optional[T]:
+class FakeContext:
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+@asynccontextmanager
+async def batch_context(
+    contexts: Iterable[AsyncContextManager[None]],
+) -> AsyncIterator[None]:
+    async with AsyncExitStack() as stack:
+        for c in contexts:
+            await stack.enter_async_context(c)
+        yield
+
+
+async def get_batch(
+    queue: "asyncio.Queue[T]",
+    max_size: int,
+    max_wait: float,
+) -> List[T]:
+    """Waits for the first message and collects the next ones
+
+    Returns as soon as the batch is full or `max_wait` seconds passed since the
+    first message was received.
+    """
+    batch = [await queue.get()]
+
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + max_wait
+
+    while len(batch) < max_size:
+        if not queue.empty():
+            batch.append(queue.get_nowait())
+            continue
+
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+
         try:
-            return await func(message)
-        except Exception as e:
-            if reraise_exc is True:
-                raise e
-            return None
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+    return batch
+
+
+async def consume_batches(
+    callback: Callable[[List[T]], Awaitable[Any]],
+    queue: "asyncio.Queue[T]",
+    max_size: int,
+    max_wait: float,
+) -> NoReturn:
+    while True:
+        await callback(await get_batch(queue, max_size, max_wait))
+
 
-    return wrapper
+class ConcurrentDispatcher:
+    """Runs a handler callback in background tasks with bounded concurrency"""
 
+    callback: Callable[..., Awaitable[Any]]
+    max_concurrency: int
+    _semaphore: Optional[asyncio.Semaphore]
+    _tasks: Set["asyncio.Task[Any]"]
 
-def set_message_context(
-    func: Callable[[Any], Awaitable[T]]
-) -> Callable[[Any], Awaitable[T]]:
-    @wraps(func)
-    async def wrapper(message: Any) -> T:
-        with context.scope("message", message):
-            return await func(message)
+    def __init__(
+        self,
+        callback: Callable[..., Awaitable[Any]],
+        max_concurrency: int,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` should be a positive number")
+
+        self.callback = callback
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._tasks = set()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of messages are processing right now"""
+        return self._in_flight
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # created lazily to bind it to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def __call__(self, *args: Any) -> "asyncio.Task[Any]":
+        """Waits for a free slot and starts the callback in background"""
+        await self.semaphore.acquire()
+        task = asyncio.create_task(self._run(*args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, *args: Any) -> Any:
+        """Waits for a free slot and calls the callback in place"""
+        await self.semaphore.acquire()
+        return await self._run(*args)
+
+    async def _run(self, *args: Any) -> Any:
+        self._in_flight += 1
+        try:
+            return await self.callback(*args)
+        finally:
+            self._in_flight -= 1
+            self.semaphore.release()
 
-    return wrapper
+    async def wait_closed(self) -> None:
+        """Waits for all background tasks to complete"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,151 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+from pydantic.json import pydantic_encoder
+from typing_extensions import TypeAlias
+
+from propan.types import DecodedMessage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None  # type: ignore
+
+__all__ = (
+    "BaseCodec",
+    "TextCodec",
+    "JSONCodec",
+    "MsgpackCodec",
+    "RawCodec",
+    "CodecRegistry",
+    "CodecType",
+)
+
+
+class BaseCodec(ABC):
+    content_type: str
+
+    @abstractmethod
+    def encode(self, message: Any) -> bytes:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def decode(self, body: bytes) -> DecodedMessage:
+        raise NotImplementedError()
+
+
+class TextCodec(BaseCodec):
+    content_type = "text/plain"
+
+    def encode(self, message: Any) -> bytes:
+        return str(message).encode()
+
+    def decode(self, body: bytes) -> DecodedMessage:
+        return body.decode()
+
+
+class JSONCodec(BaseCodec):
+    """JSON serializer using `orjson` if it is installed"""
+
+    content_type = "application/json"
+
+    def __init__(self, use_orjson: bool = True) -> None:
+        self.use_orjson = use_orjson and orjson is not None
+
+    def encode(self, message: Any) -> bytes:
+        if self.use_orjson is True:
+            return orjson.dumps(
+                message,
+                default=pydantic_encoder,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(message, default=pydantic_encoder).encode()
+
+    def decode(self, body: bytes) -> DecodedMessage:
+        if self.use_orjson is True:
+            return orjson.loads(body)  # type: ignore[no-any-return]
+        return json.loads(body)  # type: ignore[no-any-return]
+
+
+class MsgpackCodec(BaseCodec):
+    content_type = "application/msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError(
+                "\nYou should install msgpack to use MsgpackCodec"
+                '\npip install "propan[msgpack]"'
+            )
+
+    def encode(self, message: Any) -> bytes:
+        return msgpack.packb(message)  # type: ignore[no-any-return]
+
+    def decode(self, body: bytes) -> DecodedMessage:
+        return msgpack.unpackb(body)  # type: ignore[no-any-return]
+
+
+class RawCodec(BaseCodec):
+    """Passes bytes through as is, labeling them with a content type
+
+    Use it for already serialized payloads (protobuf, avro, etc.)
+    """
+
+    def __init__(self, content_type: str = "application/octet-stream") -> None:
+        self.content_type = content_type
+
+    def encode(self, message: Any) -> bytes:
+        if isinstance(message, str):
+            return message.encode()
+        raise TypeError(f"{type(self).__name__} can send `bytes` or `str` only")
+
+    def decode(self, body: bytes) -> DecodedMessage:
+        return body
+
+
+CodecType: TypeAlias = Union[BaseCodec, str]
+
+
+class CodecRegistry:
+    """Content type to codec mapping"""
+
+    def __init__(self, *codecs: BaseCodec) -> None:
+        self._codecs: Dict[str, BaseCodec] = {}
+        for c in codecs:
+            self.register(c)
+
+    def register(self, codec: BaseCodec) -> None:
+        self._codecs[codec.content_type] = codec
+
+    def get(self, content_type: str) -> Optional[BaseCodec]:
+        codec = self._codecs.get(content_type)
+        if codec is None and ";" in content_type:
+            # `application/json; charset=utf-8` like types
+            codec = self._codecs.get(content_type.split(";", 1)[0].strip())
+        return codec
+
+    def resolve(self, codec: Optional[CodecType]) -> Optional[BaseCodec]:
+        """Get a codec object by itself or by its content type"""
+        if codec is None or isinstance(codec, BaseCodec):
+            return codec
+
+        c = self.get(codec)
+        if c is None:
+            raise ValueError(f"Unknown codec content type `{codec}`")
+        return c
+
+    def copy(self) -> "CodecRegistry":
+        return CodecRegistry(*self._codecs.values())
+
+
+text_codec = TextCodec()
+json_codec = JSONCodec()
+
+default_codecs = CodecRegistry(text_codec, json_codec)
+if msgpack is not None:  # pragma: no branch
+    default_codecs.register(MsgpackCodec())
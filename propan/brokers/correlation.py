@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Generic, Optional, TypeVar
+
+__all__ = ("CorrelationManager",)
+
+T = TypeVar("T")
+
+
+class CorrelationManager(Generic[T]):
+    """Futures of the RPC requests waiting for the responses
+
+    A request entry lives only while `expect` context is open, so timed out
+    and cancelled requests do not leak. No more than `max_pending` requests
+    wait at once: the next ones wait for a free slot before publishing.
+    """
+
+    def __init__(self, max_pending: int = 10_000) -> None:
+        if max_pending < 1:
+            raise ValueError("`max_pending` should be a positive number")
+
+        self.max_pending = max_pending
+        self._futures: Dict[str, "asyncio.Future[T]"] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._futures)
+
+    @asynccontextmanager
+    async def expect(self, correlation_id: str) -> AsyncIterator["asyncio.Future[T]"]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        slots = self._slots
+        await slots.acquire()
+        future: "asyncio.Future[T]" = asyncio.get_event_loop().create_future()
+        self._futures[correlation_id] = future
+        try:
+            yield future
+        finally:
+            self._futures.pop(correlation_id, None)
+            slots.release()
+
+    def resolve(self, correlation_id: str, response: T) -> bool:
+        """Passes the response to the request, `False` if nobody waits for it"""
+        future = self._futures.pop(correlation_id, None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(response)
+        return True
+
+    def cancel(self) -> None:
+        for f in self._futures.values():
+            f.cancel()
+        self._futures = {}
+        self._slots = None
@@ -0,0 +1,184 @@
+import asyncio
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.codecs import CodecRegistry
+from propan.brokers.push_back_watcher import RETRIES_HEADER
+from propan.types import AnyDict
+
+if TYPE_CHECKING:
+    from propan.brokers._model.broker_usecase import BrokerUsecase
+
+__all__ = (
+    "DeadLetterForwarder",
+    "RateLimiter",
+    "ERROR_HEADER",
+    "ERROR_TYPE_HEADER",
+    "HANDLER_HEADER",
+    "MESSAGE_ID_HEADER",
+    "DEAD_LETTER_HEADERS",
+    "strip_dead_letter_headers",
+    "get_content_type",
+)
+
+ERROR_HEADER = "x-propan-error"
+ERROR_TYPE_HEADER = "x-propan-error-type"
+HANDLER_HEADER = "x-propan-handler"
+MESSAGE_ID_HEADER = "x-propan-message-id"
+
+# headers removed from the message at re-drive
+DEAD_LETTER_HEADERS = (
+    ERROR_HEADER,
+    ERROR_TYPE_HEADER,
+    HANDLER_HEADER,
+    MESSAGE_ID_HEADER,
+    RETRIES_HEADER,
+    "content-type",
+    # the RPC request is answered already, so dead letters are not replied
+    "reply_to",
+    "correlation_id",
+)
+
+MAX_ERROR_LENGTH = 1024
+
+# destination, message, headers
+Letter = Tuple[Any, PropanMessage, AnyDict]
+
+
+class DeadLetterForwarder:
+    """Publishes messages failed all the tries to the dead-letter destinations
+
+    Messages are buffered and published by `publish_batch` of each destination
+    with `max_batch_size` messages or each `max_wait` seconds, so a handler does
+    not wait for the publishing. `close` publishes the rest of the buffer.
+    """
+
+    def __init__(
+        self,
+        broker: "BrokerUsecase",
+        max_batch_size: int = 100,
+        max_wait: float = 0.1,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("`max_batch_size` should be a positive number")
+
+        self.broker = broker
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._buffer: List[Letter] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def put(
+        self,
+        destination: Any,
+        message: PropanMessage,
+        exc: BaseException,
+        handler: str,
+    ) -> None:
+        headers = strip_dead_letter_headers(message)
+        headers[ERROR_HEADER] = f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH]
+        headers[ERROR_TYPE_HEADER] = type(exc).__name__
+        headers[HANDLER_HEADER] = handler
+        headers[MESSAGE_ID_HEADER] = message.message_id
+
+        self._buffer.append((destination, message, headers))
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush_soon()
+        elif self._timer is None:
+            loop = asyncio.get_event_loop()
+            self._timer = loop.call_later(self.max_wait, self._flush_soon)
+
+    async def flush(self) -> None:
+        letters, self._buffer = self._buffer, []
+        if not letters:
+            return
+
+        # destinations are the handlers options objects, so they are grouped
+        # by identity
+        groups: Dict[Tuple[int, Optional[str]], List[Letter]] = {}
+        codecs = self.broker.codecs
+        for letter in letters:
+            destination, message, _ = letter
+            key = (id(destination), get_content_type(codecs, message))
+            groups.setdefault(key, []).append(letter)
+
+        publish_batch = self.broker.publish_batch
+        results = await asyncio.gather(
+            *(
+                publish_batch(
+                    [message.body for _, message, _ in group],
+                    group[0][0],
+                    message_headers=[headers for _, _, headers in group],
+                    codec=codec,
+                )
+                for (_, codec), group in groups.items()
+            ),
+            return_exceptions=True,
+        )
+
+        logger = self.broker.logger
+        if logger is not None:
+            for group, r in zip(groups.values(), results):
+                errors: List[Optional[BaseException]]
+                if isinstance(r, BaseException):
+                    errors = [r] * len(group)
+                else:
+                    errors = [i.error for i in r]
+
+                for (destination, message, _), e in zip(group, errors):
+                    if e is not None:
+                        logger.error(
+                            f"Message {message.message_id} dead-letter "
+                            f"to `{destination}` failed: {e!r}"
+                        )
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush_soon(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class RateLimiter:
+    """Spaces calls to make no more than `rate` per second"""
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("`rate` should be a positive number")
+
+        self.interval = 1 / rate
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        now = monotonic()
+        at = max(now, self._next)
+        self._next = at + self.interval
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+def strip_dead_letter_headers(message: PropanMessage) -> Dict[str, Any]:
+    """Message headers without the dead-letter metadata"""
+    return {k: v for k, v in message.headers.items() if k not in DEAD_LETTER_HEADERS}
+
+
+def get_content_type(codecs: CodecRegistry, message: PropanMessage) -> Optional[str]:
+    """Message content type to send its body as is if the broker knows it"""
+    content_type = message.content_type
+    if content_type and codecs.get(content_type) is not None:
+        return content_type
+    return None
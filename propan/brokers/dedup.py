@@ -0,0 +1,99 @@
+from typing import Any, Callable, Optional, Union
+
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.push_back_watcher import BaseWatcherStore, MemoryWatcherStore
+
+__all__ = ("Dedup",)
+
+KeyGetter = Callable[[PropanMessage], Any]
+
+
+class Dedup:
+    """Skips messages already processed successfully
+
+    `key` identifies a message: `message_id`, a header by `headers.<name>`,
+    a decoded body field by `body.<field>[.<subfield>]` or a callable taking
+    the message. Messages without the key and RPC requests (to send the reply)
+    are always processed. `message_id` key requires the broker with the
+    redelivery stable id (Kafka, RabbitMQ, SQS).
+
+    Processed keys are kept by the process local store with `ttl` and
+    `max_entries` limits or by the passed one (e.g. `RedisWatcherStore`) to
+    share them between the application workers.
+    """
+
+    def __init__(
+        self,
+        key: Union[str, KeyGetter] = "message_id",
+        ttl: Optional[float] = 3600.0,
+        max_entries: int = 10_000,
+        store: Optional[BaseWatcherStore] = None,
+    ) -> None:
+        self.key = key
+        self.get_key = _compile_key(key)
+        self.store = (
+            store
+            if store is not None
+            else MemoryWatcherStore(max_entries=max_entries, ttl=ttl)
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def is_duplicate(self, key: str) -> bool:
+        if await self.store.get(key) > 0:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    async def add(self, key: str) -> None:
+        await self.store.incr(key)
+
+
+def _compile_key(
+    key: Union[str, KeyGetter]
+) -> Callable[[PropanMessage], Optional[str]]:
+    get: KeyGetter
+    if callable(key):
+        get = key
+
+    elif key == "message_id":
+
+        def get(message: PropanMessage) -> Any:
+            return message.message_id
+
+    else:
+        source, _, path = key.partition(".")
+        if source not in ("headers", "body") or not path:
+            raise ValueError(
+                f"Wrong dedup key `{key}`: use `message_id`, "
+                "`headers.<name>` or `body.<field>`"
+            )
+
+        if source == "headers":
+
+            def get(message: PropanMessage) -> Any:
+                return message.headers.get(path)
+
+        else:
+            fields = path.split(".")
+
+            def get(message: PropanMessage) -> Any:
+                value = message.decoded_body
+                for f in fields:
+                    if not isinstance(value, dict):
+                        return None
+                    value = value.get(f)
+                return value
+
+    def get_key(message: PropanMessage) -> Optional[str]:
+        value = get(message)
+        return None if value is None else str(value)
+
+    return get_key
@@ -1,2 +1,6 @@
 class SkipMessage(Exception):
     """PushBackWatcher Instruction to skip message"""
+
+
+class PublishError(Exception):
+    """Broker rejected the published message"""
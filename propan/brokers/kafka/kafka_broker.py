@@ -1,19 +1,47 @@
 import asyncio
 import logging
-from functools import partial, wraps
-from typing import Any, Callable, Dict, List, NoReturn, Optional, Sequence, Tuple, Union
+import random
+from collections import defaultdict
+from functools import partial
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    DefaultDict,
+    Dict,
+    List,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from uuid import uuid4
 
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
-from aiokafka.structs import ConsumerRecord
-from typing_extensions import TypeAlias, TypeVar
+from aiokafka.structs import ConsumerRecord, TopicPartition
 
 from propan.__about__ import __version__
 from propan.brokers._model.broker_usecase import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.exceptions import SkipMessage
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers._model.utils import (
+    ConcurrentDispatcher,
+    FakeContext,
+    get_batch_headers,
+)
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.correlation import CorrelationManager
+from propan.brokers.dedup import Dedup
 from propan.brokers.kafka.schemas import Handler
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    RetryPolicy,
+    RetryWatcher,
+    WatcherContext,
+)
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling
 from propan.types import (
     AnyCallable,
     AnyDict,
@@ -23,9 +51,10 @@ from propan.types import (
     Wrapper,
 )
 from propan.utils.context import context
+from propan.utils.functions import maybe_await
 
-T = TypeVar("T")
-CorrelationId: TypeAlias = str
+# max responses read from the response topic at once
+RESPONSES_BATCH_SIZE = 500
 
 
 class KafkaBroker(BrokerUsecase):
@@ -33,7 +62,7 @@ class KafkaBroker(BrokerUsecase):
     _connection: Callable[[Tuple[str, ...]], AIOKafkaConsumer]
     __max_topic_len: int
     response_topic: str
-    response_callbacks: Dict[CorrelationId, "asyncio.Future[DecodedMessage]"]
+    responses: CorrelationManager[PropanMessage]
     handlers: List[Handler]
 
     def __init__(
@@ -41,6 +70,7 @@ class KafkaBroker(BrokerUsecase):
         bootstrap_servers: Union[str, List[str]] = "localhost",
         *,
         response_topic: str = "",
+        max_pending_responses: int = 10_000,
         log_fmt: Optional[str] = None,
         **kwargs: AnyDict,
     ) -> None:
@@ -48,7 +78,17 @@ class KafkaBroker(BrokerUsecase):
         self.__max_topic_len = 4
         self._publisher = None
         self.response_topic = response_topic
-        self.response_callbacks = {}
+        self.responses = CorrelationManager(max_pending_responses)
+        self._response_consumer: Optional[AIOKafkaConsumer] = None
+        self._response_task: Optional["asyncio.Task[Any]"] = None
+
+        if self.metrics is not None and response_topic:
+            self.metrics.gauge(
+                "rpc_pending_requests",
+                "RPC requests waiting for a response",
+                lambda: self.responses.pending,
+                topic=response_topic,
+            )
 
     async def _connect(
         self,
@@ -86,19 +126,38 @@ class KafkaBroker(BrokerUsecase):
         return partial(AIOKafkaConsumer, **consumer_kwargs)
 
     async def close(self) -> None:
-        for f in self.response_callbacks.values():
-            f.cancel()
-        self.response_callbacks = {}
+        self.responses.cancel()
+
+        if self._response_task is not None:
+            self._response_task.cancel()
+            self._response_task = None
+
+        if self._response_consumer is not None:
+            await self._response_consumer.stop()
+            self._response_consumer = None
 
         for handler in self.handlers:
             if handler.task is not None:
                 handler.task.cancel()
                 handler.task = None
 
+            if handler.dispatcher is not None:
+                await handler.dispatcher.wait_closed()
+
+            if handler.offsets is not None:
+                if handler.consumer is not None:
+                    try:
+                        await handler.offsets.commit(handler.consumer, force=True)
+                    except Exception as e:
+                        self._log(e, logging.WARNING)
+                handler.offsets = None
+
             if handler.consumer is not None:
                 await handler.consumer.stop()
                 handler.consumer = None
 
+        await self._close_dead_letters()
+
         if self._publisher is not None:
             await self._publisher.stop()
             self._publisher = None
@@ -106,6 +165,16 @@ class KafkaBroker(BrokerUsecase):
     def handle(
         self,
         *topics: str,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        retry: Union[bool, int, RetryPolicy] = False,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         _raw: bool = False,
         **kwargs: AnyDict,
     ) -> Wrapper:
@@ -113,12 +182,39 @@ class KafkaBroker(BrokerUsecase):
             for t in topics:
                 self.__max_topic_len = max((self.__max_topic_len, len(t)))
 
-            func = self._wrap_handler(func, _raw=_raw)
+            watcher = self._get_watcher(retry)
+            func = self._wrap_handler(
+                func,
+                retry=False if watcher is None else watcher,  # type: ignore[arg-type]
+                topics=topics,
+                batch=batch,
+                codec=codec,
+                log_sampling=log_sampling,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                cache=cache,
+                _raw=_raw,
+            )
             handler = Handler(
                 callback=func,
                 topics=topics,
+                batch=batch,
+                max_batch_size=max_batch_size,
+                max_batch_wait=max_batch_wait,
+                watcher=watcher,
                 consumer_kwargs=kwargs,
             )
+            if max_concurrency is not None:
+                if kwargs.get("enable_auto_commit") is True:
+                    raise ValueError(
+                        "`enable_auto_commit` can't be used with `max_concurrency`: "
+                        "offsets of the messages in progress would be committed"
+                    )
+                # offsets are committed by `OffsetsTracker` when processed
+                kwargs["enable_auto_commit"] = False
+                handler.dispatcher = ConcurrentDispatcher(
+                    partial(self._process, handler), max_concurrency
+                )
             self.handlers.append(handler)
 
             return func
@@ -126,13 +222,6 @@ class KafkaBroker(BrokerUsecase):
         return wrapper
 
     async def start(self) -> None:
-        if self.response_topic:
-            self.handle(
-                self.response_topic,
-                _raw=True,
-                enable_auto_commit=False,
-            )(self._consume_response)
-
         context.set_local(
             "log_context",
             self._get_log_context(None, ""),
@@ -140,6 +229,12 @@ class KafkaBroker(BrokerUsecase):
 
         await super().start()
 
+        if self.response_topic:
+            consumer = self._connection(self.response_topic)
+            await consumer.start()
+            self._response_consumer = consumer
+            self._response_task = asyncio.create_task(self._consume_responses(consumer))
+
         for handler in self.handlers:  # pragma: no branch
             c = self._get_log_context(None, handler.topics)
             self._log(f"`{handler.callback.__name__}` waiting for messages", extra=c)
@@ -147,37 +242,68 @@ class KafkaBroker(BrokerUsecase):
             consumer = self._connection(*handler.topics, **handler.consumer_kwargs)
             await consumer.start()
             handler.consumer = consumer
-            handler.task = asyncio.create_task(self._consume(handler))
+            handler.offsets = self._get_offsets_tracker(handler)
+
+            if handler.batch is True:
+                handler.task = asyncio.create_task(self._consume_batch(handler))
+            else:
+                handler.task = asyncio.create_task(self._consume(handler))
+
+    def _get_watcher(
+        self,
+        retry: Union[bool, int, RetryPolicy, BaseWatcher],
+        **broker_args: Any,
+    ) -> Optional[BaseWatcher]:
+        if isinstance(retry, BaseWatcher):
+            # built by `handle` to share it with the consumer
+            return retry
+        if retry is True:
+            raise ValueError(
+                "KafkaBroker retries the message in place blocking the partition, "
+                "so `retry` should be limited"
+            )
+        return super()._get_watcher(retry, **broker_args)
+
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]:
+        if watcher is None:
+            return FakeContext()
+        return WatcherContext(watcher, message.message_id)
 
     @staticmethod
     async def _parse_message(message: ConsumerRecord) -> PropanMessage:
-        headers = {i: j.decode() for i, j in message.headers}
+        content_type: Optional[str] = None
+        reply_to = ""
+        for i, j in message.headers:
+            if i == "content-type":
+                content_type = j.decode()
+            elif i == "reply_to":
+                reply_to = j.decode()
+
         return PropanMessage(
             body=message.value,
             raw_message=message,
-            message_id=f"{message.offset}-{message.timestamp}",
-            reply_to=headers.get("reply_to", ""),
-            content_type=headers.get("content-type"),
-            headers=headers,
+            message_id=_get_message_id(message),
+            reply_to=reply_to,
+            content_type=content_type,
+            headers=lambda: {i: j.decode() for i, j in message.headers},
         )
 
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher]
-    ) -> Callable[[PropanMessage], T]:
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            r = await func(message)
-
-            if message.reply_to:
-                await self.publish(
-                    message=r or "",
-                    headers={"correlation_id": message.headers.get("correlation_id")},
-                    topic=message.reply_to,
-                )
-
-            return r
-
-        return wrapper
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(
+            message=result or "",
+            headers={"correlation_id": message.headers.get("correlation_id")},
+            topic=message.reply_to,
+            codec=codec,
+        )
 
     async def publish(
         self,
@@ -192,8 +318,9 @@ class KafkaBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = None,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]:
-        message, content_type = super()._encode_message(message)
+        message, content_type = super()._encode_message(message, self._get_codec(codec))
 
         headers_to_send = {
             "content-type": content_type or "",
@@ -218,14 +345,8 @@ class KafkaBroker(BrokerUsecase):
         else:
             correlation_id = ""
 
-        response_future: Optional["asyncio.Future[DecodedMessage]"]
-        if callback is True:
-            response_future = asyncio.Future()
-            self.response_callbacks[correlation_id] = response_future
-        else:
-            response_future = None
-
-        await self._publisher.send(
+        send = partial(
+            self._publisher.send,
             topic=topic,
             value=message,
             key=key,
@@ -234,15 +355,83 @@ class KafkaBroker(BrokerUsecase):
             headers=[(i, j.encode()) for i, j in headers_to_send.items()],
         )
 
-        if response_future is not None:
+        if callback is False:
+            await send()
+            return None
+
+        async with self.responses.expect(correlation_id) as response_future:
+            await send()
             try:
                 response = await asyncio.wait_for(response_future, callback_timeout)
             except asyncio.TimeoutError as e:
                 if raise_timeout is True:
                     raise e
                 return None
-            else:
-                return response
+
+        return await self._decode_message(response)
+
+    async def publish_batch(
+        self,
+        messages: Sequence[SendableMessage],
+        topic: str,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+        *,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
+        if partition is None:
+            partition = random.choice(
+                tuple(await self._publisher.partitions_for(topic))
+            )
+
+        c = self._get_codec(codec)
+        results: List[Optional[PublishResult]] = [None] * len(messages)
+        sent: List[Tuple[List[int], "asyncio.Future[Any]"]] = []
+
+        batch = self._publisher.create_batch()
+        indexes: List[int] = []
+        for i, m in enumerate(messages):
+            value, content_type = self._encode_message(m, c)
+            headers_to_send = {
+                "content-type": content_type or "",
+                **get_batch_headers(headers, message_headers, i),
+            }
+            record = {
+                "key": None,
+                "value": value,
+                "timestamp": timestamp_ms,
+                "headers": [(k, v.encode()) for k, v in headers_to_send.items()],
+            }
+
+            if batch.append(**record) is None:
+                # the batch is full, so send it and start a new one
+                if indexes:
+                    future = await self._publisher.send_batch(
+                        batch, topic, partition=partition
+                    )
+                    sent.append((indexes, future))
+                    batch, indexes = self._publisher.create_batch(), []
+
+                if batch.append(**record) is None:
+                    results[i] = PublishResult(
+                        m, error=ValueError("Message is too large for a batch")
+                    )
+                    continue
+
+            indexes.append(i)
+
+        if indexes:
+            future = await self._publisher.send_batch(batch, topic, partition=partition)
+            sent.append((indexes, future))
+
+        for indexes, future in sent:
+            r = (await asyncio.gather(future, return_exceptions=True))[0]
+            for i in indexes:
+                results[i] = PublishResult.from_result(messages[i], r)
+
+        return results  # type: ignore[return-value]
 
     @property
     def fmt(self) -> str:
@@ -258,34 +447,226 @@ class KafkaBroker(BrokerUsecase):
         message: Optional[PropanMessage],
         topics: Sequence[str] = (),
     ) -> Dict[str, Any]:
-        if topics:
-            topic = ", ".join(topics)
-        elif message is not None:
+        if message is not None:
             topic = message.raw_message.topic
         else:
-            topic = ""
+            topic = ", ".join(topics)
 
         return {
             "topic": topic,
             **super()._get_log_context(message),
         }
 
+    def _get_log_context_factory(
+        self,
+        topics: Sequence[str] = (),
+        **kwargs: Any,
+    ) -> Callable[[PropanMessage], Dict[str, Any]]:
+        factory = super()._get_log_context_factory(topics=topics, **kwargs)
+        if len(topics) == 1:
+            return factory
+
+        def get_log_context(message: PropanMessage) -> Dict[str, Any]:
+            log_context = factory(message)
+            log_context["topic"] = message.raw_message.topic
+            return log_context
+
+        return get_log_context
+
+    def _get_publish_log_context(
+        self, topic: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        return {"topic": topic}
+
     async def _consume(self, handler: Handler) -> NoReturn:
         c = self._get_log_context(None, handler.topics)
 
+        dispatcher = handler.dispatcher
+        tracker = handler.offsets
+
+        if tracker is not None:
+            # poll with a timeout to commit finished offsets on an idle topic too
+            timeout_ms = int(tracker.commit_interval * 1000)
+
+            while True:
+                try:
+                    partitions = await handler.consumer.getmany(timeout_ms=timeout_ms)
+                except Exception as e:
+                    self._log(e, logging.WARNING, c)
+                else:
+                    for records in partitions.values():
+                        for msg in records:
+                            task = await dispatcher(msg)  # type: ignore[misc]
+                            tracker.track((msg,), task)
+
+                await tracker.commit(handler.consumer)
+
         while True:
             try:
                 msg = await handler.consumer.getone()
             except Exception as e:
-                self._log(e, logging.WATNING, c)
+                self._log(e, logging.WARNING, c)
             else:
-                await handler.callback(msg)
+                if dispatcher is None:
+                    await self._process(handler, msg)
+                else:
+                    await dispatcher(msg)
+
+    async def _consume_batch(self, handler: Handler) -> NoReturn:
+        c = self._get_log_context(None, handler.topics)
+
+        auto_commit = handler.consumer_kwargs.get("enable_auto_commit", True)
+        timeout_ms = int(handler.max_batch_wait * 1000)
+
+        dispatcher = handler.dispatcher
+        tracker = handler.offsets
+
+        while True:
+            try:
+                partitions = await handler.consumer.getmany(
+                    timeout_ms=timeout_ms,
+                    max_records=handler.max_batch_size,
+                )
+            except Exception as e:
+                self._log(e, logging.WARNING, c)
+                continue
+
+            messages = [m for records in partitions.values() for m in records]
+
+            if dispatcher is not None:
+                if messages:
+                    task = await dispatcher(messages)
+                    if tracker is not None:
+                        tracker.track(messages, task)
+                if tracker is not None:
+                    await tracker.commit(handler.consumer)
+                continue
+
+            if not messages:
+                continue
 
-    async def _consume_response(self, message: PropanMessage):
-        correlation_id = message.headers.get("correlation_id")
-        if correlation_id is not None:
-            callback = self.response_callbacks.pop(correlation_id, None)
-            if callback is not None:
-                callback.set_result(await self._decode_message(message))
+            await self._process(handler, messages)
+            if auto_commit is False:
+                await handler.consumer.commit()
 
-        raise SkipMessage()
+    async def _process(
+        self,
+        handler: Handler,
+        message: Union[ConsumerRecord, List[ConsumerRecord]],
+    ) -> None:
+        """Calls the handler retrying the failed message (or batch) in place
+
+        The message is given up (and sent to the dead letter topic) after the
+        handler `retry` tries, so its offset is committed as processed.
+        """
+        watcher = handler.watcher
+        message_id = _get_message_id(
+            message[0] if isinstance(message, list) else message
+        )
+
+        retry = 0
+        while True:
+            try:
+                await handler.callback(message, True)
+            except Exception:
+                if watcher is None or not await maybe_await(
+                    watcher.is_pushed_back(message_id)
+                ):
+                    return
+
+                retry += 1
+                if isinstance(watcher, RetryWatcher):
+                    await asyncio.sleep(watcher.policy.get_delay(retry))
+            else:
+                return
+
+    @staticmethod
+    def _get_offsets_tracker(handler: Handler) -> Optional["OffsetsTracker"]:
+        if handler.dispatcher is None:
+            return None
+
+        interval_ms = handler.consumer_kwargs.get("auto_commit_interval_ms", 5000)
+        return OffsetsTracker(commit_interval=interval_ms / 1000)
+
+    async def _consume_responses(self, consumer: AIOKafkaConsumer) -> NoReturn:
+        c = self._get_log_context(None, (self.response_topic,))
+
+        while True:
+            try:
+                partitions = await consumer.getmany(
+                    timeout_ms=1000,
+                    max_records=RESPONSES_BATCH_SIZE,
+                )
+            except Exception as e:
+                self._log(e, logging.WARNING, c)
+                continue
+
+            for records in partitions.values():
+                for record in records:
+                    for name, value in record.headers:
+                        if name == "correlation_id":
+                            self.responses.resolve(
+                                value.decode(), await self._parse_message(record)
+                            )
+                            break
+
+
+def _get_message_id(message: ConsumerRecord) -> str:
+    return f"{message.topic}-{message.partition}-{message.offset}"
+
+
+class OffsetsTracker:
+    """Tracks offsets of concurrently processed messages
+
+    Kafka commits a position in a partition, so the offset can be committed
+    only if all the previous messages of this partition are processed. Handlers
+    with `max_concurrency` always use it instead of the consumer auto commit.
+    """
+
+    def __init__(self, commit_interval: float = 5.0) -> None:
+        self.commit_interval = commit_interval
+        self._pending: DefaultDict[TopicPartition, Set[int]] = defaultdict(set)
+        self._processed: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        self._last_commit = 0.0
+
+    def track(
+        self,
+        messages: Sequence[ConsumerRecord],
+        task: "asyncio.Task[Any]",
+    ) -> None:
+        for m in messages:
+            self._pending[TopicPartition(m.topic, m.partition)].add(m.offset)
+
+        def done(t: "asyncio.Task[Any]") -> None:
+            # interrupted messages stay pending to be redelivered
+            if not t.cancelled() and t.exception() is None:
+                self._done(messages)
+
+        task.add_done_callback(done)
+
+    def _done(self, messages: Sequence[ConsumerRecord]) -> None:
+        for m in messages:
+            tp = TopicPartition(m.topic, m.partition)
+            self._pending[tp].discard(m.offset)
+            self._processed[tp] = max(self._processed.get(tp, -1), m.offset)
+
+    def get_offsets(self) -> Dict[TopicPartition, int]:
+        offsets = {}
+        for tp, last in self._processed.items():
+            pending = self._pending[tp]
+            offset = min(pending) if pending else last + 1
+            if offset > self._committed.get(tp, -1):
+                offsets[tp] = offset
+        return offsets
+
+    async def commit(self, consumer: AIOKafkaConsumer, force: bool = False) -> None:
+        now = asyncio.get_event_loop().time()
+        if not force and now - self._last_commit < self.commit_interval:
+            return
+
+        offsets = self.get_offsets()
+        if offsets:
+            self._last_commit = now
+            await consumer.commit(offsets)
+            self._committed.update(offsets)
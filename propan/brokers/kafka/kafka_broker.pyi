@@ -1,7 +1,17 @@
 import logging
-from asyncio import AbstractEventLoop, Future
+from asyncio import AbstractEventLoop
 from ssl import SSLContext
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
 from aiokafka.abc import AbstractTokenProvider
@@ -10,26 +20,35 @@ from aiokafka.structs import ConsumerRecord
 from kafka.coordinator.assignors.abstract import AbstractPartitionAssignor
 from kafka.coordinator.assignors.roundrobin import RoundRobinPartitionAssignor
 from kafka.partitioner.default import DefaultPartitioner
-from typing_extensions import Literal, TypeAlias, TypeVar
+from typing_extensions import Literal, TypeVar
 
 from propan.__about__ import __version__
 from propan.brokers._model.broker_usecase import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.correlation import CorrelationManager
+from propan.brokers.dedup import Dedup
 from propan.brokers.kafka.schemas import Handler
-from propan.brokers.push_back_watcher import BaseWatcher
-from propan.log import access_logger
-from propan.types import DecodedMessage, SendableMessage, Wrapper
+from propan.brokers.metrics import Metrics
+from propan.brokers.profiler import Profiler
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    BaseWatcherStore,
+    RetryPolicy,
+)
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling, access_logger
+from propan.types import DecodedMessage, DecoratedAsync, SendableMessage, Wrapper
 
 T = TypeVar("T")
 Partition = TypeVar("Partition")
-CorrelationId: TypeAlias = str
 
 class KafkaBroker(BrokerUsecase):
     _publisher: Optional[AIOKafkaProducer]
     _connection: Callable[[Tuple[str, ...]], AIOKafkaConsumer]
     __max_topic_len: int
     response_topic: str
-    response_callbacks: Dict[CorrelationId, "Future[DecodedMessage]"]
+    responses: CorrelationManager[PropanMessage]
     handlers: List[Handler]
 
     def __init__(
@@ -37,6 +56,7 @@ class KafkaBroker(BrokerUsecase):
         bootstrap_servers: Union[str, List[str]] = "localhost",
         *,
         response_topic: str = "",
+        max_pending_responses: int = 10_000,
         # both
         client_id: str = "propan-" + __version__,
         request_timeout_ms: int = 40 * 1000,
@@ -82,7 +102,14 @@ class KafkaBroker(BrokerUsecase):
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = None,
+        async_logging: bool = False,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
     ) -> None: ...
     async def connect(
         self,
@@ -164,14 +191,25 @@ class KafkaBroker(BrokerUsecase):
             "read_uncommitted",
             "read_committed",
         ] = "read_uncommitted",
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
     ) -> Wrapper: ...
     async def start(self) -> None: ...
     @staticmethod
     async def _parse_message(message: ConsumerRecord) -> PropanMessage: ...
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher]
-    ) -> Callable[[PropanMessage], T]: ...
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]: ...
     async def publish(  # type: ignore[override]
         self,
         message: SendableMessage,
@@ -185,7 +223,38 @@ class KafkaBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = None,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]: ...
+    def redrive(  # type: ignore[override]
+        self,
+        dead_letter: str,
+        source: str,
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Args:
+            dead_letter: dead-letter topic to consume
+            source: topic to publish messages back to
+            rate: maximum messages number to publish per second
+            handle_kwargs: `handle` method options
+
+        Returns:
+            Registered handler
+        """
+    async def publish_batch(  # type: ignore[override]
+        self,
+        messages: Sequence[SendableMessage],
+        topic: str,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+        *,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]: ...
     @property
     def fmt(self) -> str: ...
     def _get_log_context(  # type: ignore[override]
@@ -193,3 +262,10 @@ class KafkaBroker(BrokerUsecase):
         message: Optional[PropanMessage],
         topics: Sequence[str] = (),
     ) -> Dict[str, Any]: ...
+    def _get_log_context_factory(  # type: ignore[override]
+        self,
+        topics: Sequence[str] = (),
+    ) -> Callable[[PropanMessage], Dict[str, Any]]: ...
+    def _get_publish_log_context(  # type: ignore[override]
+        self, topic: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]: ...
@@ -1,17 +1,27 @@
 import asyncio
 from dataclasses import dataclass, field
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from aiokafka import AIOKafkaConsumer
 
 from propan.brokers._model.schemas import BaseHandler
+from propan.brokers.push_back_watcher import BaseWatcher
 from propan.types import AnyDict
 
+if TYPE_CHECKING:
+    from propan.brokers.kafka.kafka_broker import OffsetsTracker
+
 
 @dataclass
 class Handler(BaseHandler):
     topics: List[str]
 
+    batch: bool = False
+    max_batch_size: int = 10
+    max_batch_wait: float = 0.5
+    watcher: Optional[BaseWatcher] = None
+
     consumer: Optional[AIOKafkaConsumer] = None
     task: Optional["asyncio.Task[Any]"] = None
+    offsets: Optional["OffsetsTracker"] = field(default=None, init=False)
     consumer_kwargs: AnyDict = field(default_factory=dict)
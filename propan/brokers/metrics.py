@@ -0,0 +1,295 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+__all__ = (
+    "Histogram",
+    "HandlerMetrics",
+    "PublishMetrics",
+    "Metrics",
+    "DEFAULT_BUCKETS",
+)
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # the last one is `+Inf` bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Bucket upper bounds with the cumulative counts as Prometheus expects"""
+        result = []
+        total = 0
+        for bound, c in zip((*map(_format_value, self.buckets), "+Inf"), self.counts):
+            total += c
+            result.append((bound, total))
+        return result
+
+
+class HandlerMetrics:
+    __slots__ = (
+        "labels",
+        "received",
+        "processed",
+        "skipped",
+        "failed",
+        "retried",
+        "duplicates",
+        "in_flight",
+        "latency",
+    )
+
+    def __init__(self, labels: Labels, buckets: Sequence[float]) -> None:
+        self.labels = labels
+        self.received = 0
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.retried = 0
+        self.duplicates = 0
+        self.in_flight = 0
+        self.latency = Histogram(buckets)
+
+
+class PublishMetrics:
+    __slots__ = ("labels", "published", "failed", "latency")
+
+    def __init__(self, labels: Labels, buckets: Sequence[float]) -> None:
+        self.labels = labels
+        self.published = 0
+        self.failed = 0
+        self.latency = Histogram(buckets)
+
+
+class Metrics:
+    """Broker handlers and publishers metrics storage
+
+    Pass it to the broker to collect the metrics and use `export` to get
+    them in the Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "propan",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.prefix = prefix
+        self.buckets = buckets
+        self.handlers: Dict[Labels, HandlerMetrics] = {}
+        self.publishers: Dict[Labels, PublishMetrics] = {}
+        # name: (help, {labels: value getter})
+        self.gauges: Dict[str, Tuple[str, Dict[Labels, Callable[[], float]]]] = {}
+
+    def handler(self, **labels: Any) -> HandlerMetrics:
+        key = _labels(labels)
+        m = self.handlers.get(key)
+        if m is None:
+            m = self.handlers[key] = HandlerMetrics(key, self.buckets)
+        return m
+
+    def publisher(self, **labels: Any) -> PublishMetrics:
+        key = _labels(labels)
+        m = self.publishers.get(key)
+        if m is None:
+            m = self.publishers[key] = PublishMetrics(key, self.buckets)
+        return m
+
+    def gauge(
+        self,
+        name: str,
+        help_: str,
+        get: Callable[[], float],
+        **labels: Any,
+    ) -> None:
+        """Registers the gauge reading its value by `get` at export"""
+        if name not in self.gauges:
+            self.gauges[name] = (help_, {})
+        self.gauges[name][1][_labels(labels)] = get
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Current metrics values as plain python objects"""
+        return {
+            "handlers": [
+                {
+                    "labels": dict(m.labels),
+                    "received": m.received,
+                    "processed": m.processed,
+                    "skipped": m.skipped,
+                    "failed": m.failed,
+                    "retried": m.retried,
+                    "duplicates": m.duplicates,
+                    "in_flight": m.in_flight,
+                    "latency_sum": m.latency.sum,
+                    "latency_count": m.latency.count,
+                }
+                for m in self.handlers.values()
+            ],
+            "publishers": [
+                {
+                    "labels": dict(m.labels),
+                    "published": m.published,
+                    "failed": m.failed,
+                    "latency_sum": m.latency.sum,
+                    "latency_count": m.latency.count,
+                }
+                for m in self.publishers.values()
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": get()}
+                for name, (_, values) in self.gauges.items()
+                for labels, get in values.items()
+            ],
+        }
+
+    def export(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        handlers = self.handlers.values()
+        publishers = self.publishers.values()
+
+        for name, attr, help_ in (
+            ("messages_received_total", "received", "Messages received"),
+            ("messages_processed_total", "processed", "Messages processed"),
+            ("messages_skipped_total", "skipped", "Messages skipped"),
+            ("messages_failed_total", "failed", "Messages failed"),
+            ("messages_retried_total", "retried", "Messages pushed back to retry"),
+            ("messages_duplicated_total", "duplicates", "Duplicate messages skipped"),
+        ):
+            self._add_metric(lines, name, "counter", help_, handlers, attr)
+
+        self._add_metric(
+            lines,
+            "messages_in_flight",
+            "gauge",
+            "Messages processing at the moment",
+            handlers,
+            "in_flight",
+        )
+        self._add_histogram(
+            lines,
+            "handler_duration_seconds",
+            "Message processing time",
+            handlers,
+        )
+
+        self._add_metric(
+            lines,
+            "messages_published_total",
+            "counter",
+            "Messages published",
+            publishers,
+            "published",
+        )
+        self._add_metric(
+            lines,
+            "publish_errors_total",
+            "counter",
+            "Messages failed to publish",
+            publishers,
+            "failed",
+        )
+        self._add_histogram(
+            lines,
+            "publish_duration_seconds",
+            "Message publishing time",
+            publishers,
+        )
+
+        for name, (help_, values) in self.gauges.items():
+            name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, get in values.items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(get())}")
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _add_metric(
+        self,
+        lines: List[str],
+        name: str,
+        type_: str,
+        help_: str,
+        metrics: Iterable[Any],
+        attr: str,
+    ) -> None:
+        name = f"{self.prefix}_{name}"
+        header = False
+        for m in metrics:
+            if header is False:
+                lines.append(f"# HELP {name} {help_}")
+                lines.append(f"# TYPE {name} {type_}")
+                header = True
+            lines.append(
+                f"{name}{_format_labels(m.labels)} {_format_value(getattr(m, attr))}"
+            )
+
+    def _add_histogram(
+        self,
+        lines: List[str],
+        name: str,
+        help_: str,
+        metrics: Iterable[Any],
+    ) -> None:
+        name = f"{self.prefix}_{name}"
+        header = False
+        for m in metrics:
+            if header is False:
+                lines.append(f"# HELP {name} {help_}")
+                lines.append(f"# TYPE {name} histogram")
+                header = True
+
+            h: Histogram = m.latency
+            for bound, count in h.cumulative():
+                labels = _format_labels((*m.labels, ("le", bound)))
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _format_labels(m.labels)
+            lines.append(f"{name}_sum{labels} {_format_value(h.sum)}")
+            lines.append(f"{name}_count{labels} {h.count}")
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    values = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{{{values}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,22 +1,29 @@
 import asyncio
 import logging
-from functools import wraps
 from secrets import token_hex
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 import nats
 from nats.aio.client import Callback, Client, ErrorCallback
 from nats.aio.msg import Msg
+from nats.aio.subscription import Subscription
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers._model.utils import (
+    ConcurrentDispatcher,
+    consume_batches,
+    get_batch_headers,
+)
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
 from propan.brokers.nats.schemas import Handler
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers.push_back_watcher import RetryPolicy
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling
 from propan.types import AnyDict, DecodedMessage, DecoratedCallable, SendableMessage
 from propan.utils import context
 
-T = TypeVar("T")
-
 
 class NatsBroker(BrokerUsecase):
     handlers: List[Handler]
@@ -26,6 +33,10 @@ class NatsBroker(BrokerUsecase):
     __max_subject_len: int
     __is_connected: bool
 
+    _reply_futures: Dict[str, "asyncio.Future[Msg]"]
+    _reply_subscription: Optional[Subscription]
+    _stable_message_id = False
+
     def __init__(
         self,
         servers: Union[str, List[str]] = ["nats://localhost:4222"],  # noqa: B006
@@ -41,6 +52,11 @@ class NatsBroker(BrokerUsecase):
         self.__max_subject_len = 4
         self.__is_connected = True
 
+        self._reply_prefix = ""
+        self._reply_lock: Optional[asyncio.Lock] = None
+        self._reply_futures = {}
+        self._reply_subscription = None
+
     async def _connect(
         self,
         *,
@@ -62,7 +78,16 @@ class NatsBroker(BrokerUsecase):
         subject: str,
         queue: str = "",
         *,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         _raw: bool = False,
     ) -> Callable[[DecoratedCallable], None]:
         self.__max_subject_len = max((self.__max_subject_len, len(subject)))
@@ -74,9 +99,24 @@ class NatsBroker(BrokerUsecase):
                 queue=queue,
                 subject=subject,
                 retry=retry,
+                batch=batch,
+                codec=codec,
+                log_sampling=log_sampling,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                cache=cache,
                 _raw=_raw,
             )
-            handler = Handler(callback=func, subject=subject, queue=queue)
+            handler = Handler(
+                callback=func,
+                subject=subject,
+                queue=queue,
+                batch=batch,
+                max_batch_size=max_batch_size,
+                max_batch_wait=max_batch_wait,
+            )
+            if max_concurrency is not None:
+                handler.dispatcher = ConcurrentDispatcher(func, max_concurrency)
             self.handlers.append(handler)
 
             return func
@@ -92,15 +132,29 @@ class NatsBroker(BrokerUsecase):
         await super().start()
 
         for handler in self.handlers:
-            func = handler.callback
+            func = handler.dispatcher or handler.callback
 
             c = self._get_log_context(None, handler.subject, handler.queue)
             self._log(f"`{func.__name__}` waiting for messages", extra=c)
 
+            if handler.batch is True:
+                buffer: "asyncio.Queue[Msg]" = asyncio.Queue()
+                cb = buffer.put
+                handler.task = asyncio.create_task(
+                    consume_batches(
+                        func,
+                        buffer,
+                        handler.max_batch_size,
+                        handler.max_batch_wait,
+                    )
+                )
+            else:
+                cb = func
+
             sub = await self._connection.subscribe(
                 subject=handler.subject,
                 queue=handler.queue,
-                cb=func,
+                cb=cb,
             )
             handler.subscription = sub
 
@@ -114,18 +168,26 @@ class NatsBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]:
         if self._connection is None:
             raise ValueError("NatsConnection not started yet")
 
-        msg, content_type = self._encode_message(message)
+        msg, content_type = self._encode_message(message, self._get_codec(codec))
 
         client = self._connection
 
         if callback is True and not reply_to:
-            token = client._nuid.next()
-            token.extend(token_hex(2).encode())
-            reply_to = token.decode()
+            return await self._request(
+                msg,
+                subject,
+                headers={
+                    **(headers or {}),
+                    "content-type": content_type or "",
+                },
+                callback_timeout=callback_timeout,
+                raise_timeout=raise_timeout,
+            )
 
         if reply_to:
             future: asyncio.Future[Msg] = asyncio.Future()
@@ -160,12 +222,139 @@ class NatsBroker(BrokerUsecase):
             else:
                 return await self._decode_message(await self._parse_message(msg))
 
+    async def _request(
+        self,
+        payload: bytes,
+        subject: str,
+        headers: Dict[str, str],
+        callback_timeout: Optional[float],
+        raise_timeout: bool,
+    ) -> Optional[DecodedMessage]:
+        """Sends the request with the reply to the shared inbox subject"""
+        client = self._connection
+        assert client, "NatsConnection not started yet"
+
+        await self._subscribe_replies()
+
+        token = client._nuid.next()
+        token.extend(token_hex(2).encode())
+        key = token.decode()
+
+        future: "asyncio.Future[Msg]" = asyncio.get_event_loop().create_future()
+        self._reply_futures[key] = future
+        try:
+            await client.publish(
+                subject=subject,
+                payload=payload,
+                reply=f"{self._reply_prefix}.{key}",
+                headers=headers,
+            )
+            msg = await asyncio.wait_for(future, callback_timeout)
+        except asyncio.TimeoutError as e:
+            if raise_timeout is True:
+                raise e
+            return None
+        finally:
+            self._reply_futures.pop(key, None)
+
+        if (
+            msg.headers
+            and msg.headers.get(nats.js.api.Header.STATUS)
+            == nats.aio.client.NO_RESPONDERS_STATUS
+        ):
+            raise nats.errors.NoRespondersError
+
+        return await self._decode_message(await self._parse_message(msg))
+
+    async def _subscribe_replies(self) -> None:
+        """Subscribes to the wildcard inbox for all RPC responses once"""
+        if self._reply_subscription is not None:
+            return
+
+        if self._reply_lock is None:
+            self._reply_lock = asyncio.Lock()
+
+        async with self._reply_lock:
+            if self._reply_subscription is None:  # pragma: no branch
+                client = self._connection
+                assert client, "NatsConnection not started yet"
+
+                prefix = client.new_inbox()
+                self._reply_subscription = await client.subscribe(
+                    f"{prefix}.*", cb=self._on_reply
+                )
+                self._reply_prefix = prefix
+
+    async def _on_reply(self, msg: Msg) -> None:
+        token = msg.subject[len(self._reply_prefix) + 1 :]
+        future = self._reply_futures.pop(token, None)
+        if future is not None and not future.done():
+            future.set_result(msg)
+
+    async def publish_batch(
+        self,
+        messages: Sequence[SendableMessage],
+        subject: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
+        if self._connection is None:
+            raise ValueError("NatsConnection not started yet")
+
+        c = self._get_codec(codec)
+
+        results: List[PublishResult] = []
+        for i, m in enumerate(messages):
+            msg, content_type = self._encode_message(m, c)
+            try:
+                # messages are buffered by the client and flushed together
+                await self._connection.publish(
+                    subject=subject,
+                    payload=msg,
+                    headers={
+                        **get_batch_headers(headers, message_headers, i),
+                        "content-type": content_type or "",
+                    },
+                )
+            except Exception as e:
+                results.append(PublishResult(m, error=e))
+            else:
+                results.append(PublishResult(m))
+
+        try:
+            await self._connection.flush()
+        except Exception as e:
+            for r in results:
+                if r.error is None:
+                    r.error = e
+
+        return results
+
     async def close(self) -> None:
         for h in self.handlers:
+            if h.task is not None:
+                h.task.cancel()
+                h.task = None
+
             if h.subscription is not None:
                 await h.subscription.unsubscribe()
                 h.subscription = None
 
+            if h.dispatcher is not None:
+                await h.dispatcher.wait_closed()
+
+        await self._close_dead_letters()
+
+        if self._reply_subscription is not None:
+            await self._reply_subscription.unsubscribe()
+            self._reply_subscription = None
+
+        for f in self._reply_futures.values():
+            f.cancel()
+        self._reply_futures = {}
+
         if self._connection is not None:
             await self._connection.drain()
             self._connection = None
@@ -183,6 +372,11 @@ class NatsBroker(BrokerUsecase):
         }
         return context
 
+    def _get_publish_log_context(
+        self, subject: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        return {"subject": subject}
+
     @property
     def fmt(self) -> str:
         return self._fmt or (
@@ -202,19 +396,13 @@ class NatsBroker(BrokerUsecase):
             raw_message=message,
         )
 
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher] = None
-    ) -> Callable[[PropanMessage], T]:
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            r = await func(message)
-
-            if message.reply_to:
-                await self.publish(r, message.reply_to)
-
-            return r
-
-        return wrapper
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(result, message.reply_to, codec=codec)
 
     def log_connection_broken(
         self, error_cb: Optional[ErrorCallback] = None
@@ -1,6 +1,15 @@
 import logging
 import ssl
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from typing import (
+    Any,
+    AsyncContextManager,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
 
 from nats.aio.client import (
     DEFAULT_CONNECT_TIMEOUT,
@@ -22,11 +31,20 @@ from nats.aio.client import (
 from nats.aio.msg import Msg
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
+from propan.brokers.metrics import Metrics
 from propan.brokers.nats.schemas import Handler
-from propan.brokers.push_back_watcher import BaseWatcher
-from propan.log import access_logger
-from propan.types import DecodedMessage, HandlerWrapper, SendableMessage
+from propan.brokers.profiler import Profiler
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    BaseWatcherStore,
+    RetryPolicy,
+)
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling, access_logger
+from propan.types import DecodedMessage, DecoratedAsync, HandlerWrapper, SendableMessage
 
 T = TypeVar("T")
 
@@ -72,7 +90,14 @@ class NatsBroker(BrokerUsecase):
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = None,
+        async_logging: bool = False,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
     ) -> None: ...
     async def connect(
         self,
@@ -119,13 +144,51 @@ class NatsBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]: ...
+    def redrive(  # type: ignore[override]
+        self,
+        dead_letter: str,
+        source: str,
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Args:
+            dead_letter: dead-letter subject to consume
+            source: subject to publish messages back to
+            rate: maximum messages number to publish per second
+            handle_kwargs: `handle` method options
+
+        Returns:
+            Registered handler
+        """
+    async def publish_batch(  # type: ignore[override]
+        self,
+        messages: Sequence[SendableMessage],
+        subject: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]: ...
     def handle(  # type: ignore[override]
         self,
         subject: str,
         queue: str = "",
         *,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
     ) -> HandlerWrapper: ...
     async def _connect(self, *args: Any, **kwargs: Any) -> Client: ...
     async def close(self) -> None: ...
@@ -135,10 +198,13 @@ class NatsBroker(BrokerUsecase):
         subject: str,
         queue: str = "",
     ) -> Dict[str, Any]: ...
-    def _process_message(
+    def _get_publish_log_context(  # type: ignore[override]
+        self, subject: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]: ...
+    def _get_process_context(
         self,
-        func: Callable[[PropanMessage], T],
+        message: PropanMessage,
         watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]: ...
+    ) -> AsyncContextManager[None]: ...
     @staticmethod
     async def _parse_message(message: Msg) -> PropanMessage: ...
@@ -1,16 +1,21 @@
 # TODO: remove mypy ignore at complete
 # type: ignore
-from functools import wraps
-from typing import Any, Optional
+from typing import Any, AsyncContextManager, Optional
 
 import nats
-from nats.aio.msg import Msg
 from nats.js.client import JetStreamContext
 
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers._model.utils import FakeContext
 from propan.brokers.nats.nats_broker import NatsBroker
 from propan.brokers.nats.schemas import JetStream
-from propan.brokers.push_back_watcher import BaseWatcher, WatcherContext
-from propan.types import AnyDict, DecoratedCallable
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    RetryContext,
+    RetryWatcher,
+    WatcherContext,
+)
+from propan.types import AnyDict
 
 
 class NatsJSBroker(NatsBroker):
@@ -32,23 +37,31 @@ class NatsJSBroker(NatsBroker):
 
         return stream
 
-    @staticmethod
-    def _process_message(
-        func: DecoratedCallable, watcher: Optional[BaseWatcher] = None
-    ) -> DecoratedCallable:
-        @wraps(func)
-        async def wrapper(message: Msg) -> Any:
-            if watcher is None:
-                return await func(message)
-            else:
-                async with WatcherContext(
-                    watcher,
-                    message.message_id,
-                    on_success=message.ack,
-                    on_error=message.nak,
-                    on_max=message.term,
-                ):
-                    await message.in_progress()
-                    return await func(message)
-
-        return wrapper
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]:
+        nats_message = message.raw_message
+        if watcher is None:
+            return FakeContext()
+
+        elif isinstance(watcher, RetryWatcher):
+            # JetStream counts the deliveries itself
+            return RetryContext(
+                watcher,
+                message.message_id,
+                nats_message.metadata.num_delivered,
+                on_success=nats_message.ack,
+                on_retry=nats_message.nak,
+                on_max=nats_message.term,
+            )
+
+        else:
+            return WatcherContext(
+                watcher,
+                message.message_id,
+                on_success=nats_message.ack,
+                on_error=nats_message.nak,
+                on_max=nats_message.term,
+            )
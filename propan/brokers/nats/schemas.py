@@ -1,5 +1,6 @@
+import asyncio
 from dataclasses import dataclass
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence
 
 from nats.aio.subscription import Subscription
 from nats.js.api import DEFAULT_PREFIX
@@ -13,6 +14,11 @@ class Handler(BaseHandler):
     subject: str
     queue: str = ""
 
+    batch: bool = False
+    max_batch_size: int = 10
+    max_batch_wait: float = 0.5
+
+    task: Optional["asyncio.Task[Any]"] = None
     subscription: Optional[Subscription] = None
 
 
@@ -0,0 +1,244 @@
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter, thread_time
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+__all__ = (
+    "StageStats",
+    "HandlerProfile",
+    "Profiler",
+)
+
+T = TypeVar("T")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# user function time to subtract it from the `apply_types` wrapper one
+_call_time: ContextVar[Optional[List[float]]] = ContextVar("call_time", default=None)
+
+
+class StageStats:
+    __slots__ = ("count", "wall", "cpu", "wall_max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.wall_max = 0.0
+
+    def add(self, wall: float, cpu: float) -> None:
+        self.count += 1
+        self.wall += wall
+        self.cpu += cpu
+        if wall > self.wall_max:
+            self.wall_max = wall
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "wall": self.wall,
+            "wall_avg": self.wall / self.count if self.count else 0.0,
+            "wall_max": self.wall_max,
+            "cpu": self.cpu,
+            "cpu_avg": self.cpu / self.count if self.count else 0.0,
+        }
+
+
+class HandlerProfile:
+    """Handler pipeline stages timings
+
+    CPU time is measured by the thread clock, so for the stages awaiting IO it
+    includes the time of other coroutines running meanwhile.
+    """
+
+    def __init__(self, labels: Labels) -> None:
+        self.labels = labels
+        self.stages: Dict[str, StageStats] = {}
+
+    def stage(self, name: str) -> StageStats:
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = StageStats()
+        return s
+
+    def wrap_async(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[T]],
+    ) -> Callable[..., Awaitable[T]]:
+        stats = self.stage(name)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            wall, cpu = perf_counter(), thread_time()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                stats.add(perf_counter() - wall, thread_time() - cpu)
+
+        return wrapper
+
+    def wrap_sync(self, name: str, func: Callable[..., T]) -> Callable[..., T]:
+        stats = self.stage(name)
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            wall, cpu = perf_counter(), thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(perf_counter() - wall, thread_time() - cpu)
+
+        return wrapper
+
+    def wrap_call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        apply_types: Optional[
+            Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]
+        ] = None,
+    ) -> Callable[..., Awaitable[T]]:
+        """Times the user function and the arguments validation separately"""
+        call_stats = self.stage("call")
+
+        @wraps(func)
+        async def call(*args: Any, **kwargs: Any) -> T:
+            wall, cpu = perf_counter(), thread_time()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                wall, cpu = perf_counter() - wall, thread_time() - cpu
+                call_stats.add(wall, cpu)
+                spent = _call_time.get()
+                if spent is not None:  # pragma: no branch
+                    spent[0] += wall
+                    spent[1] += cpu
+
+        if apply_types is None:
+            return call
+
+        validated = apply_types(call)
+        validation_stats = self.stage("validation")
+
+        @wraps(func)
+        async def validation(*args: Any, **kwargs: Any) -> T:
+            spent = [0.0, 0.0]
+            token = _call_time.set(spent)
+            wall, cpu = perf_counter(), thread_time()
+            try:
+                return await validated(*args, **kwargs)
+            finally:
+                validation_stats.add(
+                    perf_counter() - wall - spent[0],
+                    thread_time() - cpu - spent[1],
+                )
+                _call_time.reset(token)
+
+        return validation
+
+    def wrap_context(
+        self,
+        get_context: Callable[..., AsyncContextManager[None]],
+    ) -> Callable[..., AsyncContextManager[None]]:
+        """Times the process context exit: message acknowledgement or rejection"""
+        stats = self.stage("ack")
+
+        @wraps(get_context)
+        def wrapper(*args: Any, **kwargs: Any) -> AsyncContextManager[None]:
+            return _ProfiledContext(get_context(*args, **kwargs), stats)
+
+        return wrapper
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: s.as_dict() for name, s in self.stages.items()}
+
+
+class _ProfiledContext:
+    __slots__ = ("context", "stats")
+
+    def __init__(self, context: AsyncContextManager[None], stats: StageStats):
+        self.context = context
+        self.stats = stats
+
+    async def __aenter__(self) -> None:
+        await self.context.__aenter__()
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> Optional[bool]:
+        wall, cpu = perf_counter(), thread_time()
+        try:
+            return await self.context.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.stats.add(perf_counter() - wall, thread_time() - cpu)
+
+
+class Profiler:
+    """Per handler message pipeline stages timings storage
+
+    Pass it to the broker to profile the handlers registered after and use
+    `report` to get the timings table.
+    """
+
+    stages = ("parse", "decode", "validation", "call", "reply", "ack", "total")
+
+    def __init__(self) -> None:
+        self.handlers: Dict[Labels, HandlerProfile] = {}
+
+    def handler(self, **labels: Any) -> HandlerProfile:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        p = self.handlers.get(key)
+        if p is None:
+            p = self.handlers[key] = HandlerProfile(key)
+        return p
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Aggregated timings of each handler stage as plain python objects"""
+        return [
+            {"labels": dict(p.labels), "stages": p.as_dict()}
+            for p in self.handlers.values()
+        ]
+
+    def report(self) -> str:
+        """Timings in milliseconds as a text table"""
+        header = ("handler", "stage", "count", "total", "avg", "max", "cpu avg")
+        rows: List[Tuple[str, ...]] = []
+        for p in self.handlers.values():
+            name = ", ".join(f"{k}={v}" for k, v in p.labels if v)
+            for stage in self.stages:
+                s = p.stages.get(stage)
+                if s is None or s.count == 0:
+                    continue
+                rows.append(
+                    (
+                        name,
+                        stage,
+                        str(s.count),
+                        f"{s.wall * 1000:.3f}",
+                        f"{s.wall / s.count * 1000:.3f}",
+                        f"{s.wall_max * 1000:.3f}",
+                        f"{s.cpu / s.count * 1000:.3f}",
+                    )
+                )
+
+        widths = [max(len(r[i]) for r in (header, *rows)) for i in range(len(header))]
+        lines = [
+            " | ".join(c.ljust(w) for c, w in zip(r, widths)) for r in (header, *rows)
+        ]
+        lines.insert(1, "-+-".join("-" * w for w in widths))
+        return "\n".join(lines)
@@ -1,16 +1,154 @@
 from abc import ABC, abstractmethod
-from collections import Counter
+from collections import OrderedDict
 from logging import Logger
+from time import monotonic
 from types import TracebackType
-from typing import Callable, Optional, Type
-
-from typing_extensions import Counter as CounterType
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
 
 from propan.brokers.exceptions import SkipMessage
-from propan.utils.functions import call_or_await
+from propan.utils.functions import call_or_await, maybe_await
+
+RETRIES_HEADER = "x-propan-retries"
+
+
+class RetryPolicy:
+    """Delayed retries settings
+
+    The n-th retry is delayed by `base` seconds with the `constant` backoff,
+    by `base * n` with the `linear` one and by `base * 2 ** (n - 1)` with the
+    `exponential` one, but not longer than `max_delay` seconds.
+    """
+
+    backoffs = ("constant", "linear", "exponential")
+
+    def __init__(
+        self,
+        max_tries: int = 3,
+        backoff: str = "exponential",
+        base: float = 1.0,
+        max_delay: float = 300.0,
+    ) -> None:
+        if backoff not in self.backoffs:
+            raise ValueError(
+                f"Unknown backoff `{backoff}`, use one of: {', '.join(self.backoffs)}"
+            )
+        if max_tries < 0:
+            raise ValueError("`max_tries` should not be negative")
+        if base < 0 or max_delay < 0:
+            raise ValueError("Retry delays should not be negative")
+
+        self.max_tries = max_tries
+        self.backoff = backoff
+        self.base = base
+        self.max_delay = max_delay
+
+    def get_delay(self, retry: int) -> float:
+        """Delay in seconds before the `retry` (starting from 1) attempt"""
+        if self.backoff == "constant":
+            delay = self.base
+        elif self.backoff == "linear":
+            delay = self.base * retry
+        else:
+            delay = self.base * 2 ** min(retry - 1, 64)
+        return min(delay, self.max_delay)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(max_tries={self.max_tries}, "
+            f"backoff={self.backoff!r}, base={self.base}, "
+            f"max_delay={self.max_delay})"
+        )
+
+
+class BaseWatcherStore(ABC):
+    """Messages retries counters storage"""
+
+    @abstractmethod
+    async def incr(self, message_id: str) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get(self, message_id: str) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def delete(self, message_id: str) -> None:
+        raise NotImplementedError()
+
+
+class MemoryWatcherStore(BaseWatcherStore):
+    """Process local retries counters
+
+    Stores `max_entries` counters at most evicting the least recently updated
+    ones. With `ttl` a counter expires if it was not updated for `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("`max_entries` should be a positive number")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("`ttl` should be a positive number")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # message_id: (counter, expiration time)
+        self._data: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def incr(self, message_id: str) -> int:
+        count = self._get(message_id) + 1
+        expires = monotonic() + self.ttl if self.ttl is not None else 0.0
+        self._data[message_id] = (count, expires)
+        self._data.move_to_end(message_id)
+        self._evict()
+        return count
+
+    async def get(self, message_id: str) -> int:
+        return self._get(message_id)
+
+    async def delete(self, message_id: str) -> None:
+        self._data.pop(message_id, None)
+
+    def _get(self, message_id: str) -> int:
+        item = self._data.get(message_id)
+        if item is None:
+            return 0
+
+        count, expires = item
+        if self.ttl is not None and expires <= monotonic():
+            del self._data[message_id]
+            return 0
+        return count
+
+    def _evict(self) -> None:
+        data = self._data
+        while len(data) > self.max_entries:
+            data.popitem(last=False)
+
+        if self.ttl is not None:
+            # counters are ordered by the update time, so by the expiration one too
+            now = monotonic()
+            while data:
+                _, expires = next(iter(data.values()))
+                if expires > now:
+                    break
+                data.popitem(last=False)
 
 
 class BaseWatcher(ABC):
+    """Failed messages retries counter
+
+    The methods are async to use a shared `BaseWatcherStore`, but subclasses
+    implementing them as regular methods keep working: the callers await the
+    result only if it is awaitable.
+    """
+
     max_tries: int
 
     def __init__(
@@ -22,56 +160,64 @@ class BaseWatcher(ABC):
         self.max_tries = max_tries
 
     @abstractmethod
-    def add(self, message_id: str) -> None:
+    async def add(self, message_id: str) -> None:
         raise NotImplementedError()
 
     @abstractmethod
-    def is_max(self, message_id: str) -> bool:
+    async def is_max(self, message_id: str) -> bool:
         raise NotImplementedError()
 
     @abstractmethod
-    def remove(self, message_id: str) -> None:
+    async def remove(self, message_id: str) -> None:
         raise NotImplementedError()
 
+    async def is_pushed_back(self, message_id: str) -> bool:
+        """Whether the failed message was returned to the queue to retry"""
+        return False
+
 
 class FakePushBackWatcher(BaseWatcher):
-    def add(self, message_id: str) -> None:
+    async def add(self, message_id: str) -> None:
         pass
 
-    def is_max(self, message_id: str) -> bool:
+    async def is_max(self, message_id: str) -> bool:
         return False
 
-    def remove(self, message_id: str) -> None:
+    async def remove(self, message_id: str) -> None:
         pass
 
+    async def is_pushed_back(self, message_id: str) -> bool:
+        return True
+
 
 class NotPushBackWatcher(BaseWatcher):
-    def add(self, message_id: str) -> None:
+    async def add(self, message_id: str) -> None:
         pass
 
-    def is_max(self, message_id: str) -> bool:
+    async def is_max(self, message_id: str) -> bool:
         return True
 
-    def remove(self, message_id: str) -> None:
+    async def remove(self, message_id: str) -> None:
         pass
 
 
 class PushBackWatcher(BaseWatcher):
-    memory: CounterType[str]
+    store: BaseWatcherStore
 
     def __init__(
         self,
         max_tries: int = 3,
         logger: Optional[Logger] = None,
+        store: Optional[BaseWatcherStore] = None,
     ):
         super().__init__(logger=logger, max_tries=max_tries)
-        self.memory = Counter()
+        self.store = store if store is not None else MemoryWatcherStore()
 
-    def add(self, message_id: str) -> None:
-        self.memory[message_id] += 1
+    async def add(self, message_id: str) -> None:
+        await self.store.incr(message_id)
 
-    def is_max(self, message_id: str) -> bool:
-        is_max = self.memory[message_id] > self.max_tries
+    async def is_max(self, message_id: str) -> bool:
+        is_max = await self.store.get(message_id) > self.max_tries
         if self.logger is not None:
             if is_max:
                 self.logger.error(f"Already retried {self.max_tries} times. Skipped.")
@@ -79,9 +225,31 @@ class PushBackWatcher(BaseWatcher):
                 self.logger.error("Error is occured. Pushing back to queue.")
         return is_max
 
-    def remove(self, message: str) -> None:
-        self.memory[message] = 0
-        self.memory += Counter()
+    async def remove(self, message_id: str) -> None:
+        await self.store.delete(message_id)
+
+    async def is_pushed_back(self, message_id: str) -> bool:
+        # the message is removed from the store if it reached the max tries
+        return await self.store.get(message_id) > 0
+
+
+class RetryWatcher(PushBackWatcher):
+    """`PushBackWatcher` with the delayed retries settings
+
+    Brokers supporting delayed redelivery process messages by `RetryContext`
+    sending them to the `destination`, others retry them immediately.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        logger: Optional[Logger] = None,
+        store: Optional[BaseWatcherStore] = None,
+        destination: Any = None,
+    ):
+        super().__init__(max_tries=policy.max_tries, logger=logger, store=store)
+        self.policy = policy
+        self.destination = destination
 
 
 class WatcherContext:
@@ -100,7 +268,7 @@ class WatcherContext:
         self._message_id = message_id
 
     async def __aenter__(self) -> None:
-        self.watcher.add(self._message_id)
+        await maybe_await(self.watcher.add(self._message_id))
 
     async def __aexit__(
         self,
@@ -110,14 +278,73 @@ class WatcherContext:
     ) -> None:
         if not exc_type:
             await call_or_await(self.on_success)
-            self.watcher.remove(self._message_id)
+            await maybe_await(self.watcher.remove(self._message_id))
 
         elif isinstance(exc_val, SkipMessage) is True:
-            self.watcher.remove(self._message_id)
+            await maybe_await(self.watcher.remove(self._message_id))
 
-        elif self.watcher.is_max(self._message_id):
+        elif await maybe_await(self.watcher.is_max(self._message_id)):
             await call_or_await(self.on_max)
-            self.watcher.remove(self._message_id)
+            await maybe_await(self.watcher.remove(self._message_id))
 
         else:
             await call_or_await(self.on_error)
+
+
+class RetryContext:
+    """Process context redelivering failed messages with a delay
+
+    `tries` is the current delivery number taken from the message (a header or
+    the broker deliveries counter), so it survives restarts and is shared by
+    all consumers. The store keeps only the retried messages to count metrics.
+    """
+
+    def __init__(
+        self,
+        watcher: RetryWatcher,
+        message_id: str,
+        tries: int,
+        on_success: Callable[[], Awaitable[None]],
+        on_retry: Callable[[float], Awaitable[None]],
+        on_max: Callable[[], Awaitable[None]],
+    ):
+        self.watcher = watcher
+        self.tries = tries
+        self.on_success = on_success
+        self.on_retry = on_retry
+        self.on_max = on_max
+        self._message_id = message_id
+
+    async def __aenter__(self) -> None:
+        pass
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        watcher = self.watcher
+        logger = watcher.logger
+
+        if not exc_type:
+            await self.on_success()
+            if self.tries > 1:
+                await maybe_await(watcher.remove(self._message_id))
+
+        elif isinstance(exc_val, SkipMessage) is True:
+            if self.tries > 1:
+                await maybe_await(watcher.remove(self._message_id))
+
+        elif self.tries > watcher.max_tries:
+            if logger is not None:
+                logger.error(f"Already retried {watcher.max_tries} times. Skipped.")
+            await self.on_max()
+            await maybe_await(watcher.remove(self._message_id))
+
+        else:
+            delay = watcher.policy.get_delay(self.tries)
+            if logger is not None:
+                logger.error(f"Error is occured. Retrying in {delay:.3f}s.")
+            await self.on_retry(delay)
+            await maybe_await(watcher.add(self._message_id))
@@ -0,0 +1,153 @@
+import asyncio
+from itertools import cycle
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import aio_pika
+import aiormq
+from typing_extensions import Literal
+
+from propan.brokers.exceptions import PublishError
+
+__all__ = (
+    "ChannelPool",
+    "ConfirmMode",
+    "PickStrategy",
+)
+
+# `on`: each publish waits for its confirmation
+# `off`: channels work without publisher confirms
+# `batch`: publishes do not wait, confirmations are awaited by `wait_confirms`
+ConfirmMode = Literal["on", "off", "batch"]
+PickStrategy = Literal["round_robin", "least_busy"]
+
+
+class PublisherChannel:
+    __slots__ = ("channel", "in_flight", "exchanges")
+
+    def __init__(self, channel: aio_pika.abc.AbstractChannel) -> None:
+        self.channel = channel
+        self.in_flight = 0
+        self.exchanges: Dict[str, aio_pika.abc.AbstractExchange] = {}
+
+    async def get_exchange(self, name: Optional[str]) -> aio_pika.abc.AbstractExchange:
+        if not name:
+            return self.channel.default_exchange
+
+        exchange = self.exchanges.get(name)
+        if exchange is None:
+            # exchanges are declared by the broker, so it is just a reference
+            exchange = self.exchanges[name] = await self.channel.get_exchange(
+                name, ensure=False
+            )
+        return exchange
+
+
+class ChannelPool:
+    """Channels to publish messages separated from the consumers one
+
+    A channel is picked for each message in turn (`round_robin`) or by the
+    fewest messages waiting for the confirmation (`least_busy`). With `batch`
+    confirms no more than `max_unconfirmed` messages wait for the confirmation:
+    the next publish waits for any of them.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        confirms: ConfirmMode = "on",
+        strategy: PickStrategy = "round_robin",
+        max_unconfirmed: int = 1000,
+    ) -> None:
+        if size < 1:
+            raise ValueError("`size` should be a positive number")
+        if confirms not in ("on", "off", "batch"):
+            raise ValueError(f"Unknown confirm mode `{confirms}`")
+        if strategy not in ("round_robin", "least_busy"):
+            raise ValueError(f"Unknown channel pick strategy `{strategy}`")
+
+        self.size = size
+        self.confirms = confirms
+        self.strategy = strategy
+        self.max_unconfirmed = max_unconfirmed
+
+        self.channels: List[PublisherChannel] = []
+        self._order: Optional[Iterator[PublisherChannel]] = None
+        self._unconfirmed: Set["asyncio.Task[Any]"] = set()
+        self._failed = 0
+        self._error: Optional[BaseException] = None
+
+    async def open(self, connection: aio_pika.abc.AbstractConnection) -> None:
+        self.channels = [
+            PublisherChannel(
+                await connection.channel(publisher_confirms=self.confirms != "off")
+            )
+            for _ in range(self.size)
+        ]
+        self._order = cycle(self.channels)
+
+    async def close(self) -> None:
+        if self._unconfirmed:
+            await asyncio.wait(self._unconfirmed)
+
+        for c in self.channels:
+            await c.channel.close()
+        self.channels = []
+        self._order = None
+
+    def get(self) -> PublisherChannel:
+        if self._order is None:
+            raise ValueError("RabbitBroker publisher channels not opened yet")
+
+        if self.strategy == "least_busy":
+            return min(self.channels, key=lambda c: c.in_flight)
+        return next(self._order)
+
+    async def publish(
+        self,
+        exchange: Optional[str],
+        message: aio_pika.abc.AbstractMessage,
+        **publish_kwargs: Any,
+    ) -> Optional[aiormq.abc.ConfirmationFrameType]:
+        channel = self.get()
+        exchange_obj = await channel.get_exchange(exchange)
+
+        if self.confirms != "batch":
+            channel.in_flight += 1
+            try:
+                return await exchange_obj.publish(message, **publish_kwargs)
+            finally:
+                channel.in_flight -= 1
+
+        while len(self._unconfirmed) >= self.max_unconfirmed:
+            # wait for a free slot only, not for the whole window
+            await asyncio.wait(self._unconfirmed, return_when=asyncio.FIRST_COMPLETED)
+
+        channel.in_flight += 1
+        task = asyncio.create_task(exchange_obj.publish(message, **publish_kwargs))
+        self._unconfirmed.add(task)
+
+        def done(t: "asyncio.Task[Any]") -> None:
+            channel.in_flight -= 1
+            self._unconfirmed.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                self._failed += 1
+                self._error = t.exception()
+
+        task.add_done_callback(done)
+        return None
+
+    async def wait_confirms(self) -> None:
+        """Waits for the published messages confirmations
+
+        Raises `PublishError` if some of them were not confirmed since the
+        last call.
+        """
+        if self._unconfirmed:
+            await asyncio.wait(self._unconfirmed)
+
+        failed, error = self._failed, self._error
+        self._failed, self._error = 0, None
+        if failed:
+            raise PublishError(
+                f"{failed} messages were not confirmed: {error!r}"
+            ) from error
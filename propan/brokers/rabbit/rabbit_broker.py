@@ -1,6 +1,19 @@
 import asyncio
-from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Union
+import json
+from functools import partial
+from time import monotonic
+from typing import (
+    Any,
+    AsyncContextManager,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import uuid4
 
 import aio_pika
@@ -9,15 +22,37 @@ from aio_pika.abc import DeliveryMode
 from yarl import URL
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher, WatcherContext
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers._model.utils import (
+    ConcurrentDispatcher,
+    consume_batches,
+    get_batch_headers,
+    get_watcher,
+)
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
+from propan.brokers.push_back_watcher import (
+    RETRIES_HEADER,
+    BaseWatcher,
+    RetryContext,
+    RetryPolicy,
+    RetryWatcher,
+    WatcherContext,
+)
+from propan.brokers.rabbit.channel_pool import ChannelPool, ConfirmMode, PickStrategy
 from propan.brokers.rabbit.schemas import Handler, RabbitExchange, RabbitQueue
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling
 from propan.types import AnyDict, DecoratedCallable, HandlerWrapper, SendableMessage
 from propan.utils import context
 
 TimeoutType = Optional[Union[int, float]]
 PikaSendableMessage = Union[aio_pika.message.Message, SendableMessage]
-T = TypeVar("T")
+
+# delay queues are removed after `delay + DELAY_QUEUE_EXPIRES` ms without use
+# and redeclared each `DELAY_QUEUE_REDECLARE` seconds to reset this timer
+DELAY_QUEUE_EXPIRES = 60_000
+DELAY_QUEUE_REDECLARE = 30.0
 
 
 class RabbitBroker(BrokerUsecase):
@@ -27,6 +62,12 @@ class RabbitBroker(BrokerUsecase):
     _queues: List[
         aio_pika.RobustQueue
     ]  # save queues to shield aio-pika WeakRef from GC
+    _delay_queues: Dict[str, float]
+    _reply_queue: Optional[aio_pika.abc.AbstractRobustQueue]
+    _reply_futures: Dict[str, "asyncio.Future[aio_pika.IncomingMessage]"]
+    _exchanges: Dict[str, aio_pika.abc.AbstractExchange]
+    _declared_queues: Dict[str, aio_pika.abc.AbstractQueue]
+    _bindings: Set[Tuple[str, str]]
 
     __max_queue_len: int
     __max_exchange_len: int
@@ -37,18 +78,56 @@ class RabbitBroker(BrokerUsecase):
         *,
         log_fmt: Optional[str] = None,
         consumers: Optional[int] = None,
+        declare: bool = True,
+        publisher_channels: int = 1,
+        publisher_confirms: ConfirmMode = "on",
+        publisher_strategy: PickStrategy = "round_robin",
         **kwargs: AnyDict,
     ) -> None:
         super().__init__(url, log_fmt=log_fmt, **kwargs)
         self._max_consumers = consumers
+        self._declare = declare
+        self._publishers = ChannelPool(
+            size=publisher_channels,
+            confirms=publisher_confirms,
+            strategy=publisher_strategy,
+        )
+
+        # declared topology by its definition, reset at the channel reopening
+        self._exchanges = {}
+        self._declared_queues = {}
+        self._bindings = set()
 
         self._channel = None
 
         self.__max_queue_len = 4
         self.__max_exchange_len = 4
         self._queues = []
+        self._delay_queues = {}
+        self._reply_queue = None
+        self._reply_lock: Optional[asyncio.Lock] = None
+        self._reply_futures = {}
 
     async def close(self) -> None:
+        for handler in self.handlers:
+            if handler.task is not None:
+                handler.task.cancel()
+                handler.task = None
+
+            if handler.dispatcher is not None:
+                await handler.dispatcher.wait_closed()
+
+        await self._close_dead_letters()
+
+        if self._publishers.channels:
+            await self._publishers.close()
+
+        for f in self._reply_futures.values():
+            f.cancel()
+        self._reply_futures = {}
+        self._reply_queue = None
+        self._reset_declarations()
+
         if self._channel is not None:
             await self._channel.close()
             self._channel = None
@@ -68,12 +147,16 @@ class RabbitBroker(BrokerUsecase):
         if self._channel is None:  # pragma: no branch
             max_consumers = self._max_consumers
             self._channel = await connection.channel()
+            self._channel.reopen_callbacks.add(self._reset_declarations)
 
             if max_consumers:
                 c = self._get_log_context(None, RabbitQueue(""), RabbitExchange(""))
                 self._log(f"Set max consumers to {max_consumers}", extra=c)
                 await self._channel.set_qos(prefetch_count=int(self._max_consumers))
 
+        if not self._publishers.channels:  # pragma: no branch
+            await self._publishers.open(connection)
+
         return connection
 
     def handle(
@@ -81,7 +164,16 @@ class RabbitBroker(BrokerUsecase):
         queue: Union[str, RabbitQueue],
         exchange: Union[str, RabbitExchange, None] = None,
         *,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Union[str, RabbitQueue, None] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         _raw: bool = False,
     ) -> HandlerWrapper:
         queue, exchange = _validate_queue(queue), _validate_exchange(exchange)
@@ -94,9 +186,24 @@ class RabbitBroker(BrokerUsecase):
                 queue=queue,
                 exchange=exchange,
                 retry=retry,
+                batch=batch,
+                codec=codec,
+                log_sampling=log_sampling,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                cache=cache,
                 _raw=_raw,
             )
-            handler = Handler(callback=func, queue=queue, exchange=exchange)
+            handler = Handler(
+                callback=func,
+                queue=queue,
+                exchange=exchange,
+                batch=batch,
+                max_batch_size=max_batch_size,
+                max_batch_wait=max_batch_wait,
+            )
+            if max_concurrency is not None:
+                handler.dispatcher = ConcurrentDispatcher(func, max_concurrency)
             self.handlers.append(handler)
 
             return func
@@ -119,9 +226,40 @@ class RabbitBroker(BrokerUsecase):
             c = self._get_log_context(None, handler.queue, handler.exchange)
             self._log(f"`{func.__name__}` waiting for messages", extra=c)
 
-            await queue.consume(func)
+            if handler.batch is True:
+                await self._consume_batch(handler, queue)
+            elif handler.dispatcher is not None:
+                # aio-pika already runs each message callback in a separated task
+                await queue.consume(handler.dispatcher.run)
+            else:
+                await queue.consume(func)
             self._queues.append(queue)
 
+    async def _consume_batch(
+        self,
+        handler: Handler,
+        queue: aio_pika.abc.AbstractRobustQueue,
+    ) -> None:
+        buffer: "asyncio.Queue[aio_pika.IncomingMessage]" = asyncio.Queue()
+
+        # consumer prefetch should fit the whole batch
+        prefetch = self._max_consumers
+        if prefetch and prefetch < handler.max_batch_size:
+            await self._channel.set_qos(prefetch_count=handler.max_batch_size)
+            await queue.consume(buffer.put)
+            await self._channel.set_qos(prefetch_count=prefetch)
+        else:
+            await queue.consume(buffer.put)
+
+        handler.task = asyncio.create_task(
+            consume_batches(
+                handler.dispatcher or handler.callback,
+                buffer,
+                handler.max_batch_size,
+                handler.max_batch_wait,
+            )
+        )
+
     async def publish(
         self,
         message: PikaSendableMessage = "",
@@ -136,6 +274,7 @@ class RabbitBroker(BrokerUsecase):
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
         persist: bool = False,
+        codec: Optional[CodecType] = None,
         **message_kwargs,
     ) -> Union[aiormq.abc.ConfirmationFrameType, Dict, str, bytes, None]:
         if self._channel is None:
@@ -144,23 +283,26 @@ class RabbitBroker(BrokerUsecase):
         queue, exchange = _validate_queue(queue), _validate_exchange(exchange)
 
         if callback is not False:
-            callback_queue = await self._channel.declare_queue(exclusive=True)
+            callback_queue = await self._get_reply_queue()
         else:
             callback_queue = None
 
         if exchange is None:
-            exchange_obj = self._channel.default_exchange
+            exchange_name = None
         else:
-            exchange_obj = await self._init_exchange(exchange)
+            exchange_name = (await self._init_exchange(exchange)).name
 
         message = self._validate_message(
             message=message,
             callback_queue=callback_queue,
             persist=persist,
+            codec=self._get_codec(codec),
             **message_kwargs,
         )
 
-        r = await exchange_obj.publish(
+        publish = partial(
+            self._publishers.publish,
+            exchange_name,
             message=message,
             routing_key=routing_key or queue.routing or "",
             mandatory=mandatory,
@@ -168,18 +310,116 @@ class RabbitBroker(BrokerUsecase):
             timeout=timeout,
         )
         if callback_queue is None:
-            return r
+            return await publish()
+
+        if message.correlation_id is None:
+            message.correlation_id = str(uuid4())
+        message.reply_to = callback_queue.name
+        correlation_id = message.correlation_id
+
+        response_future: "asyncio.Future[aio_pika.IncomingMessage]"
+        response_future = asyncio.get_event_loop().create_future()
+        self._reply_futures[correlation_id] = response_future
+        try:
+            await publish()
+            msg = await asyncio.wait_for(response_future, callback_timeout)
+        except asyncio.TimeoutError as e:
+            if raise_timeout is True:
+                raise e
+            return None
+        finally:
+            self._reply_futures.pop(correlation_id, None)
+
+        return await self._decode_message(msg)
+
+    async def wait_confirms(self) -> None:
+        """Waits for the confirmations of messages published with `batch` confirms"""
+        await self._publishers.wait_confirms()
+
+    async def publish_batch(
+        self,
+        messages: Sequence[PikaSendableMessage],
+        queue: Union[RabbitQueue, str] = "",
+        exchange: Union[RabbitExchange, str, None] = None,
+        *,
+        routing_key: str = "",
+        mandatory: bool = True,
+        immediate: bool = False,
+        timeout: TimeoutType = None,
+        persist: bool = False,
+        codec: Optional[CodecType] = None,
+        message_headers: Optional[Sequence[AnyDict]] = None,
+        **message_kwargs,
+    ) -> List[PublishResult]:
+        if self._channel is None:
+            raise ValueError("RabbitBroker channel not started yet")
 
+        queue, exchange = _validate_queue(queue), _validate_exchange(exchange)
+
+        if exchange is None:
+            exchange_name = None
         else:
-            iter = callback_queue.iterator()
-            await iter.consume()
-            try:
-                msg = await asyncio.wait_for(iter._queue.get(), callback_timeout)
-            except asyncio.TimeoutError as e:
-                if raise_timeout is True:  # pragma: no branch
-                    raise e
-            else:
-                return await self._decode_message(msg)
+            exchange_name = (await self._init_exchange(exchange)).name
+
+        c = self._get_codec(codec)
+        routing = routing_key or queue.routing or ""
+        headers = message_kwargs.pop("headers", None)
+
+        # frames are written to the channels one after another without waiting,
+        # so the publisher confirmations are awaited for the whole group at once
+        results = await asyncio.gather(
+            *(
+                self._publishers.publish(
+                    exchange_name,
+                    message=self._validate_message(
+                        message=m,
+                        persist=persist,
+                        codec=c,
+                        headers=get_batch_headers(headers, message_headers, i),
+                        **message_kwargs,
+                    ),
+                    routing_key=routing,
+                    mandatory=mandatory,
+                    immediate=immediate,
+                    timeout=timeout,
+                )
+                for i, m in enumerate(messages)
+            ),
+            return_exceptions=True,
+        )
+        return [PublishResult.from_result(m, r) for m, r in zip(messages, results)]
+
+    async def _get_reply_queue(self) -> aio_pika.abc.AbstractRobustQueue:
+        """Exclusive queue consuming the RPC responses of all requests
+
+        It is declared at the first request and lives with the channel. The
+        name is generated by the client, so the queue is redeclared with the
+        same name after a reconnect.
+        """
+        queue = self._reply_queue
+        if queue is not None:
+            return queue
+
+        if self._reply_lock is None:
+            self._reply_lock = asyncio.Lock()
+
+        async with self._reply_lock:
+            if self._reply_queue is None:  # pragma: no branch
+                assert self._channel, "RabbitBroker channel not started yet"
+                queue = await self._channel.declare_queue(
+                    f"propan.reply.{uuid4().hex}",
+                    exclusive=True,
+                    auto_delete=True,
+                )
+                await queue.consume(self._on_reply, no_ack=True)
+                self._reply_queue = queue
+
+        return self._reply_queue
+
+    async def _on_reply(self, message: aio_pika.IncomingMessage) -> None:
+        future = self._reply_futures.pop(message.correlation_id or "", None)
+        if future is not None and not future.done():
+            future.set_result(message)
 
     async def _init_handler(
         self,
@@ -188,23 +428,53 @@ class RabbitBroker(BrokerUsecase):
         queue = await self._init_queue(handler.queue)
         if handler.exchange is not None and handler.exchange.name != "default":
             exchange = await self._init_exchange(handler.exchange)
-            await queue.bind(
-                exchange,
-                routing_key=handler.queue.routing,
-                arguments=handler.queue.bind_arguments,
+
+            binding = (
+                _get_declaration_key(handler.queue),
+                _get_declaration_key(handler.exchange),
             )
+            if self._declare is True and binding not in self._bindings:
+                await queue.bind(
+                    exchange,
+                    routing_key=handler.queue.routing,
+                    arguments=handler.queue.bind_arguments,
+                )
+                self._bindings.add(binding)
         return queue
 
     async def _init_queue(
         self,
         queue: RabbitQueue,
     ) -> aio_pika.abc.AbstractRobustQueue:
-        return await self._channel.declare_queue(**queue.dict())
+        if not queue.name:
+            # each anonymous queue is a new one
+            return await self._channel.declare_queue(**queue.dict())
+
+        key = _get_declaration_key(queue)
+        queue_obj = self._declared_queues.get(key)
+        if queue_obj is None:
+            if self._declare is True:
+                queue_obj = await self._channel.declare_queue(**queue.dict())
+            else:
+                queue_obj = await self._channel.get_queue(queue.name, ensure=False)
+            self._declared_queues[key] = queue_obj
+        return queue_obj
 
     async def _init_exchange(
         self,
         exchange: RabbitExchange,
     ) -> aio_pika.abc.AbstractRobustExchange:
+        """Declares the exchange with its `bind_to` chain once per channel"""
+        key = _get_declaration_key(exchange)
+        original = self._exchanges.get(key)
+        if original is not None:
+            return original
+
+        if self._declare is False:
+            original = await self._channel.get_exchange(exchange.name, ensure=False)
+            self._exchanges[key] = original
+            return original
+
         original = await self._channel.declare_exchange(**exchange.dict())
 
         current = exchange
@@ -219,8 +489,15 @@ class RabbitBroker(BrokerUsecase):
             current = current.bind_to
             current_exch = parent_exch
 
+        self._exchanges[key] = original
         return original
 
+    def _reset_declarations(self, *args: Any) -> None:
+        self._exchanges = {}
+        self._declared_queues = {}
+        self._bindings = set()
+        self._delay_queues = {}
+
     def _get_log_context(
         self,
         message: Optional[PropanMessage],
@@ -234,6 +511,19 @@ class RabbitBroker(BrokerUsecase):
         }
         return context
 
+    def _get_publish_log_context(
+        self,
+        queue: Union[RabbitQueue, str] = "",
+        exchange: Union[RabbitExchange, str, None] = None,
+        *args: Any,
+        routing_key: str = "",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        return {
+            "queue": getattr(queue, "name", queue) or routing_key,
+            "exchange": getattr(exchange, "name", exchange) or "default",
+        }
+
     @property
     def fmt(self) -> str:
         return super().fmt or (
@@ -257,35 +547,109 @@ class RabbitBroker(BrokerUsecase):
             raw_message=message,
         )
 
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher]
-    ) -> Callable[[PropanMessage], T]:
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            pika_message = message.raw_message
-            if watcher is None:
-                context = pika_message.process()
-            else:
-                context = WatcherContext(
-                    watcher,
-                    message.message_id,
-                    on_success=pika_message.ack,
-                    on_error=pika_message.nack,
-                    on_max=pika_message.reject,
-                )
+    def _get_watcher(
+        self,
+        retry: Union[bool, int, RetryPolicy],
+        queue: RabbitQueue,
+        **broker_args: Any,
+    ) -> Optional[BaseWatcher]:
+        return get_watcher(self.logger, retry, self.watcher_store, destination=queue)
+
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]:
+        pika_message = message.raw_message
+        if watcher is None:
+            return pika_message.process()
+
+        elif isinstance(watcher, RetryWatcher) and watcher.destination.name:
+            tries = int(message.headers.get(RETRIES_HEADER, 0)) + 1
+            return RetryContext(
+                watcher,
+                message.message_id,
+                tries,
+                on_success=pika_message.ack,
+                on_retry=partial(
+                    self._retry_later, pika_message, watcher.destination, tries
+                ),
+                on_max=pika_message.reject,
+            )
+
+        else:
+            return WatcherContext(
+                watcher,
+                message.message_id,
+                on_success=pika_message.ack,
+                on_error=pika_message.nack,
+                on_max=pika_message.reject,
+            )
 
-            async with context:
-                r = await func(message)
-                if message.reply_to:
-                    await self.publish(
-                        message=r,
-                        routing_key=message.reply_to,
-                        correlation_id=pika_message.correlation_id,
-                    )
+    async def _retry_later(
+        self,
+        message: aio_pika.IncomingMessage,
+        queue: RabbitQueue,
+        tries: int,
+        delay: float,
+    ) -> None:
+        """Sends the message copy to dead-letter back to the queue after a delay"""
+        if self._channel is None:
+            raise ValueError("RabbitMQ channel not started yet")
+
+        delay_queue = await self._init_delay_queue(queue, int(delay * 1000))
+        await self._channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                headers={**(message.headers or {}), RETRIES_HEADER: tries},
+                content_type=message.content_type,
+                content_encoding=message.content_encoding,
+                delivery_mode=message.delivery_mode,
+                priority=message.priority,
+                correlation_id=message.correlation_id,
+                reply_to=message.reply_to,
+                message_id=message.message_id,
+                timestamp=message.timestamp,
+                type=message.type,
+                app_id=message.app_id,
+            ),
+            routing_key=delay_queue,
+        )
+        await message.ack()
+
+    async def _init_delay_queue(self, queue: RabbitQueue, delay_ms: int) -> str:
+        name = f"{queue.name}.delay.{delay_ms}"
+
+        now = monotonic()
+        declared = self._delay_queues.get(name)
+        if declared is None or now - declared > DELAY_QUEUE_REDECLARE:
+            await self._channel.declare_queue(
+                name,
+                durable=queue.durable,
+                robust=False,
+                arguments={
+                    "x-message-ttl": delay_ms,
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": queue.name,
+                    "x-expires": delay_ms + DELAY_QUEUE_EXPIRES,
+                },
+            )
+            self._delay_queues[name] = now
 
-                return r
+        return name
 
-        return wrapper
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(
+            message=result,
+            routing_key=message.reply_to,
+            correlation_id=message.raw_message.correlation_id,
+            codec=codec,
+        )
 
     @classmethod
     def _validate_message(
@@ -293,10 +657,11 @@ class RabbitBroker(BrokerUsecase):
         message: PikaSendableMessage,
         persist: bool = False,
         callback_queue: Optional[aio_pika.abc.AbstractRobustQueue] = None,
+        codec: Optional[BaseCodec] = None,
         **message_kwargs: Dict[str, Any],
     ) -> aio_pika.Message:
         if not isinstance(message, aio_pika.message.Message):
-            message, content_type = super()._encode_message(message)
+            message, content_type = super()._encode_message(message, codec)
 
             delivery_mode = (
                 DeliveryMode.PERSISTENT if persist else DeliveryMode.NOT_PERSISTENT
@@ -309,6 +674,7 @@ class RabbitBroker(BrokerUsecase):
                     "content_type": content_type,
                     "reply_to": callback_queue,
                     "correlation_id": str(uuid4()),
+                    "message_id": str(uuid4()),
                     **message_kwargs,
                 },
             )
@@ -351,3 +717,19 @@ def _validate_queue(
                 f"Queue '{queue}' should be 'str' | 'RabbitQueue' instance"
             )
     return queue
+
+
+def _get_declaration_key(obj: Union[RabbitQueue, RabbitExchange]) -> str:
+    """Declaration definition including the fields excluded from `dict`"""
+    chain = []
+    current: Optional[Union[RabbitQueue, RabbitExchange]] = obj
+    while current is not None:
+        chain.append(
+            (
+                current.dict(),
+                current.routing_key,
+                current.bind_arguments,
+            )
+        )
+        current = getattr(current, "bind_to", None)
+    return json.dumps(chain, sort_keys=True, default=str)
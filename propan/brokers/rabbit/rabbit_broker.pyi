@@ -1,6 +1,18 @@
 import logging
 from ssl import SSLContext
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import aio_pika
 import aiormq
@@ -9,11 +21,21 @@ from typing_extensions import ParamSpec
 from yarl import URL
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
+from propan.brokers.metrics import Metrics
+from propan.brokers.profiler import Profiler
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    BaseWatcherStore,
+    RetryPolicy,
+)
+from propan.brokers.rabbit.channel_pool import ChannelPool, ConfirmMode, PickStrategy
 from propan.brokers.rabbit.schemas import Handler, RabbitExchange, RabbitQueue
-from propan.log import access_logger
-from propan.types import DecodedMessage, SendableMessage
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling, access_logger
+from propan.types import DecodedMessage, DecoratedAsync, SendableMessage
 
 P = ParamSpec("P")
 T = TypeVar("T")
@@ -23,6 +45,7 @@ class RabbitBroker(BrokerUsecase):
     handlers: List[Handler]
     _connection: Optional[aio_pika.RobustConnection]
     _channel: Optional[aio_pika.RobustChannel]
+    _publishers: ChannelPool
 
     __max_queue_len: int
     __max_exchange_len: int
@@ -44,8 +67,19 @@ class RabbitBroker(BrokerUsecase):
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = None,
+        async_logging: bool = False,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
         consumers: Optional[int] = None,
+        declare: bool = True,
+        publisher_channels: int = 1,
+        publisher_confirms: ConfirmMode = "on",
+        publisher_strategy: PickStrategy = "round_robin",
     ) -> None:
         """RabbitMQ Propan broker
 
@@ -68,8 +102,19 @@ class RabbitBroker(BrokerUsecase):
             logger: logger to use inside broker
             log_level: broker inner messages log level
             log_fmt: custom log formatting string
+            async_logging: write logs in a separated thread not to block the event loop
             apply_types: wrap brokers handlers to FastDepends decorator
+            skip_raw_validation: pass `bytes` and `dict` handlers arguments as is
+            codec: codec (or its content type) to encode messages by default
+            codecs: additional codecs to decode messages by content type
+            metrics: `Metrics` object to collect handlers and publishers metrics
+            profiler: `Profiler` object to time handlers pipeline stages
+            watcher_store: `retry` messages tries counters storage
             consumers: max messages to proccess at the same time
+            declare: declare queues, exchanges and bindings. Pass `False` if the topology already exists
+            publisher_channels: number of channels to publish messages, separated from the consumers one
+            publisher_confirms: wait for each message confirmation (`on`), do not use confirms (`off`) or wait for them by `wait_confirms` (`batch`)
+            publisher_strategy: pick a publisher channel in turn (`round_robin`) or by the fewest messages in flight (`least_busy`)
 
         .. _RFC3986: https://goo.gl/MzgYAs
         .. _official Python documentation: https://goo.gl/pty9xA
@@ -129,6 +174,7 @@ class RabbitBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
         # message kwargs
         headers: Optional[aio_pika.abc.HeadersType] = None,
         content_type: Optional[str] = None,
@@ -155,6 +201,7 @@ class RabbitBroker(BrokerUsecase):
             immediate: expects available consumer
             timeout: request to RabbitMQ timeout
             headers: message headers (for consumers)
+            codec: codec (or its content type) to encode the message
             content_type: message content-type to decode
             content_encoding: message encoding
             persist: restore message on RabbitMQ reboot
@@ -179,12 +226,73 @@ class RabbitBroker(BrokerUsecase):
 
         _publisher confirms: https://www.rabbitmq.com/confirms.html
         """
+    def redrive(  # type: ignore[override]
+        self,
+        dead_letter: Union[str, RabbitQueue],
+        source: Union[str, RabbitQueue],
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Args:
+            dead_letter: dead-letter queue to consume
+            source: queue to publish messages back to
+            rate: maximum messages number to publish per second
+            handle_kwargs: `handle` method options
+
+        Returns:
+            Registered handler
+        """
+    async def wait_confirms(self) -> None:
+        """Waits for the confirmations of messages published with `batch` confirms
+
+        Raises:
+            PublishError: if some messages were not confirmed since the last call
+        """
+    async def publish_batch(  # type: ignore[override]
+        self,
+        messages: Sequence[PikaSendableMessage],
+        queue: Union[RabbitQueue, str] = "",
+        exchange: Union[RabbitExchange, str, None] = None,
+        *,
+        routing_key: str = "",
+        mandatory: bool = True,
+        immediate: bool = False,
+        timeout: aio_pika.abc.TimeoutType = None,
+        persist: bool = False,
+        codec: Optional[CodecType] = None,
+        headers: Optional[aio_pika.abc.HeadersType] = None,
+        message_headers: Optional[Sequence[aio_pika.abc.HeadersType]] = None,
+        priority: Optional[int] = None,
+        expiration: Optional[aio_pika.abc.DateType] = None,
+        type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        app_id: Optional[str] = None,
+    ) -> List[PublishResult]:
+        """Publish messages group waiting for all publisher confirmations at once
+
+        `message_headers` are the headers of each message updating `headers`.
+
+        Returns:
+            `PublishResult` for each message in the same order
+        """
     def handle(  # type: ignore[override]
         self,
         queue: Union[str, RabbitQueue],
         exchange: Union[str, RabbitExchange, None] = None,
         *,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Union[str, RabbitQueue, None] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
     ) -> Callable[
         [
             Callable[
@@ -198,7 +306,17 @@ class RabbitBroker(BrokerUsecase):
         Args:
             queue: queue to consume messages
             exchange: exchange to bind queue
-            retry: at message exception will returns to queue `int` times or endless if `True`
+            retry: at message exception will returns to queue `int` times or endless if `True`,
+                `RetryPolicy` to return it with a delay
+            batch: consume messages by batches
+            max_batch_size: maximum messages number in a batch
+            max_batch_wait: maximum time to wait for a full batch
+            max_concurrency: maximum number of messages processing at the same time
+            codec: codec to decode messages without content type and encode replies
+            log_sampling: write access logs only for the part of messages
+            dead_letter: queue to send messages failed all the tries to
+            dedup: `Dedup` object to skip already processed messages
+            cache: `ResultCache` object to reuse the handler results
 
         Returns:
             Async or sync function decorator
@@ -207,15 +325,25 @@ class RabbitBroker(BrokerUsecase):
         """Initialize RabbitMQ connection and startup all consumers"""
     async def close(self) -> None:
         """Close RabbitMQ connection"""
-    def _process_message(
-        self, func: Callable[[PropanMessage], T], watcher: Optional[BaseWatcher]
-    ) -> Callable[[PropanMessage], T]: ...
+    def _get_process_context(
+        self,
+        message: PropanMessage,
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncContextManager[None]: ...
     def _get_log_context(  # type: ignore[override]
         self,
         message: Optional[PropanMessage],
         queue: RabbitQueue,
         exchange: Optional[RabbitExchange] = None,
     ) -> Dict[str, Any]: ...
+    def _get_publish_log_context(  # type: ignore[override]
+        self,
+        queue: Union[RabbitQueue, str] = "",
+        exchange: Union[RabbitExchange, str, None] = None,
+        *args: Any,
+        routing_key: str = "",
+        **kwargs: Any,
+    ) -> Dict[str, Any]: ...
     async def _init_handler(
         self,
         handler: Handler,
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
@@ -107,3 +108,9 @@ class RabbitExchange(NameRequired):
 class Handler(BaseHandler):
     queue: RabbitQueue
     exchange: Optional[RabbitExchange] = None
+
+    batch: bool = False
+    max_batch_size: int = 10
+    max_batch_wait: float = 0.5
+
+    task: Optional["asyncio.Task[Any]"] = None
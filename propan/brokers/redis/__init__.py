@@ -1,3 +1,7 @@
+from propan.brokers.redis.push_back_watcher import RedisWatcherStore
 from propan.brokers.redis.redis_broker import RedisBroker
 
-__all__ = ("RedisBroker",)
+__all__ = (
+    "RedisBroker",
+    "RedisWatcherStore",
+)
@@ -0,0 +1,51 @@
+from typing import Optional, Union
+
+from redis.asyncio.client import Redis
+
+from propan.brokers.push_back_watcher import BaseWatcherStore
+from propan.brokers.redis.redis_broker import RedisBroker
+
+
+class RedisWatcherStore(BaseWatcherStore):
+    """Retries counters shared by all processes connected to the same Redis
+
+    Use it to count a message tries over all the application workers. With
+    `ttl` a counter expires if it was not updated for `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        connection: Union[RedisBroker, Redis],
+        prefix: str = "propan:retry:",
+        ttl: Optional[float] = 3600.0,
+    ) -> None:
+        if ttl is not None and ttl <= 0:
+            raise ValueError("`ttl` should be a positive number")
+
+        self.connection = connection
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def incr(self, message_id: str) -> int:
+        key = self.prefix + message_id
+        redis = await self._get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            if self.ttl is not None:
+                pipe.pexpire(key, int(self.ttl * 1000))
+            count, *_ = await pipe.execute()
+        return int(count)
+
+    async def get(self, message_id: str) -> int:
+        redis = await self._get_redis()
+        count = await redis.get(self.prefix + message_id)
+        return int(count) if count is not None else 0
+
+    async def delete(self, message_id: str) -> None:
+        redis = await self._get_redis()
+        await redis.delete(self.prefix + message_id)
+
+    async def _get_redis(self) -> Redis:
+        if isinstance(self.connection, RedisBroker):
+            return await self.connection.connect()
+        return self.connection
@@ -1,18 +1,22 @@
 import asyncio
 import logging
-from functools import wraps
-from typing import Any, Callable, Dict, List, NoReturn, Optional, TypeVar
+from typing import Any, Dict, List, NoReturn, Optional, Sequence
 from uuid import uuid4
 
 from redis.asyncio.client import PubSub, Redis
 from redis.asyncio.connection import ConnectionPool, parse_url
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage, RawDecoced
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model.schemas import PropanMessage, PublishResult, RawDecoced
+from propan.brokers._model.utils import ConcurrentDispatcher, get_batch_headers
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
 from propan.brokers.redis.schemas import Handler, RedisMessage
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling
 from propan.types import (
     AnyCallable,
+    AnyDict,
     DecodedMessage,
     DecoratedCallable,
     HandlerWrapper,
@@ -20,14 +24,16 @@ from propan.types import (
 )
 from propan.utils import context
 
-T = TypeVar("T")
-
 
 class RedisBroker(BrokerUsecase):
     handlers: List[Handler]
     _connection: Redis
     __max_channel_len: int
     _polling_interval: float
+    _reply_futures: Dict[str, "asyncio.Future[PropanMessage]"]
+    _reply_subscription: Optional[PubSub]
+    _reply_task: Optional["asyncio.Task[Any]"]
+    _stable_message_id = False
 
     def __init__(
         self,
@@ -41,6 +47,13 @@ class RedisBroker(BrokerUsecase):
         self.__max_channel_len = 0
         self._polling_interval = polling_interval
 
+        # RPC responses of all requests are published to the single channel
+        self._reply_channel = f"propan:reply:{uuid4().hex}"
+        self._reply_lock: Optional[asyncio.Lock] = None
+        self._reply_futures = {}
+        self._reply_subscription = None
+        self._reply_task = None
+
     async def _connect(
         self,
         url: str,
@@ -62,32 +75,59 @@ class RedisBroker(BrokerUsecase):
                 await h.subscription.reset()
                 h.subscription = None
 
+            if h.dispatcher is not None:
+                await h.dispatcher.wait_closed()
+
+        await self._close_dead_letters()
+
+        if self._reply_task is not None:
+            self._reply_task.cancel()
+            self._reply_task = None
+
+        if self._reply_subscription is not None:
+            await self._reply_subscription.unsubscribe()
+            await self._reply_subscription.reset()
+            self._reply_subscription = None
+
+        for f in self._reply_futures.values():
+            f.cancel()
+        self._reply_futures = {}
+
         if self._connection is not None:  # pragma: no branch
             await self._connection.close()
             self._connection = None
 
-    def _process_message(
+    async def _send_reply(
         self,
-        func: Callable[[PropanMessage], T],
-        watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]:
-        @wraps(func)
-        async def wrapper(message: PropanMessage) -> T:
-            r = await func(message)
-
-            msg = message.raw_message
-            if isinstance(msg, RedisMessage) and message.reply_to:
-                await self.publish(r or "", message.reply_to)
-
-            return r
-
-        return wrapper
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        if isinstance(message.raw_message, RedisMessage):
+            correlation_id = message.headers.get("correlation_id")
+            await self.publish(
+                result or "",
+                message.reply_to,
+                headers=None
+                if correlation_id is None
+                else {"correlation_id": correlation_id},
+                codec=codec,
+            )
 
     def handle(
         self,
         channel: str = "",
         *,
         pattern: bool = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         _raw: bool = False,
     ) -> HandlerWrapper:
         self.__max_channel_len = max(self.__max_channel_len, len(channel))
@@ -96,9 +136,24 @@ class RedisBroker(BrokerUsecase):
             func = self._wrap_handler(
                 func,
                 channel=channel,
+                batch=batch,
+                codec=codec,
+                log_sampling=log_sampling,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                cache=cache,
                 _raw=_raw,
             )
-            handler = Handler(callback=func, channel=channel, pattern=pattern)
+            handler = Handler(
+                callback=func,
+                channel=channel,
+                pattern=pattern,
+                batch=batch,
+                max_batch_size=max_batch_size,
+                max_batch_wait=max_batch_wait,
+            )
+            if max_concurrency is not None:
+                handler.dispatcher = ConcurrentDispatcher(func, max_concurrency)
             self.handlers.append(handler)
 
             return func
@@ -112,6 +167,7 @@ class RedisBroker(BrokerUsecase):
         )
 
         await super().start()
+        await self._subscribe_replies()
 
         for handler in self.handlers:  # pragma: no branch
             c = self._get_log_context(None, handler.channel)
@@ -136,51 +192,90 @@ class RedisBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]:
         if self._connection is None:
             raise ValueError("Redis connection not established yet")
 
-        msg, content_type = self._encode_message(message)
+        msg, content_type = self._encode_message(message, self._get_codec(codec))
 
-        if callback is True:
-            callback_channel = str(uuid4())
-            psub = self._connection.pubsub()
-            response_queue = asyncio.Queue(maxsize=1)
-            await psub.subscribe(callback_channel)
-            task = asyncio.create_task(_consume_one(response_queue, psub))
-        else:
-            callback_channel = reply_to
-            psub = None
-            response_queue = None
-            task = None
-
-        await self._connection.publish(
-            channel,
-            RedisMessage(
-                data=msg,
-                headers={
-                    "content-type": content_type or "",
-                    **(headers or {}),
-                },
-                reply_to=callback_channel,
-            ).json(),
-        )
+        message_headers = {
+            "content-type": content_type or "",
+            **(headers or {}),
+        }
 
-        if psub and response_queue and task:
-            try:
-                response = await asyncio.wait_for(
-                    response_queue.get(), callback_timeout
+        if callback is False:
+            await self._connection.publish(
+                channel,
+                RedisMessage.build(
+                    data=msg,
+                    headers=message_headers,
+                    reply_to=reply_to,
+                ).json(),
+            )
+            return None
+
+        await self._subscribe_replies()
+
+        correlation_id = str(uuid4())
+        message_headers["correlation_id"] = correlation_id
+
+        response_future: "asyncio.Future[PropanMessage]"
+        response_future = asyncio.get_event_loop().create_future()
+        self._reply_futures[correlation_id] = response_future
+        try:
+            await self._connection.publish(
+                channel,
+                RedisMessage.build(
+                    data=msg,
+                    headers=message_headers,
+                    reply_to=self._reply_channel,
+                ).json(),
+            )
+            response = await asyncio.wait_for(response_future, callback_timeout)
+        except asyncio.TimeoutError as e:
+            if raise_timeout is True:
+                raise e
+            return None
+        finally:
+            self._reply_futures.pop(correlation_id, None)
+
+        return await self._decode_message(response)
+
+    async def publish_batch(
+        self,
+        messages: Sequence[SendableMessage],
+        channel: str,
+        *,
+        headers: Optional[Dict[str, Any]] = None,
+        message_headers: Optional[Sequence[Dict[str, Any]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
+        if self._connection is None:
+            raise ValueError("Redis connection not established yet")
+
+        c = self._get_codec(codec)
+
+        async with self._connection.pipeline(transaction=False) as pipe:
+            for i, m in enumerate(messages):
+                msg, content_type = self._encode_message(m, c)
+                pipe.publish(
+                    channel,
+                    RedisMessage.build(
+                        data=msg,
+                        headers={
+                            "content-type": content_type or "",
+                            **get_batch_headers(headers, message_headers, i),
+                        },
+                    ).json(),
                 )
-            except asyncio.TimeoutError as e:
-                if raise_timeout is True:
-                    raise e
-                return None
-            else:
-                return await self._decode_message(await self._parse_message(response))
-            finally:
-                await psub.unsubscribe(callback_channel)
-                await psub.reset()
-                task.cancel()
+
+            try:
+                results = await pipe.execute(raise_on_error=False)
+            except Exception as e:
+                results = [e] * len(messages)
+
+        return [PublishResult.from_result(m, r) for m, r in zip(messages, results)]
 
     @staticmethod
     async def _parse_message(message: Any) -> PropanMessage:
@@ -195,7 +290,7 @@ class RedisBroker(BrokerUsecase):
             )
         else:
             msg = PropanMessage(
-                body=obj.data,
+                body=obj.body,
                 content_type=obj.headers.get("content-type", ""),
                 reply_to=obj.reply_to,
                 headers=obj.headers,
@@ -204,9 +299,13 @@ class RedisBroker(BrokerUsecase):
 
         return msg
 
-    async def _decode_message(self, message: PropanMessage) -> DecodedMessage:
+    def _decode_body(
+        self,
+        message: PropanMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> DecodedMessage:
         if message.headers.get("content-type") is not None:
-            return await super()._decode_message(message)
+            return super()._decode_body(message, codec)
         else:
             return RawDecoced(message=message.body).message
 
@@ -219,6 +318,11 @@ class RedisBroker(BrokerUsecase):
         }
         return context
 
+    def _get_publish_log_context(
+        self, channel: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        return {"channel": channel}
+
     @property
     def fmt(self) -> str:
         return self._fmt or (
@@ -231,6 +335,8 @@ class RedisBroker(BrokerUsecase):
     async def _consume(self, handler: Handler, psub: PubSub) -> NoReturn:
         c = self._get_log_context(None, handler.channel)
 
+        callback = handler.dispatcher or handler.callback
+
         connected = True
         while True:
             try:
@@ -238,6 +344,8 @@ class RedisBroker(BrokerUsecase):
                     ignore_subscribe_messages=True,
                     timeout=self._polling_interval,
                 )
+                if m and handler.batch is True:
+                    m = await self._get_batch(handler, psub, m)
             except Exception:
                 if connected is True:
                     self._log("Connection broken", logging.WARNING, c)
@@ -249,14 +357,71 @@ class RedisBroker(BrokerUsecase):
                     connected = True
 
                 if m:  # pragma: no branch
-                    await handler.callback(m)
+                    await callback(m)
             finally:
                 await asyncio.sleep(0.01)
 
+    async def _subscribe_replies(self) -> None:
+        """Subscribes to the RPC responses channel once per connection"""
+        if self._reply_task is not None:
+            return
+
+        if self._reply_lock is None:
+            self._reply_lock = asyncio.Lock()
+
+        async with self._reply_lock:
+            if self._reply_task is None:  # pragma: no branch
+                psub = self._connection.pubsub()
+                await psub.subscribe(self._reply_channel)
+                self._reply_subscription = psub
+                self._reply_task = asyncio.create_task(self._consume_replies(psub))
+
+    async def _consume_replies(self, psub: PubSub) -> NoReturn:
+        c = self._get_log_context(None, self._reply_channel)
+
+        connected = True
+        while True:
+            try:
+                m = await psub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self._polling_interval,
+                )
+            except Exception:
+                if connected is True:
+                    self._log("Connection broken", logging.WARNING, c)
+                    connected = False
+                await asyncio.sleep(5)
+            else:
+                if connected is False:
+                    self._log("Connection established", logging.INFO, c)
+                    connected = True
+
+                if m:
+                    msg = await self._parse_message(m)
+                    future = self._reply_futures.pop(
+                        msg.headers.get("correlation_id", ""), None
+                    )
+                    if future is not None and not future.done():
+                        future.set_result(msg)
+
+    async def _get_batch(
+        self, handler: Handler, psub: PubSub, first: AnyDict
+    ) -> List[AnyDict]:
+        batch = [first]
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + handler.max_batch_wait
+
+        while len(batch) < handler.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            m = await psub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=timeout,
+            )
+            if m:
+                batch.append(m)
 
-async def _consume_one(queue: asyncio.Queue, psub: PubSub) -> NoReturn:
-    async for m in psub.listen():
-        t = m.get("type")
-        if t and "message" in t:  # pragma: no branch
-            await queue.put(m)
-            break
+        return batch
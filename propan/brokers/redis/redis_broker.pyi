@@ -1,15 +1,31 @@
 import logging
-from typing import Any, Callable, Dict, List, Mapping, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    AsyncContextManager,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from redis.asyncio.client import Redis
 from redis.asyncio.connection import BaseParser, Connection, DefaultParser, Encoder
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.dedup import Dedup
+from propan.brokers.metrics import Metrics
+from propan.brokers.profiler import Profiler
+from propan.brokers.push_back_watcher import BaseWatcher, BaseWatcherStore
 from propan.brokers.redis.schemas import Handler
-from propan.log import access_logger
-from propan.types import DecodedMessage, HandlerWrapper, SendableMessage
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling, access_logger
+from propan.types import DecodedMessage, DecoratedAsync, HandlerWrapper, SendableMessage
 
 T = TypeVar("T")
 
@@ -48,7 +64,14 @@ class RedisBroker(BrokerUsecase):
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = None,
+        async_logging: bool = False,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
     ) -> None:
         """Redis Pub/sub Propan broker
 
@@ -122,6 +145,15 @@ class RedisBroker(BrokerUsecase):
         channel: str,
         *,
         pattern: bool = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 0.5,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
     ) -> HandlerWrapper:
         """Register channel consumer method
 
@@ -142,6 +174,7 @@ class RedisBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = 30.0,
         raise_timeout: bool = False,
+        codec: Optional[CodecType] = None,
     ) -> Optional[DecodedMessage]:
         """Publish the message to the channel.
 
@@ -160,17 +193,58 @@ class RedisBroker(BrokerUsecase):
 
             `DecodedMessage` | `None` if response is expected
         """
+    def redrive(  # type: ignore[override]
+        self,
+        dead_letter: str,
+        source: str,
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Args:
+            dead_letter: dead-letter channel to consume
+            source: channel to publish messages back to
+            rate: maximum messages number to publish per second
+            handle_kwargs: `handle` method options
+
+        Returns:
+            Registered handler
+        """
+    async def publish_batch(  # type: ignore[override]
+        self,
+        messages: Sequence[SendableMessage],
+        channel: str,
+        *,
+        headers: Optional[Dict[str, Any]] = None,
+        message_headers: Optional[Sequence[Dict[str, Any]]] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
+        """Publish messages to the channel using a single pipeline
+
+        `message_headers` are the headers of each message updating `headers`.
+
+        Returns:
+            `PublishResult` for each message in the same order
+        """
     def _get_log_context(  # type: ignore[override]
         self, message: Optional[PropanMessage], channel: str
     ) -> Dict[str, Any]: ...
-    @staticmethod
-    async def _decode_message(message: PropanMessage) -> DecodedMessage: ...
+    def _get_publish_log_context(  # type: ignore[override]
+        self, channel: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]: ...
+    def _decode_body(
+        self,
+        message: PropanMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> DecodedMessage: ...
     @staticmethod
     async def _parse_message(message: Any) -> PropanMessage: ...
-    def _process_message(
+    def _get_process_context(
         self,
-        func: Callable[[PropanMessage], T],
+        message: PropanMessage,
         watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]: ...
+    ) -> AsyncContextManager[None]: ...
     @property
     def fmt(self) -> str: ...
@@ -1,4 +1,5 @@
 import asyncio
+from base64 import b64decode, b64encode
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
@@ -13,6 +14,10 @@ class Handler(BaseHandler):
     channel: str
     pattern: bool = False
 
+    batch: bool = False
+    max_batch_size: int = 10
+    max_batch_wait: float = 0.5
+
     task: Optional["asyncio.Task[Any]"] = None
     subscription: Optional[PubSub] = None
 
@@ -21,3 +26,24 @@ class RedisMessage(BaseModel):
     data: bytes
     headers: Dict[str, str] = Field(default_factory=dict)
     reply_to: str = ""
+
+    @classmethod
+    def build(
+        cls,
+        data: bytes,
+        headers: Dict[str, str],
+        reply_to: str = "",
+    ) -> "RedisMessage":
+        try:
+            data.decode()
+        except UnicodeDecodeError:
+            # the message is sent as a JSON, so binary codecs data is encoded
+            data = b64encode(data)
+            headers = {**headers, "content-encoding": "base64"}
+        return cls(data=data, headers=headers, reply_to=reply_to)
+
+    @property
+    def body(self) -> bytes:
+        if self.headers.get("content-encoding") == "base64":
+            return b64decode(self.data)
+        return self.data
@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional, Sequence, Tuple
+
+from propan.brokers._model.schemas import PropanMessage
+
+__all__ = (
+    "ResultCache",
+    "BaseResultStore",
+    "MemoryResultStore",
+)
+
+KeyGetter = Callable[[PropanMessage], Optional[Hashable]]
+
+
+class BaseResultStore(ABC):
+    """Handler results storage used by `ResultCache`"""
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Optional[Tuple[Any]]:
+        """Stored result wrapped to the tuple or `None` if it is missing"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        raise NotImplementedError()
+
+
+class MemoryResultStore(BaseResultStore):
+    """Process local results storage
+
+    Keeps `max_size` most recently used results, expired ones are dropped at
+    access.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise ValueError("`max_size` should be a positive number")
+
+        self.max_size = max_size
+        # key: (value, expires)
+        self._results: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get(self, key: Hashable) -> Optional[Tuple[Any]]:
+        result = self._results.get(key)
+        if result is None:
+            return None
+
+        value, expires = result
+        if expires is not None and expires <= monotonic():
+            del self._results[key]
+            return None
+
+        self._results.move_to_end(key)
+        return (value,)
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        results = self._results
+        results[key] = (value, None if ttl is None else monotonic() + ttl)
+        results.move_to_end(key)
+        while len(results) > self.max_size:
+            results.popitem(last=False)
+
+
+class ResultCache:
+    """Returns the stored handler result for the same request without a call
+
+    Only RPC requests (messages with `reply_to`) are cached. The request is
+    identified by the raw body, its content type and the `headers` values or
+    by the `key` callable taking the message (its `decoded_body` is
+    available). Messages with `None` key are not cached.
+
+    Only successful results are stored: by the process local LRU store with
+    `max_size` limit or by the passed one.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 60.0,
+        max_size: int = 1024,
+        key: Optional[KeyGetter] = None,
+        headers: Sequence[str] = (),
+        store: Optional[BaseResultStore] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.get_key = key if key is not None else _get_key_factory(tuple(headers))
+        self.store = store if store is not None else MemoryResultStore(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def get(self, key: Hashable) -> Optional[Tuple[Any]]:
+        result = await self.store.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await self.store.set(key, value, self.ttl)
+
+
+def _get_key_factory(headers: Tuple[str, ...]) -> KeyGetter:
+    if not headers:
+
+        def get_key(message: PropanMessage) -> Hashable:
+            return (message.body, message.content_type)
+
+    else:
+
+        def get_key(message: PropanMessage) -> Hashable:
+            h = message.headers
+            return (
+                message.body,
+                message.content_type,
+                *(str(h.get(name)) for name in headers),
+            )
+
+    return get_key
@@ -1,4 +1,5 @@
 import asyncio
+from base64 import b64encode
 from dataclasses import dataclass
 from dataclasses import field as DField
 from typing import Any, Dict, Optional, Sequence
@@ -8,6 +9,7 @@ from typing_extensions import Literal
 
 from propan.brokers._model import BrokerUsecase
 from propan.brokers._model.schemas import BaseHandler, Queue
+from propan.brokers.codecs import BaseCodec
 from propan.types import SendableMessage
 
 
@@ -203,6 +205,8 @@ class Handler(BaseHandler):
     queue: SQSQueue
     consumer_params: Dict[str, Any]
 
+    batch: bool = False
+
     task: Optional["asyncio.Task[Any]"] = None
 
 
@@ -216,13 +220,24 @@ class SQSMessage:
     message_attributes: Dict[str, Any] = DField(default_factory=dict)
     message_system_attributes: Dict[str, Any] = DField(default_factory=dict)
 
-    def to_params(self, **extra_headers: Any) -> Dict[str, Any]:
-        msg, content_type = BrokerUsecase._encode_message(self.message)
+    def to_params(
+        self,
+        codec: Optional[BaseCodec] = None,
+        **extra_headers: Any,
+    ) -> Dict[str, Any]:
+        msg, content_type = BrokerUsecase._encode_message(self.message, codec)
 
         headers = {**extra_headers, "content-type": content_type, **self.headers}
 
+        try:
+            body = msg.decode()
+        except UnicodeDecodeError:
+            # SQS message body should be a text, so binary codecs data is encoded
+            body = b64encode(msg).decode()
+            headers["content-encoding"] = "base64"
+
         params = {
-            "MessageBody": msg.decode(),
+            "MessageBody": body,
             "DelaySeconds": self.delay_seconds,
             "MessageSystemAttributes": self.message_system_attributes,
             "MessageAttributes": {
@@ -1,15 +1,22 @@
 import asyncio
 import logging
-from functools import wraps
+import math
+from base64 import b64decode
+from contextlib import asynccontextmanager
+from functools import partial
 from typing import (
     Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
     Callable,
     Dict,
+    Iterable,
     List,
     NoReturn,
     Optional,
     Sequence,
-    TypeVar,
+    Tuple,
     Union,
 )
 from uuid import uuid4
@@ -19,16 +26,31 @@ from aiobotocore.session import get_session
 from typing_extensions import TypeAlias
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.exceptions import SkipMessage
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers._model.utils import (
+    ConcurrentDispatcher,
+    batch_context,
+    get_batch_headers,
+)
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.correlation import CorrelationManager
+from propan.brokers.dedup import Dedup
+from propan.brokers.exceptions import PublishError
 from propan.brokers.push_back_watcher import (
     BaseWatcher,
     NotPushBackWatcher,
+    RetryContext,
+    RetryPolicy,
+    RetryWatcher,
     WatcherContext,
 )
+from propan.brokers.result_cache import ResultCache
 from propan.brokers.sqs.schema import Handler, SQSMessage, SQSQueue
+from propan.log import LogSampling
 from propan.types import (
     AnyCallable,
+    AnyDict,
+    AsyncFunc,
     DecodedMessage,
     DecoratedCallable,
     HandlerWrapper,
@@ -36,9 +58,9 @@ from propan.types import (
 )
 from propan.utils import context
 
-T = TypeVar("T")
 QueueUrl: TypeAlias = str
-CorrelationId: TypeAlias = str
+
+MAX_VISIBILITY_TIMEOUT = 43200  # 12 hours
 
 
 class SQSBroker(BrokerUsecase):
@@ -46,7 +68,7 @@ class SQSBroker(BrokerUsecase):
     _queues: Dict[str, QueueUrl]
     __max_queue_len: int
     response_queue: str
-    response_callbacks: Dict[CorrelationId, "asyncio.Future[DecodedMessage]"]
+    responses: CorrelationManager[PropanMessage]
     handlers: List[Handler]
 
     def __init__(
@@ -55,13 +77,24 @@ class SQSBroker(BrokerUsecase):
         *,
         log_fmt: Optional[str] = None,
         response_queue: str = "",
+        max_pending_responses: int = 10_000,
         **kwargs: Any,
     ) -> None:
         super().__init__(url, log_fmt=log_fmt, **kwargs)
         self._queues = {}
         self.__max_queue_len = 4
         self.response_queue = response_queue
-        self.response_callbacks = {}
+        self.responses = CorrelationManager(max_pending_responses)
+        self._response_task: Optional["asyncio.Task[Any]"] = None
+
+        if self.metrics is not None and response_queue:
+            self.metrics.gauge(
+                "rpc_pending_requests",
+                "RPC requests waiting for a response",
+                lambda: self.responses.pending,
+                queue=response_queue,
+            )
+        self._not_push_back_watcher = NotPushBackWatcher()
 
     async def _connect(self, *, url: str, **kwargs: Any) -> AioBaseClient:
         session = get_session()
@@ -73,15 +106,22 @@ class SQSBroker(BrokerUsecase):
         return client
 
     async def close(self) -> None:
-        for f in self.response_callbacks.values():
-            f.cancel()
-        self.response_callbacks = {}
+        self.responses.cancel()
+
+        if self._response_task is not None:
+            self._response_task.cancel()
+            self._response_task = None
 
         for h in self.handlers:
             if h.task is not None:
                 h.task.cancel()
                 h.task = None
 
+            if h.dispatcher is not None:
+                await h.dispatcher.wait_closed()
+
+        await self._close_dead_letters()
+
         if self._connection is not None:
             await self._connection.__aexit__(None, None, None)
             self._connection = None
@@ -91,8 +131,12 @@ class SQSBroker(BrokerUsecase):
 
         headers = {i: j.get("StringValue") for i, j in attributes.items()}
 
+        body = message.get("Body", "").encode()
+        if headers.pop("content-encoding", None) == "base64":
+            body = b64decode(body)
+
         return PropanMessage(
-            body=message.get("Body", "").encode(),
+            body=body,
             message_id=message.get("MessageId"),
             content_type=headers.pop("content-type", None),
             reply_to=headers.pop("reply_to", None) or "",
@@ -100,38 +144,94 @@ class SQSBroker(BrokerUsecase):
             raw_message=message,
         )
 
-    def _process_message(
+    def _get_process_context(
         self,
-        func: Callable[[PropanMessage], T],
+        message: PropanMessage,
         watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]:
-        if watcher is None:
-            watcher = NotPushBackWatcher()
-
-        @wraps(func)
-        async def process_wrapper(message: PropanMessage) -> T:
-            context = WatcherContext(
+    ) -> AsyncContextManager[None]:
+        if isinstance(watcher, RetryWatcher):
+            return RetryContext(
                 watcher,
                 message.message_id,
+                _get_receive_count(message),
                 on_success=self.delete_message,
+                on_retry=partial(self.change_message_visibility, message.raw_message),
                 on_max=self.delete_message,
             )
 
-            async with context:
-                r = await func(message)
+        return WatcherContext(
+            watcher or self._not_push_back_watcher,
+            message.message_id,
+            on_success=self.delete_message,
+            on_max=self.delete_message,
+        )
 
-                if message.reply_to:
-                    await self.publish(
-                        message=r or "",
-                        queue=message.reply_to,
-                        headers={
-                            "correlation_id": message.headers.get("correlation_id")
-                        },
-                    )
+    @asynccontextmanager
+    async def _get_batch_process_context(
+        self,
+        messages: Sequence[PropanMessage],
+        watcher: Optional[BaseWatcher],
+    ) -> AsyncIterator[None]:
+        to_delete: List[AnyDict] = []
+        to_delay: List[Tuple[AnyDict, float]] = []
+
+        def add_to_delete(message: PropanMessage) -> AsyncFunc:
+            async def wrapper() -> None:
+                to_delete.append(message.raw_message)
+
+            return wrapper
+
+        def add_to_delay(message: PropanMessage) -> Callable[[float], Awaitable[None]]:
+            async def wrapper(delay: float) -> None:
+                to_delay.append((message.raw_message, delay))
+
+            return wrapper
+
+        contexts: Iterable[AsyncContextManager[None]]
+        if isinstance(watcher, RetryWatcher):
+            contexts = (
+                RetryContext(
+                    watcher,
+                    m.message_id,
+                    _get_receive_count(m),
+                    on_success=add_to_delete(m),
+                    on_retry=add_to_delay(m),
+                    on_max=add_to_delete(m),
+                )
+                for m in messages
+            )
+        else:
+            contexts = (
+                WatcherContext(
+                    watcher or self._not_push_back_watcher,
+                    m.message_id,
+                    on_success=add_to_delete(m),
+                    on_max=add_to_delete(m),
+                )
+                for m in messages
+            )
 
-                return r
+        try:
+            async with batch_context(contexts):
+                yield
+        finally:
+            if to_delete:
+                await self.delete_message_batch(to_delete)
+            if to_delay:
+                await self.change_message_visibility_batch(to_delay)
 
-        return process_wrapper
+    async def _send_reply(
+        self,
+        message: PropanMessage,
+        result: SendableMessage,
+        codec: Optional[BaseCodec] = None,
+    ) -> None:
+        await self.publish(
+            message=result or "",
+            queue=message.reply_to,
+            headers={"correlation_id": message.headers.get("correlation_id")},
+            codec=codec,
+        )
 
     def handle(
         self,
@@ -143,7 +243,16 @@ class SQSBroker(BrokerUsecase):
         message_attributes: Sequence[str] = (),
         request_attempt_id: Optional[str] = None,
         visibility_timeout: int = 0,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,  # 1...10
+        max_batch_wait: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
         _raw: bool = False,
     ) -> HandlerWrapper:
         if isinstance(queue, str):
@@ -151,13 +260,29 @@ class SQSBroker(BrokerUsecase):
 
         self.__max_queue_len = max((self.__max_queue_len, len(queue.name)))
 
+        if batch is True:
+            if not 0 < max_batch_size <= 10:
+                raise ValueError("SQS `max_batch_size` should be in 1...10 range")
+
+            wait_interval = math.ceil(max_batch_wait)
+            max_messages_number = max_batch_size
+
+        attributes = [*attributes]
+        if (
+            isinstance(retry, RetryPolicy)
+            and "ApproximateReceiveCount" not in attributes
+        ):
+            # the delayed retries tries number
+            attributes.append("ApproximateReceiveCount")
+
         params = {
             "WaitTimeSeconds": wait_interval,
             "MaxNumberOfMessages": max_messages_number,
-            "AttributeNames": [*attributes],
+            "AttributeNames": attributes,
             "VisibilityTimeout": visibility_timeout,
             "MessageAttributeNames": (
                 "content-type",
+                "content-encoding",
                 "reply_to",
                 "correlation_id",
                 *message_attributes,
@@ -171,21 +296,28 @@ class SQSBroker(BrokerUsecase):
                 func,
                 queue=queue.name,
                 retry=retry,
+                batch=batch,
+                codec=codec,
+                log_sampling=log_sampling,
+                dead_letter=dead_letter,
+                dedup=dedup,
+                cache=cache,
                 _raw=_raw,
             )
-            handler = Handler(callback=func, queue=queue, consumer_params=params)
+            handler = Handler(
+                callback=func,
+                queue=queue,
+                consumer_params=params,
+                batch=batch,
+            )
+            if max_concurrency is not None:
+                handler.dispatcher = ConcurrentDispatcher(func, max_concurrency)
             self.handlers.append(handler)
             return func
 
         return wrapper
 
     async def start(self) -> None:
-        if self.response_queue:
-            self.handle(
-                self.response_queue,
-                _raw=True,
-            )(self._consume_response)
-
         context.set_local(
             "log_context",
             self._get_log_context(None, ""),
@@ -193,6 +325,10 @@ class SQSBroker(BrokerUsecase):
 
         await super().start()
 
+        if self.response_queue:
+            url = await self.create_queue(self.response_queue)
+            self._response_task = asyncio.create_task(self._consume_responses(url))
+
         for handler in self.handlers:  # pragma: no branch
             c = self._get_log_context(None, handler.queue.name)
             self._log(f"`{handler.callback.__name__}` waiting for messages", extra=c)
@@ -217,7 +353,8 @@ class SQSBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = None,
         raise_timeout: bool = False,
-    ) -> None:
+        codec: Optional[CodecType] = None,
+    ) -> Optional[DecodedMessage]:
         queue_url = await self.get_queue(queue)
 
         if callback is True:
@@ -232,13 +369,6 @@ class SQSBroker(BrokerUsecase):
         else:
             correlation_id = ""
 
-        response_future: Optional["asyncio.Future[DecodedMessage]"]
-        if callback is True:
-            response_future = asyncio.Future()
-            self.response_callbacks[correlation_id] = response_future
-        else:
-            response_future = None
-
         params = SQSMessage(
             message=message,
             headers=headers or {},
@@ -248,21 +378,82 @@ class SQSBroker(BrokerUsecase):
             deduplication_id=deduplication_id,
             group_id=group_id,
         ).to_params(
+            codec=self._get_codec(codec),
             reply_to=reply_to,
             correlation_id=correlation_id,
         )
 
-        await self._connection.send_message(QueueUrl=queue_url, **params)
+        if callback is False:
+            await self._connection.send_message(QueueUrl=queue_url, **params)
+            return None
 
-        if response_future is not None:
+        async with self.responses.expect(correlation_id) as response_future:
+            await self._connection.send_message(QueueUrl=queue_url, **params)
             try:
                 response = await asyncio.wait_for(response_future, callback_timeout)
             except asyncio.TimeoutError as e:
                 if raise_timeout is True:
                     raise e
                 return None
-            else:
-                return response
+
+        return await self._decode_message(response)
+
+    async def publish_batch(
+        self,
+        messages: Sequence[SendableMessage],
+        queue: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        delay_seconds: int = 0,  # 0...900
+        message_attributes: Optional[Dict[str, Any]] = None,
+        message_system_attributes: Optional[Dict[str, Any]] = None,
+        # FIFO only
+        group_id: Optional[str] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
+        queue_url = await self.get_queue(queue)
+
+        c = self._get_codec(codec)
+
+        entries = []
+        for i, m in enumerate(messages):
+            params = SQSMessage(
+                message=m,
+                headers=get_batch_headers(headers, message_headers, i),
+                delay_seconds=delay_seconds,
+                message_attributes=message_attributes or {},
+                message_system_attributes=message_system_attributes or {},
+                group_id=group_id,
+            ).to_params(codec=c)
+            params["Id"] = str(i)
+            entries.append(params)
+
+        results: List[Optional[PublishResult]] = [None] * len(messages)
+        for chunk in chunk_batch_entries(entries):
+            try:
+                r = await self._connection.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=chunk,
+                )
+            except Exception as e:
+                for entry in chunk:
+                    i = int(entry["Id"])
+                    results[i] = PublishResult(messages[i], error=e)
+                continue
+
+            for s in r.get("Successful", ()):
+                i = int(s["Id"])
+                results[i] = PublishResult(messages[i], result=s.get("MessageId"))
+
+            for f in r.get("Failed", ()):
+                i = int(f["Id"])
+                results[i] = PublishResult(
+                    messages[i],
+                    error=PublishError(f"{f.get('Code')}: {f.get('Message')}"),
+                )
+
+        return results  # type: ignore[return-value]
 
     async def create_queue(self, queue: SQSQueue) -> QueueUrl:
         url = self._queues.get(queue.name)
@@ -305,6 +496,42 @@ class SQSBroker(BrokerUsecase):
             ReceiptHandle=message.get("ReceiptHandle", ""),
         )
 
+    async def delete_message_batch(self, messages: Sequence[AnyDict]) -> None:
+        await self._connection.delete_message_batch(
+            QueueUrl=context.get_local("queue_url"),
+            Entries=[
+                {"Id": str(i), "ReceiptHandle": m.get("ReceiptHandle", "")}
+                for i, m in enumerate(messages)
+            ],
+        )
+
+    async def change_message_visibility(
+        self,
+        message: AnyDict,
+        timeout: float,
+    ) -> None:
+        await self._connection.change_message_visibility(
+            QueueUrl=context.get_local("queue_url"),
+            ReceiptHandle=message.get("ReceiptHandle", ""),
+            VisibilityTimeout=_get_visibility_timeout(timeout),
+        )
+
+    async def change_message_visibility_batch(
+        self,
+        messages: Sequence[Tuple[AnyDict, float]],
+    ) -> None:
+        await self._connection.change_message_visibility_batch(
+            QueueUrl=context.get_local("queue_url"),
+            Entries=[
+                {
+                    "Id": str(i),
+                    "ReceiptHandle": m.get("ReceiptHandle", ""),
+                    "VisibilityTimeout": _get_visibility_timeout(timeout),
+                }
+                for i, (m, timeout) in enumerate(messages)
+            ],
+        )
+
     async def _consume(self, queue_url: str, handler: Handler) -> NoReturn:
         c = self._get_log_context(None, handler.queue.name)
 
@@ -334,6 +561,16 @@ class SQSBroker(BrokerUsecase):
                         connected = True
 
                     messages = r.get("Messages", [])
+                    if handler.batch is True:
+                        messages = [messages] if messages else []
+
+                    if handler.dispatcher is not None:
+                        # tasks copy the context, so `queue_url` is still available
+                        for msg in messages:
+                            await handler.dispatcher(msg)
+                        continue
+
+                    has_trash_messages = False
                     for msg in messages:
                         try:
                             await handler.callback(msg, True)
@@ -347,15 +584,38 @@ class SQSBroker(BrokerUsecase):
                             handler.consumer_params.get("WaitTimeSeconds", 1.0)
                         )
 
-    async def _consume_response(self, message: PropanMessage):
-        correlation_id = message.headers.get("correlation_id")
-        if correlation_id is not None:
-            callback = self.response_callbacks.pop(correlation_id, None)
-            if callback is not None:
-                callback.set_result(await self._decode_message(message))
-                return
+    async def _consume_responses(self, queue_url: str) -> NoReturn:
+        c = self._get_log_context(None, self.response_queue)
 
-        raise SkipMessage()
+        with context.scope("queue_url", queue_url):
+            while True:
+                try:
+                    r = await self._connection.receive_message(
+                        QueueUrl=queue_url,
+                        MaxNumberOfMessages=10,
+                        WaitTimeSeconds=1,
+                        MessageAttributeNames=["All"],
+                    )
+                except Exception as e:
+                    self._log(e, logging.WARNING, c)
+                    await asyncio.sleep(5)
+                    continue
+
+                processed: List[AnyDict] = []
+                for m in r.get("Messages", ()):
+                    msg = await self._parse_message(m)
+                    correlation_id = msg.headers.get("correlation_id")
+                    if correlation_id is not None and self.responses.resolve(
+                        correlation_id, msg
+                    ):
+                        processed.append(m)
+
+                # responses nobody waits for stay in the queue for other producers
+                if processed:
+                    try:
+                        await self.delete_message_batch(processed)
+                    except Exception as e:
+                        self._log(e, logging.WARNING, c)
 
     @property
     def fmt(self) -> str:
@@ -374,3 +634,54 @@ class SQSBroker(BrokerUsecase):
             **super()._get_log_context(message),
         }
         return context
+
+    def _get_publish_log_context(
+        self, queue: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]:
+        return {"queue": queue}
+
+
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_SIZE = 256 * 1024
+
+
+def _entry_size(entry: AnyDict) -> int:
+    size = len(entry["MessageBody"].encode())
+    for name, attr in entry.get("MessageAttributes", {}).items():
+        size += len(name.encode()) + len(attr.get("DataType", "").encode())
+        size += len(str(attr.get("StringValue", attr.get("BinaryValue", ""))))
+    return size
+
+
+def chunk_batch_entries(
+    entries: Sequence[AnyDict],
+    max_entries: int = MAX_BATCH_ENTRIES,
+    max_size: int = MAX_BATCH_SIZE,
+) -> List[List[AnyDict]]:
+    """Splits `send_message_batch` entries by the SQS batch limits"""
+    chunks: List[List[AnyDict]] = []
+    chunk: List[AnyDict] = []
+    chunk_size = 0
+
+    for entry in entries:
+        size = _entry_size(entry)
+        if chunk and (len(chunk) == max_entries or chunk_size + size > max_size):
+            chunks.append(chunk)
+            chunk, chunk_size = [], 0
+
+        chunk.append(entry)
+        chunk_size += size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _get_receive_count(message: PropanMessage) -> int:
+    attributes = message.raw_message.get("Attributes", {})
+    return int(attributes.get("ApproximateReceiveCount", 1))
+
+
+def _get_visibility_timeout(timeout: float) -> int:
+    return min(math.ceil(timeout), MAX_VISIBILITY_TIMEOUT)
@@ -1,13 +1,13 @@
-import asyncio
 import logging
 from typing import (
     Any,
-    Callable,
+    AsyncContextManager,
     Dict,
     List,
     NoReturn,
     Optional,
     Sequence,
+    Tuple,
     TypeVar,
     Union,
 )
@@ -17,11 +17,27 @@ from aiobotocore.config import AioConfig
 from typing_extensions import TypeAlias
 
 from propan.brokers._model import BrokerUsecase
-from propan.brokers._model.schemas import PropanMessage
-from propan.brokers.push_back_watcher import BaseWatcher
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import BaseCodec, CodecType
+from propan.brokers.correlation import CorrelationManager
+from propan.brokers.dedup import Dedup
+from propan.brokers.metrics import Metrics
+from propan.brokers.profiler import Profiler
+from propan.brokers.push_back_watcher import (
+    BaseWatcher,
+    BaseWatcherStore,
+    RetryPolicy,
+)
+from propan.brokers.result_cache import ResultCache
 from propan.brokers.sqs.schema import Handler, SQSQueue
-from propan.log import access_logger
-from propan.types import DecodedMessage, HandlerWrapper, SendableMessage
+from propan.log import LogSampling, access_logger
+from propan.types import (
+    AnyDict,
+    DecodedMessage,
+    DecoratedAsync,
+    HandlerWrapper,
+    SendableMessage,
+)
 
 T = TypeVar("T")
 QueueUrl: TypeAlias = str
@@ -30,7 +46,7 @@ class SQSBroker(BrokerUsecase):
     _connection: AioBaseClient
     _queues: Dict[str, QueueUrl]
     response_queue: str
-    response_callbacks: Dict[str, "asyncio.Future[DecodedMessage]"]
+    responses: CorrelationManager[PropanMessage]
     handlers: List[Handler]
 
     def __init__(
@@ -38,6 +54,7 @@ class SQSBroker(BrokerUsecase):
         url: str = "http://localhost:9324/",
         *,
         response_queue: str = "",
+        max_pending_responses: int = 10_000,
         region_name: Optional[str] = None,
         api_version: Optional[str] = None,
         use_ssl: bool = True,
@@ -50,7 +67,14 @@ class SQSBroker(BrokerUsecase):
         logger: Optional[logging.Logger] = access_logger,
         log_level: int = logging.INFO,
         log_fmt: Optional[str] = None,
+        async_logging: bool = False,
         apply_types: bool = True,
+        skip_raw_validation: bool = False,
+        codec: Optional[CodecType] = None,
+        codecs: Sequence[BaseCodec] = (),
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        watcher_store: Optional[BaseWatcherStore] = None,
     ) -> None:
         """"""
     async def connect(
@@ -84,7 +108,42 @@ class SQSBroker(BrokerUsecase):
         callback: bool = False,
         callback_timeout: Optional[float] = None,
         raise_timeout: bool = False,
-    ) -> None:
+        codec: Optional[CodecType] = None,
+    ) -> Optional[DecodedMessage]:
+        """"""
+    def redrive(  # type: ignore[override]
+        self,
+        dead_letter: str,
+        source: str,
+        *,
+        rate: Optional[float] = None,
+        **handle_kwargs: Any,
+    ) -> DecoratedAsync:
+        """Registers a handler publishing dead-letter messages back to the source
+
+        Args:
+            dead_letter: dead-letter queue to consume
+            source: queue to publish messages back to
+            rate: maximum messages number to publish per second
+            handle_kwargs: `handle` method options
+
+        Returns:
+            Registered handler
+        """
+    async def publish_batch(  # type: ignore[override]
+        self,
+        messages: Sequence[SendableMessage],
+        queue: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        message_headers: Optional[Sequence[Dict[str, str]]] = None,
+        delay_seconds: int = 0,  # 0...900
+        message_attributes: Optional[Dict[str, Any]] = None,
+        message_system_attributes: Optional[Dict[str, Any]] = None,
+        # FIFO only
+        group_id: Optional[str] = None,
+        codec: Optional[CodecType] = None,
+    ) -> List[PublishResult]:
         """"""
     def handle(  # type: ignore[override]
         self,
@@ -96,7 +155,16 @@ class SQSBroker(BrokerUsecase):
         message_attributes: Sequence[str] = (),
         request_attempt_id: Optional[str] = None,
         visibility_timeout: int = 0,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
+        batch: bool = False,
+        max_batch_size: int = 10,
+        max_batch_wait: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[CodecType] = None,
+        log_sampling: Optional[LogSampling] = None,
+        dead_letter: Optional[str] = None,
+        dedup: Optional[Dedup] = None,
+        cache: Optional[ResultCache] = None,
     ) -> HandlerWrapper:
         """"""
     async def start(self) -> None:
@@ -109,12 +177,21 @@ class SQSBroker(BrokerUsecase):
         """"""
     async def delete_message(self) -> None:
         """"""
+    async def change_message_visibility(self, message: AnyDict, timeout: float) -> None:
+        """Makes the message visible to consumers again after `timeout` seconds"""
+    async def change_message_visibility_batch(
+        self, messages: Sequence[Tuple[AnyDict, float]]
+    ) -> None:
+        """`change_message_visibility` for several messages by a single request"""
     async def _consume(self, queue_url: str, handler: Handler) -> NoReturn: ...
     @property
     def fmt(self) -> str: ...
     def _get_log_context(  # type: ignore[override]
         self, message: Optional[PropanMessage], queue: str
     ) -> Dict[str, Any]: ...
+    def _get_publish_log_context(  # type: ignore[override]
+        self, queue: str = "", *args: Any, **kwargs: Any
+    ) -> Dict[str, Any]: ...
     @classmethod
     def _build_message(
         cls,
@@ -132,9 +209,9 @@ class SQSBroker(BrokerUsecase):
         reply_to: str = "",
     ) -> Dict[str, Any]: ...
     async def _parse_message(self, message: Dict[str, Any]) -> PropanMessage: ...
-    def _process_message(
+    def _get_process_context(
         self,
-        func: Callable[[PropanMessage], T],
+        message: PropanMessage,
         watcher: Optional[BaseWatcher],
-    ) -> Callable[[PropanMessage], T]: ...
+    ) -> AsyncContextManager[None]: ...
     async def _connect(self, *args: Any, **kwargs: Any) -> AioBaseClient: ...
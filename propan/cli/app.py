@@ -6,6 +6,7 @@ from anyio import create_memory_object_stream, create_task_group
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from typing_extensions import Protocol
 
+from propan.brokers.metrics import Metrics
 from propan.cli.supervisors.utils import set_exit
 from propan.cli.utils.parser import SettingField
 from propan.log import logger
@@ -52,6 +53,18 @@ class PropanApp:
     def set_broker(self, broker: Runnable) -> None:
         self.broker = broker
 
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """Broker metrics if they were enabled by the broker `metrics` option"""
+        return getattr(self.broker, "metrics", None)
+
+    def export_metrics(self) -> str:
+        """Broker metrics in the Prometheus text exposition format"""
+        metrics = self.metrics
+        if metrics is None:
+            return ""
+        return metrics.export()
+
     def on_startup(self, func: AnyCallable) -> AnyCallable:
         return _set_async_hook(self._on_startup_calling, func)
 
@@ -112,6 +125,10 @@ class PropanApp:
         ):
             await self.broker.close()
 
+        profiler = getattr(self.broker, "profiler", None)
+        if profiler is not None and profiler.handlers:
+            self._log(logging.INFO, f"Handlers profile (ms):\n{profiler.report()}")
+
         for func in self._after_shutdown_calling:
             await func()
 
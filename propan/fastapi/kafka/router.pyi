@@ -20,6 +20,7 @@ from typing_extensions import Literal, TypeVar
 
 from propan import KafkaBroker
 from propan.__about__ import __version__
+from propan.brokers.push_back_watcher import RetryPolicy
 from propan.fastapi.core import PropanRouter
 from propan.log import access_logger
 from propan.types import AnyCallable
@@ -131,7 +132,7 @@ class KafkaRouter(PropanRouter[KafkaBroker]):
             "read_uncommitted",
             "read_committed",
         ] = "read_uncommitted",
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
     def event(  # type: ignore[override]
@@ -166,6 +167,6 @@ class KafkaRouter(PropanRouter[KafkaBroker]):
             "read_uncommitted",
             "read_committed",
         ] = "read_uncommitted",
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
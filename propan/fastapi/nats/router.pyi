@@ -28,6 +28,7 @@ from starlette.responses import JSONResponse, Response
 from starlette.types import ASGIApp
 
 from propan import NatsBroker
+from propan.brokers.push_back_watcher import RetryPolicy
 from propan.fastapi.core.router import PropanRouter
 from propan.log import access_logger
 from propan.types import AnyCallable
@@ -98,7 +99,7 @@ class NatsRouter(PropanRouter[NatsBroker]):
         *,
         queue: str = "",
         endpoint: AnyCallable,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
     def event(  # type: ignore[override]
@@ -106,6 +107,6 @@ class NatsRouter(PropanRouter[NatsBroker]):
         subject: str,
         *,
         queue: str = "",
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
@@ -14,7 +14,9 @@ from starlette.responses import JSONResponse, Response
 from starlette.types import ASGIApp
 
 from propan import RabbitBroker
+from propan.brokers.push_back_watcher import RetryPolicy
 from propan.brokers.rabbit import RabbitExchange, RabbitQueue
+from propan.brokers.rabbit.channel_pool import ConfirmMode, PickStrategy
 from propan.fastapi.core import PropanRouter
 from propan.log import access_logger
 from propan.types import AnyCallable
@@ -57,6 +59,10 @@ class RabbitRouter(PropanRouter[RabbitBroker]):
         log_fmt: Optional[str] = None,
         apply_types: bool = True,
         consumers: Optional[int] = None,
+        declare: bool = True,
+        publisher_channels: int = 1,
+        publisher_confirms: ConfirmMode = "on",
+        publisher_strategy: PickStrategy = "round_robin",
     ) -> None:
         pass
     def add_api_mq_route(  # type: ignore[override]
@@ -65,7 +71,7 @@ class RabbitRouter(PropanRouter[RabbitBroker]):
         *,
         endpoint: AnyCallable,
         exchange: Union[str, RabbitExchange, None] = None,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
     def event(  # type: ignore[override]
@@ -73,6 +79,6 @@ class RabbitRouter(PropanRouter[RabbitBroker]):
         queue: Union[str, RabbitQueue],
         *,
         exchange: Union[str, RabbitExchange, None] = None,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
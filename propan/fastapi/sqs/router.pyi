@@ -12,6 +12,7 @@ from starlette.responses import JSONResponse, Response
 from starlette.types import ASGIApp
 
 from propan import SQSBroker
+from propan.brokers.push_back_watcher import RetryPolicy
 from propan.brokers.sqs.schema import SQSQueue
 from propan.fastapi.core.router import PropanRouter
 from propan.log import access_logger
@@ -66,7 +67,7 @@ class SQSRouter(PropanRouter[SQSBroker]):
         message_attributes: Sequence[str] = (),
         request_attempt_id: Optional[str] = None,
         visibility_timeout: int = 0,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
         endpoint: AnyCallable,
     ) -> None:
         pass
@@ -80,6 +81,6 @@ class SQSRouter(PropanRouter[SQSBroker]):
         message_attributes: Sequence[str] = (),
         request_attempt_id: Optional[str] = None,
         visibility_timeout: int = 0,
-        retry: Union[bool, int] = False,
+        retry: Union[bool, int, RetryPolicy] = False,
     ) -> None:
         pass
@@ -1,6 +1,13 @@
+from propan.log.formatter import LogContextFilter
+from propan.log.handlers import AsyncLogHandler, use_async_logging
 from propan.log.logging import access_logger, logger
+from propan.log.sampling import LogSampling
 
 __all__ = (
     "logger",
     "access_logger",
+    "AsyncLogHandler",
+    "use_async_logging",
+    "LogSampling",
+    "LogContextFilter",
 )
@@ -1,16 +1,13 @@
 import logging
 import sys
 from collections import defaultdict
-from types import TracebackType
-from typing import Callable, DefaultDict, Mapping, Optional, Tuple, Type, Union
+from typing import Any, Callable, DefaultDict, Mapping, Optional
 
 import click
 from typing_extensions import Literal
 
 from propan.utils.context.main import context
 
-original_makeRecord = logging.Logger.makeRecord
-
 
 class ColourizedFormatter(logging.Formatter):
     level_name_colors: DefaultDict[str, Callable[[str], str]] = defaultdict(
@@ -70,36 +67,29 @@ class ColourizedFormatter(logging.Formatter):
         return super().formatMessage(record)
 
 
-def make_record_with_extra(
-    self: logging.Logger,
-    name: str,
-    level: int,
-    fn: str,
-    lno: int,
-    msg: str,
-    args: Tuple[str],
-    exc_info: Optional[
-        Union[
-            Tuple[Type[BaseException], BaseException, Optional[TracebackType]],
-            Tuple[None, None, None],
-        ]
-    ],
-    func: Optional[str] = None,
-    extra: Optional[Mapping[str, object]] = None,
-    sinfo: Optional[str] = None,
-) -> logging.LogRecord:
-    if extra is None:
-        extra = context.get_local("log_context")
-
-    record = original_makeRecord(
-        self, name, level, fn, lno, msg, args, exc_info, func, extra, sinfo
-    )
+class LogContextFilter(logging.Filter):
+    """Adds the current message `log_context` fields to the logger records
 
-    return record
+    Propan loggers use it by default, add it to your own loggers or handlers to
+    get the message context in their records.
+    """
 
+    def filter(self, record: logging.LogRecord) -> bool:
+        log_context: Optional[Mapping[str, Any]] = context.get_local("log_context")
+        if log_context:
+            d = record.__dict__
+            for k, v in log_context.items():
+                if k not in d:
+                    d[k] = v
+        return True
 
-def expand_log_field(field: str, symbols: int) -> str:
-    return field + (" " * (symbols - len(field)))
 
+def add_log_context_filter(logger: logging.Logger) -> None:
+    for f in logger.filters:
+        if isinstance(f, LogContextFilter):
+            return
+    logger.addFilter(LogContextFilter())
 
-logging.Logger.makeRecord = make_record_with_extra  # type: ignore
+
+def expand_log_field(field: str, symbols: int) -> str:
+    return field + (" " * (symbols - len(field)))
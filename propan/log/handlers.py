@@ -0,0 +1,68 @@
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import List, Optional
+
+__all__ = (
+    "AsyncLogHandler",
+    "use_async_logging",
+)
+
+
+class AsyncLogHandler(QueueHandler):
+    """Passes records to the wrapped handlers running in a separated thread
+
+    Formatting and I/O of the wrapped handlers are moved out of the event loop:
+    the loop only puts the record to the queue.
+    """
+
+    def __init__(self, *handlers: logging.Handler) -> None:
+        super().__init__(SimpleQueue())  # type: ignore[arg-type]
+        self.handlers: List[logging.Handler] = list(handlers)
+        self.listener: Optional[QueueListener] = None
+
+    def start(self) -> None:
+        if self.listener is None:
+            self.listener = QueueListener(
+                self.queue,  # type: ignore[arg-type]
+                *self.handlers,
+                respect_handler_level=True,
+            )
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Waits for the queued records to be written"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            atexit.unregister(self.stop)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the message is formatted by the wrapped handlers, records with
+        # arguments or traceback are prepared here to be safe to pass
+        # to the other thread
+        if record.args or record.exc_info:
+            return super().prepare(record)
+        return record
+
+    def close(self) -> None:
+        self.stop()
+        super().close()
+
+
+def use_async_logging(logger: logging.Logger) -> AsyncLogHandler:
+    """Moves the logger handlers behind the `AsyncLogHandler` and starts it"""
+    for h in logger.handlers:
+        if isinstance(h, AsyncLogHandler):
+            handler = h
+            break
+    else:
+        handler = AsyncLogHandler(*logger.handlers)
+        for h in handler.handlers:
+            logger.removeHandler(h)
+        logger.addHandler(handler)
+
+    handler.start()
+    return handler
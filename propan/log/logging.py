@@ -3,7 +3,7 @@ import logging.config
 from functools import partial
 from typing import Any, Dict, Type
 
-from propan.log.formatter import ColourizedFormatter
+from propan.log.formatter import ColourizedFormatter, add_log_context_filter
 
 
 def configure_formatter(
@@ -51,3 +51,6 @@ logging.config.dictConfig(LOGGING_CONFIG)
 
 logger = logging.getLogger("propan")
 access_logger = logging.getLogger("propan.access")
+
+add_log_context_filter(logger)
+add_log_context_filter(access_logger)
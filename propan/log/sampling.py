@@ -0,0 +1,39 @@
+from typing import Optional
+
+__all__ = ("LogSampling",)
+
+
+class LogSampling:
+    """Handler access logs sampling
+
+    Instead of "Received" and "Processed" lines for each message, a single
+    line is written for 1 of `rate` messages and for the messages processed
+    slower than `slow` seconds. Errors are logged always, so without both
+    options only the failed messages are logged.
+    """
+
+    __slots__ = ("rate", "slow", "_counter")
+
+    def __init__(
+        self,
+        rate: Optional[int] = None,
+        slow: Optional[float] = None,
+    ) -> None:
+        if rate is not None and rate < 1:
+            raise ValueError("Sampling `rate` should be a positive number")
+
+        self.rate = rate
+        self.slow = slow
+        self._counter = 0
+
+    def is_sampled(self, duration: float) -> bool:
+        if self.slow is not None and duration >= self.slow:
+            return True
+
+        if self.rate is not None:
+            self._counter += 1
+            if self._counter >= self.rate:
+                self._counter = 0
+                return True
+
+        return False
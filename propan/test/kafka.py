@@ -2,6 +2,7 @@ import sys
 from datetime import datetime
 from types import MethodType
 from typing import Any, Dict, Optional
+from uuid import uuid4
 
 from aiokafka.structs import ConsumerRecord
 
@@ -11,6 +12,8 @@ else:
     from unittest.mock import AsyncMock
 
 from propan import KafkaBroker
+from propan.brokers._model import BrokerUsecase
+from propan.brokers.codecs import BaseCodec, CodecType
 from propan.test.utils import call_handler
 from propan.types import SendableMessage
 
@@ -29,14 +32,17 @@ def build_message(
     headers: Optional[Dict[str, str]] = None,
     *,
     reply_to: str = "",
+    codec: Optional[BaseCodec] = None,
 ) -> ConsumerRecord:
-    msg, content_type = KafkaBroker._encode_message(message)
+    msg, content_type = KafkaBroker._encode_message(message, codec)
     k = key or b""
     headers = {
         "content-type": content_type or "",
         "reply_to": reply_to,
         **(headers or {}),
     }
+    if reply_to:
+        headers["correlation_id"] = str(uuid4())
 
     return ConsumerRecord(
         value=msg,
@@ -66,6 +72,7 @@ async def publish(
     callback: bool = False,
     callback_timeout: Optional[float] = None,
     raise_timeout: bool = False,
+    codec: Optional[CodecType] = None,
 ) -> Any:
     incoming = build_message(
         message=message,
@@ -75,6 +82,7 @@ async def publish(
         timestamp_ms=timestamp_ms,
         reply_to=reply_to,
         headers=headers,
+        codec=self._get_codec(codec),
     )
 
     for handler in self.handlers:  # pragma: no branch
@@ -90,4 +98,6 @@ def TestKafkaBroker(broker: KafkaBroker) -> KafkaBroker:
     broker.connect = AsyncMock()  # type: ignore
     broker.start = AsyncMock()  # type: ignore
     broker.publish = MethodType(publish, broker)  # type: ignore
+    broker.publish_batch = MethodType(BrokerUsecase.publish_batch, broker)  # type: ignore
+    broker._instrument_publish()
     return broker
@@ -10,6 +10,8 @@ else:
     from unittest.mock import AsyncMock
 
 from propan import NatsBroker
+from propan.brokers._model import BrokerUsecase
+from propan.brokers.codecs import BaseCodec, CodecType
 from propan.test.utils import call_handler
 from propan.types import SendableMessage
 
@@ -25,8 +27,9 @@ def build_message(
     *,
     reply_to: str = "",
     headers: Optional[Dict[str, Any]] = None,
+    codec: Optional[BaseCodec] = None,
 ) -> Msg:
-    msg, content_type = NatsBroker._encode_message(message)
+    msg, content_type = NatsBroker._encode_message(message, codec)
     return Msg(
         _client=None,  # type: ignore
         subject=subject,
@@ -49,12 +52,14 @@ async def publish(
     callback: bool = False,
     callback_timeout: Optional[float] = 30.0,
     raise_timeout: bool = False,
+    codec: Optional[CodecType] = None,
 ) -> Any:
     incoming = build_message(
         message=message,
         subject=subject,
         reply_to=reply_to,
         headers=headers,
+        codec=self._get_codec(codec),
     )
 
     for handler in self.handlers:  # pragma: no branch
@@ -70,4 +75,6 @@ def TestNatsBroker(broker: NatsBroker) -> NatsBroker:
     broker.connect = AsyncMock()  # type: ignore
     broker.start = AsyncMock()  # type: ignore
     broker.publish = MethodType(publish, broker)  # type: ignore
+    broker.publish_batch = MethodType(BrokerUsecase.publish_batch, broker)  # type: ignore
+    broker._instrument_publish()
     return broker
@@ -17,6 +17,8 @@ from aio_pika.message import IncomingMessage
 from pamqp import commands as spec
 from pamqp.header import ContentHeader
 
+from propan.brokers._model import BrokerUsecase
+from propan.brokers.codecs import BaseCodec, CodecType
 from propan.brokers.rabbit import (
     ExchangeType,
     RabbitBroker,
@@ -49,10 +51,11 @@ def build_message(
     exchange: Union[RabbitExchange, str, None] = None,
     *,
     routing_key: str = "",
+    codec: Optional[BaseCodec] = None,
     **message_kwargs: AnyDict,
 ) -> PatchedMessage:
     que, exch = _validate_queue(queue), _validate_exchange(exchange)
-    msg = RabbitBroker._validate_message(message, None, **message_kwargs)
+    msg = RabbitBroker._validate_message(message, codec=codec, **message_kwargs)
 
     routing = routing_key or (que.name if que else "")
     return PatchedMessage(
@@ -86,6 +89,7 @@ async def publish(
     callback: bool = False,
     callback_timeout: Optional[float] = 30.0,
     raise_timeout: bool = False,
+    codec: Optional[CodecType] = None,
     **message_kwargs: AnyDict,
 ) -> Any:
     incoming = build_message(
@@ -93,6 +97,7 @@ async def publish(
         queue=queue,
         exchange=exchange,
         routing_key=routing_key,
+        codec=self._get_codec(codec),
         **message_kwargs,
     )
 
@@ -129,4 +134,6 @@ def TestRabbitBroker(broker: RabbitBroker) -> RabbitBroker:
     broker._channel = AsyncMock()
     broker.connect = AsyncMock()  # type: ignore
     broker.publish = MethodType(publish, broker)  # type: ignore
+    broker.publish_batch = MethodType(BrokerUsecase.publish_batch, broker)  # type: ignore
+    broker._instrument_publish()
     return broker
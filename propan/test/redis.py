@@ -10,6 +10,8 @@ if sys.version_info < (3, 8):
 else:
     from unittest.mock import AsyncMock
 
+from propan.brokers._model import BrokerUsecase
+from propan.brokers.codecs import BaseCodec, CodecType
 from propan.brokers.redis.redis_broker import RedisBroker
 from propan.brokers.redis.schemas import RedisMessage
 from propan.test.utils import call_handler
@@ -29,13 +31,14 @@ def build_message(
     *,
     reply_to: str = "",
     headers: Optional[Dict[str, Any]] = None,
+    codec: Optional[BaseCodec] = None,
 ) -> Msg:
-    msg, content_type = RedisBroker._encode_message(message)
+    msg, content_type = RedisBroker._encode_message(message, codec)
     return {
         "type": "message",
         "pattern": None,
         "channel": channel.encode(),
-        "data": RedisMessage(
+        "data": RedisMessage.build(
             data=msg,
             headers={
                 "content-type": content_type or "",
@@ -58,12 +61,14 @@ async def publish(
     callback: bool = False,
     callback_timeout: Optional[float] = 30.0,
     raise_timeout: bool = False,
+    codec: Optional[CodecType] = None,
 ) -> Any:
     incoming = build_message(
         message=message,
         channel=channel,
         reply_to=reply_to,
         headers=headers,
+        codec=self._get_codec(codec),
     )
 
     for handler in self.handlers:  # pragma: no branch
@@ -83,4 +88,6 @@ def TestRedisBroker(broker: RedisBroker) -> RedisBroker:
     broker.connect = AsyncMock()  # type: ignore
     broker.start = AsyncMock()  # type: ignore
     broker.publish = MethodType(publish, broker)  # type: ignore
+    broker.publish_batch = MethodType(BrokerUsecase.publish_batch, broker)  # type: ignore
+    broker._instrument_publish()
     return broker
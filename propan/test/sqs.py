@@ -11,6 +11,8 @@ else:
     from unittest.mock import AsyncMock
 
 from propan import SQSBroker
+from propan.brokers._model import BrokerUsecase
+from propan.brokers.codecs import BaseCodec, CodecType
 from propan.brokers.sqs import SQSMessage
 from propan.test.utils import call_handler
 from propan.types import SendableMessage
@@ -32,6 +34,7 @@ def build_message(
     deduplication_id: Optional[str] = None,
     group_id: Optional[str] = None,
     reply_to: str = "",
+    codec: Optional[BaseCodec] = None,
 ) -> Dict[str, Any]:
     params = SQSMessage(
         message=message,
@@ -41,7 +44,7 @@ def build_message(
         message_system_attributes=message_system_attributes or {},
         deduplication_id=deduplication_id,
         group_id=group_id,
-    ).to_params(reply_to=reply_to)
+    ).to_params(codec=codec, reply_to=reply_to)
 
     body = params.get("MessageBody", "0")
     attributes = params.get("MessageAttributes", {})
@@ -73,6 +76,7 @@ async def publish(
     callback: bool = False,
     callback_timeout: Optional[float] = None,
     raise_timeout: bool = False,
+    codec: Optional[CodecType] = None,
 ) -> Any:
     incoming = build_message(
         message=message,
@@ -83,6 +87,7 @@ async def publish(
         deduplication_id=deduplication_id,
         group_id=group_id,
         reply_to=reply_to,
+        codec=self._get_codec(codec),
     )
 
     for handler in self.handlers:  # pragma: no branch
@@ -98,5 +103,10 @@ def TestSQSBroker(broker: SQSBroker) -> SQSBroker:
     broker.connect = AsyncMock()  # type: ignore
     broker.start = AsyncMock()  # type: ignore
     broker.delete_message = AsyncMock()  # type: ignore
+    broker.delete_message_batch = AsyncMock()  # type: ignore
+    broker.change_message_visibility = AsyncMock()  # type: ignore
+    broker.change_message_visibility_batch = AsyncMock()  # type: ignore
     broker.publish = MethodType(publish, broker)  # type: ignore
+    broker.publish_batch = MethodType(BrokerUsecase.publish_batch, broker)  # type: ignore
+    broker._instrument_publish()
     return broker
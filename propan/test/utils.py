@@ -11,6 +11,10 @@ async def call_handler(
     callback_timeout: Optional[float] = 30.0,
     raise_timeout: bool = False,
 ) -> Any:
+    is_batch = getattr(handler, "batch", False) is True
+    if is_batch:
+        message = [message]
+
     try:
         result = await asyncio.wait_for(
             handler.callback(message), timeout=callback_timeout
@@ -21,4 +25,5 @@ async def call_handler(
         result = None
 
     if callback is True:  # pragma: no branch
-        return result
+        # batch handlers results are not sent back by real brokers
+        return None if is_batch else result
@@ -12,7 +12,7 @@ class ContextRepo(Singleton):
     _scope_context: Dict[str, ContextVar[Any]]
 
     def __init__(self) -> None:
-        self._global_context = {}
+        self._global_context = {"context": self}
         self._scope_context = {}
 
     def set_global(self, key: str, v: Any) -> None:
@@ -37,11 +37,17 @@ class ContextRepo(Singleton):
             return context_var.get()
 
     def clear(self) -> None:
-        self._global_context = {}
+        self._global_context = {"context": self}
         self._scope_context = {}
 
     def get(self, key: str) -> Any:
-        return self.context.get(key)
+        """Looks for the local (scoped) value first and for the global one then"""
+        context_var = self._scope_context.get(key)
+        if context_var is not None:
+            v = context_var.get()
+            if v is not None:
+                return v
+        return self._global_context.get(key)
 
     def __getattr__(self, __name: str) -> Any:
         return self.get(__name)
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from inspect import _empty
-from typing import Any
+from operator import attrgetter
+from typing import Any, Callable, Optional
 
 from fast_depends.library import CustomField
 
@@ -8,26 +10,53 @@ from propan.utils.context import context
 
 
 class Context(CustomField):  # type: ignore
+    _getter: Optional[Callable[[], Any]]
+
     def __init__(
         self, real_name: str = "", *, cast: bool = False, default: Any = _empty
     ):
         self.name = real_name
         self.default = default
+        self._getter = None
         super().__init__(cast=cast, required=(default is _empty))
 
+    def set_param_name(self, name: str) -> "Context":
+        super().set_param_name(name)
+        # the dotted path is compiled once at the function decoration
+        self._getter = compile_context_path(self.name or name)
+        return self
+
     def use(self, **kwargs: AnyDict) -> AnyDict:
-        name = self.name or self.param_name
-        default = None if self.default is _empty else self.default
-        return {**kwargs, self.param_name: resolve_context(name) or default}
+        getter = self._getter
+        if getter is None:  # pragma: no cover
+            getter = compile_context_path(self.name or self.param_name)
 
+        v = getter()
+        if v is None and self.default is not _empty:
+            v = self.default
+        kwargs[self.param_name] = v
+        return kwargs
 
-def resolve_context(argument: str) -> Any:
-    keys = argument.split(".")
 
-    v = context.context.get(keys[0])
-    for i in keys[1:]:
-        v = getattr(v, i, None)
-        if v is None:
-            return v
+@lru_cache(maxsize=1024)
+def compile_context_path(argument: str) -> Callable[[], Any]:
+    """Builds a getter of the `key.attr.attr` context path"""
+    key, *attrs = argument.split(".")
+    get = context.get
+
+    if not attrs:
+        return lambda: get(key)
+
+    get_attrs = attrgetter(".".join(attrs))
 
-    return v
+    def getter() -> Any:
+        try:
+            return get_attrs(get(key))
+        except AttributeError:
+            return None
+
+    return getter
+
+
+def resolve_context(argument: str) -> Any:
+    return compile_context_path(argument)()
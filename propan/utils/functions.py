@@ -1,12 +1,13 @@
 import inspect
 from functools import wraps
-from typing import Awaitable, Callable, List, TypeVar, cast
+from typing import Awaitable, Callable, List, TypeVar, Union, cast
 
 from fast_depends.injector import run_async as call_or_await
 from typing_extensions import ParamSpec
 
 __all__ = (
     "call_or_await",
+    "maybe_await",
     "to_async",
 )
 
@@ -23,6 +24,13 @@ def to_async(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
     return wrapper
 
 
+async def maybe_await(value: Union[T, Awaitable[T]]) -> T:
+    """Awaits the value of a method which may be implemented sync or async"""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
 def get_function_arguments(func: Callable[P, T]) -> List[str]:
     signature = inspect.signature(func)
 
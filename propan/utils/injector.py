@@ -0,0 +1,230 @@
+from contextlib import AsyncExitStack
+from copy import deepcopy
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from fast_depends import inject
+from fast_depends.construct import get_dependant
+from fast_depends.model import Dependant
+from fast_depends.provider import Provider, dependency_provider
+from fast_depends.utils import (
+    args_to_kwargs,
+    is_async_gen_callable,
+    is_coroutine_callable,
+    is_gen_callable,
+    run_async,
+    solve_generator_async,
+)
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorList, ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import ModelField
+
+from propan.types import AnyDict
+from propan.utils.context import Context
+
+__all__ = ("compile_apply_types",)
+
+T = TypeVar("T")
+
+RAW_TYPES = (bytes, dict)
+
+IMMUTABLE_DEFAULTS = (type(None), bool, int, float, str, bytes, tuple, frozenset)
+
+# name, alias, required, default, validator
+CompiledField = Tuple[
+    str,
+    str,
+    bool,
+    Any,
+    Optional[Callable[[Any, AnyDict], Tuple[Any, Optional[ErrorList]]]],
+]
+
+Solver = Callable[
+    [AnyDict, Optional[AsyncExitStack], Dict[Any, Any]],
+    Awaitable[Tuple[Any, List[ErrorList]]],
+]
+
+
+def compile_apply_types(
+    func: Callable[..., Awaitable[T]],
+    *,
+    skip_raw_validation: bool = False,
+    dependency_overrides_provider: Provider = dependency_provider,
+) -> Callable[..., Awaitable[T]]:
+    """`apply_types` for coroutine functions with the arguments model compiled once
+
+    The parameters validators, the `Context` fields and the dependencies are
+    resolved at decoration: a call does not inspect the functions, does not
+    run the built-in `Context` fields in a threadpool and skips `Any` fields
+    validation. Other custom fields are called as `fast_depends` does. With `skip_raw_validation` `bytes` and `dict` parameters are
+    passed as is too.
+
+    Calls with active dependency overrides are processed by `fast_depends`.
+    """
+    dependant = get_dependant(call=func, path=func.__name__)
+    fallback = inject(func, dependency_overrides_provider=dependency_overrides_provider)
+
+    names = [p.name for p in dependant.params]
+    with_stack = _has_generators(dependant)
+    solve = _compile_dependant(dependant, skip_raw_validation)
+    error_model = dependant.error_model
+
+    @wraps(func)
+    async def injected_wrapper(*args: Any, **kwargs: Any) -> T:
+        if dependency_overrides_provider.dependency_overrides:
+            return await fallback(*args, **kwargs)  # type: ignore[no-any-return]
+
+        body = args_to_kwargs(names, *args, **kwargs)
+
+        if with_stack is True:
+            async with AsyncExitStack() as stack:
+                r, errors = await solve(body, stack, {})
+        else:
+            r, errors = await solve(body, None, {})
+
+        if errors:
+            raise ValidationError(errors, error_model)
+        return r  # type: ignore[no-any-return]
+
+    return injected_wrapper
+
+
+def _compile_dependant(dependant: Dependant, skip_raw_validation: bool) -> Solver:
+    fields = _compile_fields(dependant.params, skip_raw_validation)
+
+    dependencies = [
+        (
+            d.name,
+            d.use_cache,
+            d.cache_key,
+            _compile_dependant(d, skip_raw_validation),
+        )
+        for d in dependant.dependencies
+    ]
+
+    # the built-in `Context` only reads the context, so it is called in place;
+    # other custom fields may block, so they are run by `fast_depends`
+    customs = [(c.use, type(c).use is Context.use) for c in dependant.custom]
+
+    call = dependant.call
+    is_generator = is_gen_callable(call) or is_async_gen_callable(call)
+    is_async = is_coroutine_callable(call)
+    cast_response = dependant.cast_response if dependant.return_field else None
+
+    async def solve(
+        body: AnyDict,
+        stack: Optional[AsyncExitStack],
+        cache: Dict[Any, Any],
+    ) -> Tuple[Any, List[ErrorList]]:
+        errors: List[ErrorList] = []
+
+        for name, use_cache, cache_key, solve_dependency in dependencies:
+            if use_cache and cache_key in cache:
+                body[name] = cache[cache_key]
+                continue
+
+            solved, sub_errors = await solve_dependency(body, stack, cache)
+            if sub_errors:
+                errors.extend(sub_errors)
+                continue
+
+            body[name] = solved
+            if cache_key not in cache:
+                cache[cache_key] = solved
+
+        for use, is_context in customs:
+            if is_context:
+                body = use(**body)
+            else:
+                body = await run_async(use, **body)
+
+        values = _validate(fields, body, errors)
+        if errors:
+            return None, errors
+
+        if is_generator:
+            assert stack is not None
+            r = await solve_generator_async(call=call, stack=stack, sub_values=values)
+        elif is_async:
+            r = await call(**values)
+        else:
+            r = await run_async(call, **values)
+
+        if cast_response is not None:
+            r, response_errors = cast_response(r)
+            if response_errors:
+                errors.append(response_errors)
+
+        return r, errors
+
+    return solve
+
+
+def _compile_fields(
+    params: Sequence[ModelField],
+    skip_raw_validation: bool,
+) -> List[CompiledField]:
+    compiled: List[CompiledField] = []
+    for field in params:
+        validate: Optional[Callable[..., Tuple[Any, Optional[ErrorList]]]]
+        if field.outer_type_ is Any or (
+            skip_raw_validation is True and field.outer_type_ in RAW_TYPES
+        ):
+            validate = None
+        else:
+            validate = field.validate
+
+        compiled.append(
+            (field.name, field.alias, field.required, field.default, validate)
+        )
+    return compiled
+
+
+def _validate(
+    fields: Sequence[CompiledField],
+    body: AnyDict,
+    errors: List[ErrorList],
+) -> AnyDict:
+    values: AnyDict = {}
+    for name, alias, required, default, validate in fields:
+        value = body.get(alias)
+
+        if value is None:
+            if required:
+                errors.append(ErrorWrapper(MissingError(), loc=(alias,)))
+            elif isinstance(default, IMMUTABLE_DEFAULTS):
+                values[name] = default
+            else:
+                values[name] = deepcopy(default)
+
+        elif validate is None:
+            values[name] = value
+
+        else:
+            v, e = validate(value, values, loc=(alias,))
+            if isinstance(e, ErrorWrapper):
+                errors.append(e)
+            elif isinstance(e, list):  # pragma: no cover
+                errors.extend(e)
+            else:
+                values[name] = v
+
+    return values
+
+
+def _has_generators(dependant: Dependant) -> bool:
+    return any(
+        is_gen_callable(d.call) or is_async_gen_callable(d.call) or _has_generators(d)
+        for d in dependant.dependencies
+    )
@@ -0,0 +1,76 @@
+import time
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from propan.test.kafka import build_message as build_kafka_message
+from propan.test.nats import build_message as build_nats_message
+from propan.test.rabbit import build_message as build_rabbit_message
+from propan.test.redis import build_message as build_redis_message
+from propan.test.sqs import build_message as build_sqs_message
+
+BROKERS = ("rabbit", "kafka", "nats", "redis", "sqs")
+
+MESSAGE_BUILDERS = {
+    "rabbit": build_rabbit_message,
+    "kafka": build_kafka_message,
+    "nats": build_nats_message,
+    "redis": build_redis_message,
+    "sqs": build_sqs_message,
+}
+
+
+def build_broker(name: str, **kwargs: Any) -> Any:
+    if name == "rabbit":
+        from propan.brokers.rabbit import RabbitBroker
+        from propan.test import TestRabbitBroker
+
+        return TestRabbitBroker(RabbitBroker(**kwargs))
+
+    elif name == "kafka":
+        from propan.brokers.kafka import KafkaBroker
+        from propan.test import TestKafkaBroker
+
+        return TestKafkaBroker(KafkaBroker(**kwargs))
+
+    elif name == "nats":
+        from propan.brokers.nats import NatsBroker
+        from propan.test import TestNatsBroker
+
+        return TestNatsBroker(NatsBroker(**kwargs))
+
+    elif name == "redis":
+        from propan.brokers.redis import RedisBroker
+        from propan.test import TestRedisBroker
+
+        return TestRedisBroker(RedisBroker(**kwargs))
+
+    else:
+        from propan.brokers.sqs import SQSBroker
+        from propan.test import TestSQSBroker
+
+        return TestSQSBroker(SQSBroker(**kwargs))
+
+
+async def measure(
+    call: Callable[[], Awaitable[Any]],
+    iterations: int = 10_000,
+) -> float:
+    """Returns the average call time in microseconds"""
+    for _ in range(iterations // 10):  # warm up
+        await call()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def report(title: str, **results: float) -> None:
+    line = " | ".join(f"{k}: {v:8.2f} us" for k, v in results.items())
+    print(f"\n{title:<32} {line}")
+
+
+@pytest.fixture(params=BROKERS)
+def broker_name(request: Any) -> str:
+    return request.param
@@ -0,0 +1,82 @@
+"""Handler arguments validation throughput for the typical signatures"""
+from typing import Any, Awaitable, Callable, Dict
+
+import pytest
+from pydantic import BaseModel
+
+from propan.utils import Context, Depends, apply_types, context
+from propan.utils.injector import compile_apply_types
+from tests.benchmarks.conftest import measure
+
+
+class User(BaseModel):
+    name: str
+    age: int
+    tags: Dict[str, str] = {}
+
+
+async def model_handler(user: User) -> None:
+    ...
+
+
+async def scalars_handler(name: str, age: int, score: float, active: bool) -> None:
+    ...
+
+
+def get_age(age: int) -> int:
+    return age
+
+
+async def get_name(name: str) -> str:
+    return name
+
+
+async def context_handler(
+    name: str,
+    age: int = Depends(get_age),
+    upper_name: str = Depends(get_name),
+    logger=Context(),
+    channel=Context("broker.channel"),
+) -> None:
+    ...
+
+
+class Broker:
+    channel = object()
+
+
+SIGNATURES: Dict[str, Any] = {
+    "pydantic model": (model_handler, ({"name": "John", "age": "30"},), {}),
+    "scalar kwargs": (
+        scalars_handler,
+        (),
+        {"name": "John", "age": "30", "score": "1.5", "active": "true"},
+    ),
+    "Context + Depends": (context_handler, (), {"name": "John", "age": "30"}),
+}
+
+
+def throughput(us: float) -> str:
+    return f"{1_000_000 / us:10.0f} msg/s"
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("signature", SIGNATURES)
+async def test_apply_types(signature: str):
+    context.set_global("logger", object())
+    context.set_global("broker", Broker())
+
+    func, args, kwargs = SIGNATURES[signature]
+
+    def call(f: Callable[..., Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        return lambda: f(*args, **kwargs)
+
+    fast_depends = await measure(call(apply_types(func)), 2_000)
+    compiled = await measure(call(compile_apply_types(func)), 2_000)
+    print(
+        f"\n{signature:<20} fast-depends: {throughput(fast_depends)}"
+        f" | compiled: {throughput(compiled)}"
+    )
+
+    context.clear()
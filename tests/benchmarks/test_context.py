@@ -0,0 +1,113 @@
+"""`Context` fields injection cost per handler call"""
+from inspect import _empty
+from typing import Any
+
+import pytest
+from fast_depends.library import CustomField
+
+from propan.types import AnyDict
+from propan.utils import Context, apply_types, context
+from tests.benchmarks.conftest import measure, report
+
+
+class LegacyContext(CustomField):  # type: ignore
+    """The previous implementation resolving the path at each call"""
+
+    def __init__(self, real_name: str = "", *, default: Any = _empty):
+        self.name = real_name
+        self.default = default
+        super().__init__(cast=False, required=(default is _empty))
+
+    def use(self, **kwargs: AnyDict) -> AnyDict:
+        name = self.name or self.param_name
+        default = None if self.default is _empty else self.default
+        return {**kwargs, self.param_name: legacy_resolve_context(name) or default}
+
+
+def legacy_resolve_context(argument: str) -> Any:
+    keys = argument.split(".")
+
+    v = {
+        "context": context,
+        **{i: j.get() for i, j in context._scope_context.items()},
+        **context._global_context,
+    }.get(keys[0])
+    for i in keys[1:]:
+        v = getattr(v, i, None)
+        if v is None:
+            return v
+
+    return v
+
+
+legacy_logger = LegacyContext()
+legacy_channel = LegacyContext("broker._channel")
+legacy_message = LegacyContext()
+
+
+class Broker:
+    def __init__(self) -> None:
+        self._channel = object()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_context_injection():
+    context.set_global("broker", Broker())
+    context.set_global("logger", object())
+    for i in range(10):
+        context.set_global(f"global_{i}", i)
+
+    @apply_types
+    async def legacy(
+        body: str,
+        logger=legacy_logger,
+        channel=legacy_channel,
+        message=legacy_message,
+    ):
+        return body
+
+    @apply_types
+    async def compiled(
+        body: str,
+        logger=Context(),
+        channel=Context("broker._channel"),
+        message=Context(),
+    ):
+        return body
+
+    with context.scope("message", object()), context.scope("log_context", {}):
+        report(
+            "context injection",
+            legacy=await measure(lambda: legacy("hi")),
+            compiled=await measure(lambda: compiled("hi")),
+        )
+
+    context.clear()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_context_path_resolution():
+    context.set_global("broker", Broker())
+    for i in range(10):
+        context.set_global(f"global_{i}", i)
+
+    legacy, compiled = LegacyContext("broker._channel"), Context("broker._channel")
+    legacy.set_param_name("channel")
+    compiled.set_param_name("channel")
+
+    async def use_legacy():
+        return legacy.use(body="hi")
+
+    async def use_compiled():
+        return compiled.use(body="hi")
+
+    with context.scope("message", object()), context.scope("log_context", {}):
+        report(
+            "context path resolution",
+            legacy=await measure(use_legacy, 100_000),
+            compiled=await measure(use_compiled, 100_000),
+        )
+
+    context.clear()
@@ -0,0 +1,46 @@
+"""Publish side message encoding cost by the message type"""
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from propan.brokers._model.schemas import SendableModel
+from tests.benchmarks.conftest import measure, report
+
+
+class Message(BaseModel):
+    key: str
+    value: int
+
+
+MESSAGES = {
+    "str": "hello",
+    "dict": {"key": "value", "value": 1},
+    "list": [1, 2, 3],
+    "model": Message(key="value", value=1),
+}
+
+
+def validated_to_send(msg: Any) -> bytes:
+    """The previous implementation: coerce by pydantic model first"""
+    m = SendableModel(message=msg).message
+    return SendableModel.to_send(m)[0]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("message_type", tuple(MESSAGES.keys()))
+async def test_encode(message_type: str):
+    message = MESSAGES[message_type]
+
+    async def validated_call():
+        validated_to_send(message)
+
+    async def fast_call():
+        SendableModel.to_send(message)
+
+    report(
+        f"encode {message_type}",
+        validated=await measure(validated_call, 50_000),
+        fast=await measure(fast_call, 50_000),
+    )
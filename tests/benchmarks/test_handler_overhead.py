@@ -0,0 +1,39 @@
+"""Per-message overhead of the handler pipeline
+
+Run with `pytest tests/benchmarks -m slow -s` to see the results table.
+"""
+import pytest
+
+from tests.benchmarks.conftest import MESSAGE_BUILDERS, build_broker, measure, report
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize("apply_types", (False, True))
+async def test_handler_overhead(broker_name: str, apply_types: bool):
+    broker = build_broker(broker_name, apply_types=apply_types, logger=None)
+
+    async def handler(m: dict):
+        return None
+
+    wrapped = broker.handle("test")(handler)
+    message = MESSAGE_BUILDERS[broker_name]({"key": "value"}, "test")
+
+    async def raw_call():
+        parsed = await broker._parse_message(message)
+        await handler(await broker._decode_message(parsed))
+
+    async def pipeline_call():
+        await wrapped(message)
+
+    raw = await measure(raw_call)
+    full = await measure(pipeline_call)
+
+    report(
+        f"{broker_name} (apply_types={apply_types})",
+        raw=raw,
+        pipeline=full,
+        overhead=full - raw,
+    )
+
+    await broker.close()
@@ -0,0 +1,74 @@
+"""Incoming message parsing cost: time and allocated memory per message"""
+import tracemalloc
+from typing import Any, Optional
+from uuid import uuid4
+
+import pytest
+from pydantic import Field
+from pydantic.dataclasses import dataclass as pydantic_dataclass
+
+from propan.brokers._model.schemas import PropanMessage
+from tests.benchmarks.conftest import MESSAGE_BUILDERS, build_broker, measure, report
+
+
+@pydantic_dataclass
+class ValidatedMessage:
+    """The previous `PropanMessage` implementation"""
+
+    body: bytes
+    raw_message: Any
+    content_type: Optional[str] = None
+    reply_to: str = ""
+    headers: dict = Field(default_factory=dict)
+    message_id: str = Field(default_factory=lambda: str(uuid4()))
+
+
+async def allocated(call: Any, iterations: int = 1_000) -> float:
+    """Returns the average allocated memory per call in bytes"""
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        results = [await call() for _ in range(iterations)]
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return (end - start) / iterations
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_parse_message(broker_name: str):
+    broker = build_broker(broker_name, logger=None)
+    message = MESSAGE_BUILDERS[broker_name]({"key": "value"}, "test")
+
+    async def parse():
+        return await broker._parse_message(message)
+
+    print(
+        f"\n{broker_name:<10} parse: {await measure(parse):8.2f} us"
+        f" | allocated: {await allocated(parse):8.1f} B"
+    )
+
+    await broker.close()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_message_construction():
+    async def validated():
+        return ValidatedMessage(body=b"", raw_message=None, headers={})
+
+    async def slotted():
+        return PropanMessage(body=b"", raw_message=None, headers={})
+
+    report(
+        "message construction",
+        validated=await measure(validated, 50_000),
+        slotted=await measure(slotted, 50_000),
+    )
+    print(
+        f"{'message allocation':<32} validated: {await allocated(validated):8.1f} B"
+        f" | slotted: {await allocated(slotted):8.1f} B"
+    )
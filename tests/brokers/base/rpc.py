@@ -21,6 +21,26 @@ class BrokerRPCTestcase:
             )
             assert r == "1"
 
+    @pytest.mark.asyncio
+    async def test_rpc_concurrent(self, queue: str, full_broker: BrokerUsecase):
+        @full_broker.handle(queue)
+        async def m(m: str):  # pragma: no cover
+            return m
+
+        async with full_broker:
+            await full_broker.start()
+
+            r = await asyncio.gather(
+                *(
+                    full_broker.publish(
+                        str(i), queue, callback_timeout=3, callback=True
+                    )
+                    for i in range(100)
+                )
+            )
+
+        assert r == [str(i) for i in range(100)]
+
     @pytest.mark.asyncio
     async def test_rpc_timeout_raises(self, queue: str, full_broker: BrokerUsecase):
         @full_broker.handle(queue)
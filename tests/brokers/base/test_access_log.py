@@ -0,0 +1,117 @@
+import logging
+import threading
+from typing import List
+
+import pytest
+
+from propan.brokers._model import BrokerUsecase
+from propan.brokers._model.utils import change_logger_handlers
+from propan.log import (
+    AsyncLogHandler,
+    LogContextFilter,
+    LogSampling,
+    access_logger,
+    use_async_logging,
+)
+from propan.utils import ContextRepo
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+        self.threads: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.threads.append(threading.current_thread().name)
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("propan.test.access")
+    logger.propagate = False
+    yield logger
+    for h in logger.handlers:
+        logger.removeHandler(h)
+        h.close()
+
+
+def test_sampling_rate():
+    sampling = LogSampling(rate=3)
+    assert [sampling.is_sampled(0) for _ in range(6)] == [False, False, True] * 2
+
+
+def test_sampling_slow():
+    sampling = LogSampling(slow=1.0)
+    assert not sampling.is_sampled(0.5)
+    assert sampling.is_sampled(1.0)
+
+
+def test_sampling_wrong_rate():
+    with pytest.raises(ValueError):
+        LogSampling(rate=0)
+
+
+def test_async_logging(logger: logging.Logger):
+    handler = ListHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+
+    async_handler = use_async_logging(logger)
+    assert logger.handlers == [async_handler]
+    assert use_async_logging(logger) is async_handler
+
+    logger.warning("hello %s", "world")
+    logger.warning("hi", extra={"key": 1})
+    async_handler.stop()
+
+    assert [r.getMessage() for r in handler.records] == ["hello world", "hi"]
+    assert handler.records[1].key == 1
+    assert threading.current_thread().name not in handler.threads
+
+
+def test_change_async_handlers_format(logger: logging.Logger):
+    handler = ListHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(AsyncLogHandler(handler))
+
+    change_logger_handlers(logger, "%(levelname)s %(message)s")
+
+    assert handler.formatter._fmt == "%(levelname)s %(message)s"
+
+
+def test_log_context_scoped_to_propan_loggers(context: ContextRepo):
+    handler = ListHandler()
+    third_party = logging.getLogger("third.party")
+    third_party.addHandler(handler)
+    access_logger.addHandler(handler)
+
+    try:
+        with context.scope("log_context", {"queue": "test", "message": "ignored"}):
+            third_party.warning("hi")
+            access_logger.warning("hi")
+            access_logger.warning("hi", extra={"queue": "extra"})
+
+    finally:
+        third_party.removeHandler(handler)
+        access_logger.removeHandler(handler)
+
+    third, access, access_extra = handler.records
+    assert not hasattr(third, "queue")
+    assert access.queue == "test"
+    assert access.getMessage() == "hi"
+    assert access_extra.queue == "extra"
+
+
+def test_broker_logger_filter(context: ContextRepo):
+    logger = logging.getLogger("propan.test.broker")
+
+    class Broker(BrokerUsecase):
+        ...
+
+    Broker.__abstractmethods__ = frozenset()
+    Broker(logger=logger)
+    Broker(logger=logger)
+
+    assert len([f for f in logger.filters if isinstance(f, LogContextFilter)]) == 1
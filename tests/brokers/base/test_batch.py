@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from propan.brokers._model.utils import get_batch
+
+
+@pytest.mark.asyncio
+async def test_get_full_batch():
+    queue = asyncio.Queue()
+    for i in range(5):
+        queue.put_nowait(i)
+
+    assert await get_batch(queue, 3, 10) == [0, 1, 2]
+    assert await get_batch(queue, 3, 0) == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_get_batch_wait():
+    queue = asyncio.Queue()
+
+    async def produce():
+        await queue.put(1)
+        await asyncio.sleep(0.01)
+        await queue.put(2)
+
+    asyncio.create_task(produce())
+    assert await asyncio.wait_for(get_batch(queue, 10, 0.1), 1) == [1, 2]
@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+
+from propan.brokers._model.schemas import ContentTypes, SendableModel
+from propan.brokers.codecs import (
+    CodecRegistry,
+    JSONCodec,
+    MsgpackCodec,
+    RawCodec,
+    TextCodec,
+)
+
+
+@pytest.mark.parametrize("use_orjson", (True, False))
+def test_json_codec(use_orjson: bool):
+    codec = JSONCodec(use_orjson=use_orjson)
+    assert codec.decode(codec.encode({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+def test_registry_get():
+    registry = CodecRegistry(TextCodec(), JSONCodec())
+
+    assert isinstance(registry.get("application/json"), JSONCodec)
+    assert isinstance(registry.get("application/json; charset=utf-8"), JSONCodec)
+    assert registry.get("application/xml") is None
+
+
+def test_registry_resolve():
+    registry = CodecRegistry(JSONCodec())
+    codec = RawCodec("application/x-protobuf")
+
+    assert registry.resolve(None) is None
+    assert registry.resolve(codec) is codec
+    assert isinstance(registry.resolve("application/json"), JSONCodec)
+
+    with pytest.raises(ValueError):
+        registry.resolve("application/x-protobuf")
+
+
+def test_to_send_default():
+    assert SendableModel.to_send("hi") == (b"hi", ContentTypes.text.value)
+    assert SendableModel.to_send(b"hi") == (b"hi", None)
+
+    body, content_type = SendableModel.to_send({"a": 1})
+    assert content_type == ContentTypes.json.value
+    assert JSONCodec().decode(body) == {"a": 1}
+
+
+def test_to_send_codec():
+    codec = MsgpackCodec()
+
+    body, content_type = SendableModel.to_send({"a": 1}, codec)
+    assert content_type == ContentTypes.msgpack.value
+    assert codec.decode(body) == {"a": 1}
+
+    assert SendableModel.to_send(body, codec) == (body, ContentTypes.msgpack.value)
+
+
+def test_raw_codec():
+    codec = RawCodec("application/x-protobuf")
+
+    assert SendableModel.to_send(b"\x08\x01", codec) == (
+        b"\x08\x01",
+        "application/x-protobuf",
+    )
+    assert codec.decode(b"\x08\x01") == b"\x08\x01"
+
+    with pytest.raises(TypeError):
+        codec.encode({"a": 1})
+
+
+def test_to_send_model():
+    class Child(BaseModel):
+        created: datetime
+
+    class Parent(BaseModel):
+        child: Child
+
+    created = datetime(2023, 1, 1)
+    body, content_type = SendableModel.to_send(Parent(child=Child(created=created)))
+
+    assert content_type == ContentTypes.json.value
+    assert json.loads(body) == {"child": {"created": created.isoformat()}}
+
+
+def test_to_send_model_json_encoders():
+    class Model(BaseModel):
+        created: datetime
+
+        class Config:
+            json_encoders = {datetime: lambda d: "custom"}
+
+    body, _ = SendableModel.to_send(Model(created=datetime.now()))
+    assert json.loads(body) == {"created": "custom"}
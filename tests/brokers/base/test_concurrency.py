@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from propan.brokers._model.utils import ConcurrentDispatcher
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_limits_concurrency():
+    running = 0
+    max_running = 0
+
+    async def callback(i):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return i
+
+    dispatcher = ConcurrentDispatcher(callback, 2)
+
+    tasks = [await dispatcher(i) for i in range(5)]
+    assert dispatcher.in_flight <= 2
+
+    await dispatcher.wait_closed()
+    assert [t.result() for t in tasks] == list(range(5))
+    assert max_running == 2
+    assert dispatcher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_run_releases_on_error():
+    async def callback():
+        raise ValueError()
+
+    dispatcher = ConcurrentDispatcher(callback, 1)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(dispatcher.run(), 1)
+
+    assert dispatcher.in_flight == 0
+
+
+def test_dispatcher_wrong_concurrency():
+    with pytest.raises(ValueError):
+        ConcurrentDispatcher(lambda: None, 0)
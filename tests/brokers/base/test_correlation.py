@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from propan.brokers.correlation import CorrelationManager
+
+
+@pytest.mark.asyncio
+async def test_resolve():
+    manager = CorrelationManager()
+
+    async with manager.expect("1") as future:
+        assert manager.pending == 1
+        assert manager.resolve("1", "response")
+        assert not manager.resolve("1", "response")
+        assert await future == "response"
+
+    assert not manager.resolve("2", "response")
+    assert manager.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_cleanup():
+    manager = CorrelationManager()
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with manager.expect("1") as future:
+            await asyncio.wait_for(future, 0)
+
+    assert manager.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_backpressure():
+    manager = CorrelationManager(max_pending=1)
+
+    async def request(key: str) -> str:
+        async with manager.expect(key) as future:
+            return await future
+
+    first = asyncio.create_task(request("1"))
+    second = asyncio.create_task(request("2"))
+    await asyncio.sleep(0)
+
+    assert manager.pending == 1
+    assert not manager.resolve("2", "2")
+
+    manager.resolve("1", "1")
+    assert await first == "1"
+    await asyncio.sleep(0)
+
+    assert manager.resolve("2", "2")
+    assert await second == "2"
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    manager = CorrelationManager()
+
+    async with manager.expect("1") as future:
+        manager.cancel()
+        assert future.cancelled()
+
+    assert manager.pending == 0
+
+
+def test_wrong_size():
+    with pytest.raises(ValueError):
+        CorrelationManager(max_pending=0)
@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from propan.brokers._model.schemas import PropanMessage, PublishResult
+from propan.brokers.codecs import default_codecs
+from propan.brokers.dead_letter import (
+    ERROR_HEADER,
+    MESSAGE_ID_HEADER,
+    DeadLetterForwarder,
+    RateLimiter,
+)
+from propan.brokers.push_back_watcher import RETRIES_HEADER
+
+
+def _broker():
+    async def publish_batch(messages, *args, **kwargs):
+        return [PublishResult(m) for m in messages]
+
+    return SimpleNamespace(
+        publish_batch=AsyncMock(side_effect=publish_batch),
+        codecs=default_codecs,
+        logger=Mock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_forward_by_batch_size():
+    broker = _broker()
+    forwarder = DeadLetterForwarder(broker, max_batch_size=2, max_wait=10)
+
+    for i in range(2):
+        forwarder.put(
+            "dlq",
+            PropanMessage(
+                b"1",
+                None,
+                content_type="text/plain",
+                headers={
+                    RETRIES_HEADER: 3,
+                    "x-custom": "1",
+                    "reply_to": "reply",
+                    "correlation_id": "1",
+                },
+                message_id=str(i),
+            ),
+            ValueError("Boom"),
+            "handler",
+        )
+    assert not broker.publish_batch.called
+
+    await asyncio.sleep(0)
+    await forwarder.close()
+
+    broker.publish_batch.assert_awaited_once_with(
+        [b"1", b"1"],
+        "dlq",
+        message_headers=[
+            {
+                "x-custom": "1",
+                ERROR_HEADER: "ValueError: Boom",
+                "x-propan-error-type": "ValueError",
+                "x-propan-handler": "handler",
+                MESSAGE_ID_HEADER: str(i),
+            }
+            for i in range(2)
+        ],
+        codec="text/plain",
+    )
+
+
+@pytest.mark.asyncio
+async def test_forward_grouped_by_destination():
+    broker = _broker()
+    forwarder = DeadLetterForwarder(broker, max_wait=10)
+
+    for destination in ("dlq-1", "dlq-2", "dlq-1"):
+        forwarder.put(destination, PropanMessage(b"1", None), ValueError(), "handler")
+    await forwarder.close()
+
+    assert [
+        (c.args[1], len(c.args[0])) for c in broker.publish_batch.await_args_list
+    ] == [("dlq-1", 2), ("dlq-2", 1)]
+
+
+@pytest.mark.asyncio
+async def test_forward_by_timeout():
+    broker = _broker()
+    forwarder = DeadLetterForwarder(broker, max_wait=0.01)
+
+    forwarder.put("dlq", PropanMessage(b"1", None), ValueError(), "handler")
+    await asyncio.sleep(0.05)
+
+    broker.publish_batch.assert_awaited_once()
+    await forwarder.close()
+    broker.publish_batch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_forward_error_logged():
+    broker = _broker()
+    broker.publish_batch.side_effect = ConnectionError()
+    forwarder = DeadLetterForwarder(broker)
+
+    forwarder.put("dlq", PropanMessage(b"1", None), ValueError(), "handler")
+    forwarder.put("dlq", PropanMessage(b"2", None), ValueError(), "handler")
+    await forwarder.close()
+
+    assert broker.logger.error.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_forward_message_error_logged():
+    broker = _broker()
+    broker.publish_batch.side_effect = lambda messages, *args, **kwargs: [
+        PublishResult(messages[0], error=ConnectionError()),
+        PublishResult(messages[1]),
+    ]
+    forwarder = DeadLetterForwarder(broker)
+
+    forwarder.put("dlq", PropanMessage(b"1", None, message_id="1"), ValueError(), "h")
+    forwarder.put("dlq", PropanMessage(b"2", None, message_id="2"), ValueError(), "h")
+    await forwarder.close()
+
+    broker.logger.error.assert_called_once()
+    assert "Message 1 " in broker.logger.error.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter():
+    limiter = RateLimiter(100)
+
+    start = asyncio.get_event_loop().time()
+    for _ in range(5):
+        await limiter.acquire()
+
+    assert asyncio.get_event_loop().time() - start >= 0.035
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+    with pytest.raises(ValueError):
+        DeadLetterForwarder(_broker(), max_batch_size=0)
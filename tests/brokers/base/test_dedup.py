@@ -0,0 +1,68 @@
+import pytest
+
+from propan import NatsBroker, RedisBroker
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.dedup import Dedup
+from propan.brokers.push_back_watcher import MemoryWatcherStore
+
+
+def test_message_id_key():
+    assert Dedup().get_key(PropanMessage(b"", None, message_id="1")) == "1"
+
+
+def test_header_key():
+    dedup = Dedup("headers.x-id")
+
+    assert dedup.get_key(PropanMessage(b"", None, headers={"x-id": 1})) == "1"
+    assert dedup.get_key(PropanMessage(b"", None)) is None
+
+
+def test_body_key():
+    dedup = Dedup("body.order.id")
+
+    message = PropanMessage(b"", None, decoded_body={"order": {"id": 1}})
+    assert dedup.get_key(message) == "1"
+
+    assert dedup.get_key(PropanMessage(b"", None, decoded_body={"order": 1})) is None
+    assert dedup.get_key(PropanMessage(b"", None, decoded_body="1")) is None
+
+
+def test_callable_key():
+    dedup = Dedup(lambda m: m.body.decode())
+    assert dedup.get_key(PropanMessage(b"1", None)) == "1"
+
+
+def test_wrong_key():
+    with pytest.raises(ValueError):
+        Dedup("id")
+
+    with pytest.raises(ValueError):
+        Dedup("headers.")
+
+
+@pytest.mark.asyncio
+async def test_hit_rate():
+    dedup = Dedup(store=MemoryWatcherStore(max_entries=1))
+    assert dedup.hit_rate == 0
+
+    assert not await dedup.is_duplicate("1")
+    await dedup.add("1")
+    assert await dedup.is_duplicate("1")
+
+    await dedup.add("2")
+    assert not await dedup.is_duplicate("1")
+
+    assert dedup.hit_rate == 1 / 3
+
+
+@pytest.mark.parametrize("broker_class", (RedisBroker, NatsBroker))
+def test_unstable_message_id(broker_class):
+    broker = broker_class()
+
+    async def handler():  # pragma: no cover
+        pass
+
+    with pytest.raises(ValueError):
+        broker.handle("test", dedup=Dedup())(handler)
+
+    broker.handle("test", dedup=Dedup("headers.x-id"))(handler)
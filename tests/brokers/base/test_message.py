@@ -0,0 +1,56 @@
+from unittest.mock import Mock
+
+import pytest
+from pydantic import ValidationError, create_model
+
+from propan.brokers._model.schemas import PropanMessage
+
+
+def test_lazy_message_id():
+    message = PropanMessage(body=b"", raw_message=None)
+    assert message.message_id == message.message_id
+
+    assert PropanMessage(body=b"", raw_message=None, message_id="1").message_id == "1"
+
+
+def test_lazy_headers():
+    factory = Mock(return_value={"key": "value"})
+    message = PropanMessage(body=b"", raw_message=None, headers=factory)
+
+    factory.assert_not_called()
+    assert message.headers == {"key": "value"}
+    assert message.headers == {"key": "value"}
+    factory.assert_called_once()
+
+
+def test_default_headers():
+    message = PropanMessage(body=b"", raw_message=None)
+    message.headers["key"] = "value"
+    assert message.headers == {"key": "value"}
+
+
+def test_lazy_decoded_body():
+    decoder = Mock(return_value={"key": "value"})
+    message = PropanMessage(body=b"", raw_message=None)
+    message.set_decoder(decoder)
+
+    decoder.assert_not_called()
+    assert message.decoded_body == {"key": "value"}
+    assert message.decoded_body == {"key": "value"}
+    decoder.assert_called_once_with(message)
+
+
+def test_body_view():
+    message = PropanMessage(body=b"hello", raw_message=None)
+    assert message.body_view[1:3] == b"el"
+    assert message.body_view.obj is message.body
+
+
+def test_pydantic_field():
+    model = create_model("Model", message=(PropanMessage, ...))
+
+    message = PropanMessage(body=b"", raw_message=None)
+    assert model(message=message).message is message
+
+    with pytest.raises(ValidationError):
+        model(message=b"")
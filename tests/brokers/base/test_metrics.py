@@ -0,0 +1,92 @@
+import pytest
+
+from propan.brokers.metrics import Histogram, Metrics
+from propan.brokers.push_back_watcher import PushBackWatcher
+from propan.cli.app import PropanApp
+
+
+def test_histogram_buckets():
+    h = Histogram((0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 5.0):
+        h.observe(v)
+
+    assert h.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert h.count == 4
+    assert h.sum == 5.65
+
+
+def test_prometheus_export():
+    metrics = Metrics(buckets=(1.0,))
+    m = metrics.handler(handler="h", queue='te"st')
+    m.received += 2
+    m.latency.observe(0.5)
+    metrics.publisher(queue="test").published += 1
+
+    assert metrics.handler(handler="h", queue='te"st') is m
+
+    text = metrics.export()
+    labels = 'handler="h",queue="te\\"st"'
+    assert "# TYPE propan_messages_received_total counter" in text
+    assert f"propan_messages_received_total{{{labels}}} 2" in text
+    assert f"propan_messages_in_flight{{{labels}}} 0" in text
+    assert f'propan_handler_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'propan_handler_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"propan_handler_duration_seconds_count{{{labels}}} 1" in text
+    assert 'propan_messages_published_total{queue="test"} 1' in text
+
+
+def test_empty_export():
+    assert Metrics().export() == ""
+
+
+def test_snapshot():
+    metrics = Metrics()
+    metrics.handler(handler="h").failed += 1
+
+    assert metrics.snapshot()["handlers"][0]["labels"] == {"handler": "h"}
+    assert metrics.snapshot()["handlers"][0]["failed"] == 1
+    assert metrics.snapshot()["publishers"] == []
+
+
+def test_gauge():
+    metrics = Metrics()
+    pending = [1]
+    metrics.gauge("pending", "Pending requests", lambda: pending[0], topic="t")
+
+    assert metrics.export() == (
+        "# HELP propan_pending Pending requests\n"
+        "# TYPE propan_pending gauge\n"
+        'propan_pending{topic="t"} 1\n'
+    )
+
+    pending[0] = 0
+    assert metrics.snapshot()["gauges"] == [
+        {"name": "pending", "labels": {"topic": "t"}, "value": 0}
+    ]
+
+
+def test_app_export():
+    class Broker:
+        metrics = Metrics()
+
+        async def start(self) -> None:
+            ...
+
+        async def close(self) -> None:
+            ...
+
+    broker = Broker()
+    broker.metrics.handler(handler="h").received += 1
+
+    assert "propan_messages_received_total" in PropanApp(broker).export_metrics()
+    assert PropanApp().export_metrics() == ""
+
+
+@pytest.mark.asyncio
+async def test_watcher_pushed_back():
+    watcher = PushBackWatcher(max_tries=1)
+    await watcher.add("1")
+    assert await watcher.is_pushed_back("1")
+
+    await watcher.remove("1")
+    assert not await watcher.is_pushed_back("1")
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from propan.brokers.profiler import Profiler
+from propan.utils import apply_types
+
+
+@pytest.mark.asyncio
+async def test_call_and_validation_timings():
+    profile = Profiler().handler(handler="h")
+
+    async def func(a: int) -> int:
+        await asyncio.sleep(0.01)
+        return a
+
+    f = profile.wrap_call(func, apply_types)
+    assert await f("1") == 1
+
+    call, validation = profile.stages["call"], profile.stages["validation"]
+    assert call.count == validation.count == 1
+    assert call.wall >= 0.01
+    assert validation.wall < call.wall
+
+
+@pytest.mark.asyncio
+async def test_call_without_validation():
+    profile = Profiler().handler(handler="h")
+
+    async def func(a: int) -> int:
+        return a
+
+    f = profile.wrap_call(func)
+    assert await f("1") == "1"
+    assert "validation" not in profile.stages
+
+
+@pytest.mark.asyncio
+async def test_context_exit_timing():
+    profile = Profiler().handler(handler="h")
+
+    class Context:
+        async def __aenter__(self) -> None:
+            pass
+
+        async def __aexit__(self, *args) -> None:
+            await asyncio.sleep(0.01)
+
+    get_context = profile.wrap_context(Context)
+    with pytest.raises(ValueError):
+        async with get_context():
+            raise ValueError()
+
+    assert profile.stages["ack"].count == 1
+    assert profile.stages["ack"].wall >= 0.01
+
+
+def test_report():
+    profiler = Profiler()
+    profile = profiler.handler(handler="h", queue="test")
+    profile.stage("parse").add(0.001, 0.001)
+    profile.stage("parse").add(0.003, 0.001)
+
+    lines = profiler.report().splitlines()
+    assert [c.strip() for c in lines[0].split(" | ")][:2] == ["handler", "stage"]
+    assert [c.strip() for c in lines[2].split(" | ")] == [
+        "handler=h, queue=test",
+        "parse",
+        "2",
+        "4.000",
+        "2.000",
+        "3.000",
+        "1.000",
+    ]
+
+    (stats,) = profiler.stats()
+    assert stats["labels"] == {"handler": "h", "queue": "test"}
+    assert stats["stages"]["parse"]["count"] == 2
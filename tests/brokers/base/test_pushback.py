@@ -1,9 +1,17 @@
+import asyncio
+
 import pytest
 
+from propan.brokers._model.utils import get_watcher
 from propan.brokers.exceptions import SkipMessage
 from propan.brokers.push_back_watcher import (
+    BaseWatcher,
     FakePushBackWatcher,
+    MemoryWatcherStore,
     PushBackWatcher,
+    RetryContext,
+    RetryPolicy,
+    RetryWatcher,
     WatcherContext,
 )
 from tests.tools.marks import needs_py38
@@ -28,7 +36,7 @@ async def test_push_back_correct(async_mock):
         await async_mock()
 
     async_mock.on_success.assert_called_once()
-    assert not watcher.memory.get(message_id)
+    assert not await watcher.store.get(message_id)
 
 
 @pytest.mark.asyncio
@@ -124,3 +132,195 @@ async def test_ignore_skip(async_mock):
     assert not async_mock.on_error.called
     assert not async_mock.on_max.called
     assert not async_mock.on_success.called
+
+
+@pytest.mark.asyncio
+async def test_memory_store_counters():
+    store = MemoryWatcherStore()
+
+    assert await store.incr("1") == 1
+    assert await store.incr("1") == 2
+    assert await store.get("1") == 2
+    assert await store.get("2") == 0
+
+    await store.delete("1")
+    await store.delete("2")
+    assert await store.get("1") == 0
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_store_max_entries():
+    store = MemoryWatcherStore(max_entries=2)
+
+    await store.incr("1")
+    await store.incr("2")
+    await store.incr("1")
+    await store.incr("3")
+
+    assert len(store) == 2
+    assert await store.get("1") == 2
+    assert await store.get("2") == 0
+    assert await store.get("3") == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_store_ttl():
+    store = MemoryWatcherStore(ttl=0.05)
+
+    await store.incr("1")
+    await asyncio.sleep(0.1)
+    assert await store.get("1") == 0
+
+    await store.incr("2")
+    await asyncio.sleep(0.1)
+    await store.incr("3")
+    assert len(store) == 1
+
+
+def test_memory_store_validation():
+    with pytest.raises(ValueError):
+        MemoryWatcherStore(max_entries=0)
+
+    with pytest.raises(ValueError):
+        MemoryWatcherStore(ttl=0)
+
+
+@pytest.mark.asyncio
+@needs_py38
+async def test_push_back_shared_store(async_mock):
+    store = MemoryWatcherStore()
+    workers = [PushBackWatcher(2, store=store) for _ in range(3)]
+
+    async_mock.side_effect = ValueError("Ooops!")
+
+    for watcher in workers:
+        with pytest.raises(ValueError):
+            async with WatcherContext(
+                watcher,
+                "1",
+                on_error=async_mock.on_error,
+                on_max=async_mock.on_max,
+            ):
+                await async_mock()
+
+    assert async_mock.on_error.call_count == 2
+    async_mock.on_max.assert_called_once()
+    assert len(store) == 0
+
+
+class SyncWatcher(BaseWatcher):
+    def __init__(self, max_tries: int) -> None:
+        super().__init__(max_tries)
+        self.memory = {}
+
+    def add(self, message_id: str) -> None:
+        self.memory[message_id] = self.memory.get(message_id, 0) + 1
+
+    def is_max(self, message_id: str) -> bool:
+        return self.memory.get(message_id, 0) > self.max_tries
+
+    def remove(self, message_id: str) -> None:
+        self.memory.pop(message_id, None)
+
+
+@pytest.mark.asyncio
+@needs_py38
+async def test_sync_watcher_subclass(async_mock):
+    watcher = SyncWatcher(2)
+
+    async_mock.side_effect = ValueError("Ooops!")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            async with WatcherContext(
+                watcher,
+                "1",
+                on_error=async_mock.on_error,
+                on_max=async_mock.on_max,
+            ):
+                await async_mock()
+
+    assert async_mock.on_error.call_count == 2
+    async_mock.on_max.assert_called_once()
+    assert not watcher.memory
+
+
+def test_retry_policy_delays():
+    assert RetryPolicy(base=2, backoff="constant").get_delay(3) == 2
+    assert RetryPolicy(base=2, backoff="linear").get_delay(3) == 6
+    assert RetryPolicy(base=2).get_delay(1) == 2
+    assert RetryPolicy(base=2).get_delay(3) == 8
+    assert RetryPolicy(base=2, max_delay=5).get_delay(3) == 5
+    assert RetryPolicy(base=2, max_delay=5).get_delay(10**6) == 5
+
+
+def test_retry_policy_validation():
+    with pytest.raises(ValueError):
+        RetryPolicy(backoff="random")
+
+    with pytest.raises(ValueError):
+        RetryPolicy(max_tries=-1)
+
+    with pytest.raises(ValueError):
+        RetryPolicy(base=-1)
+
+
+def test_get_retry_watcher():
+    policy = RetryPolicy(5)
+    watcher = get_watcher(None, policy, destination="queue")
+
+    assert isinstance(watcher, RetryWatcher)
+    assert watcher.max_tries == 5
+    assert watcher.policy is policy
+    assert watcher.destination == "queue"
+
+
+@pytest.mark.asyncio
+@needs_py38
+async def test_retry_context(async_mock):
+    watcher = RetryWatcher(RetryPolicy(2, base=1))
+
+    async_mock.side_effect = ValueError("Ooops!")
+
+    for tries in (1, 2, 3):
+        with pytest.raises(ValueError):
+            async with RetryContext(
+                watcher,
+                "1",
+                tries,
+                on_success=async_mock.on_success,
+                on_retry=async_mock.on_retry,
+                on_max=async_mock.on_max,
+            ):
+                await async_mock()
+
+        if tries < 3:
+            async_mock.on_retry.assert_awaited_with(2 ** (tries - 1))
+            assert await watcher.is_pushed_back("1")
+
+    assert async_mock.on_retry.await_count == 2
+    async_mock.on_max.assert_awaited_once()
+    assert not async_mock.on_success.called
+    assert not await watcher.is_pushed_back("1")
+
+
+@pytest.mark.asyncio
+@needs_py38
+async def test_retry_context_success(async_mock):
+    watcher = RetryWatcher(RetryPolicy())
+    await watcher.add("1")
+
+    async with RetryContext(
+        watcher,
+        "1",
+        2,
+        on_success=async_mock.on_success,
+        on_retry=async_mock.on_retry,
+        on_max=async_mock.on_max,
+    ):
+        await async_mock()
+
+    async_mock.on_success.assert_awaited_once()
+    assert not async_mock.on_retry.called
+    assert not await watcher.is_pushed_back("1")
@@ -0,0 +1,51 @@
+import pytest
+
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.result_cache import MemoryResultStore, ResultCache
+
+
+def test_default_key():
+    cache = ResultCache(headers=("x-tenant",))
+
+    key = cache.get_key(PropanMessage(b"1", None, headers={"x-tenant": "a"}))
+    assert key == cache.get_key(PropanMessage(b"1", None, headers={"x-tenant": "a"}))
+    assert key != cache.get_key(PropanMessage(b"1", None, headers={"x-tenant": "b"}))
+    assert key != cache.get_key(PropanMessage(b"2", None, headers={"x-tenant": "a"}))
+
+
+@pytest.mark.asyncio
+async def test_none_result():
+    cache = ResultCache()
+
+    assert await cache.get("1") is None
+    await cache.set("1", None)
+    assert await cache.get("1") == (None,)
+    assert cache.hit_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_ttl():
+    cache = ResultCache(ttl=0)
+
+    await cache.set("1", 1)
+    assert await cache.get("1") is None
+    assert len(cache.store) == 0
+
+
+@pytest.mark.asyncio
+async def test_lru():
+    store = MemoryResultStore(max_size=2)
+
+    await store.set("1", 1, None)
+    await store.set("2", 2, None)
+    await store.get("1")
+    await store.set("3", 3, None)
+
+    assert await store.get("1") == (1,)
+    assert await store.get("2") is None
+    assert len(store) == 2
+
+
+def test_wrong_size():
+    with pytest.raises(ValueError):
+        MemoryResultStore(max_size=0)
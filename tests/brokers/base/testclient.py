@@ -1,10 +1,27 @@
 import asyncio
-from typing import Any
+import json
+import logging
+import time
+from typing import Any, List
+from unittest.mock import Mock
 
 import pytest
 from pydantic import ValidationError, create_model
 
 from propan.brokers._model import BrokerUsecase
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.codecs import MsgpackCodec
+from propan.brokers.dead_letter import (
+    ERROR_HEADER,
+    ERROR_TYPE_HEADER,
+    HANDLER_HEADER,
+)
+from propan.brokers.dedup import Dedup
+from propan.brokers.exceptions import SkipMessage
+from propan.brokers.metrics import Metrics
+from propan.brokers.profiler import Profiler
+from propan.brokers.result_cache import ResultCache
+from propan.log import LogSampling
 from propan.types import AnyCallable
 
 
@@ -70,3 +87,371 @@ class BrokerTestclientTestcase:
                     raise_timeout=True,
                     callback_timeout=0,
                 )
+
+    @pytest.mark.asyncio
+    async def test_batch_handler_calling(self, queue: str, test_broker: BrokerUsecase):
+        @test_broker.handle(queue, batch=True)
+        async def handler(m: List[dict]):
+            return m
+
+        raw_msg = {"msg": "hello!"}
+        message = self.build_message(raw_msg, queue)
+
+        wrong_msg = self.build_message("Hi!", queue)
+
+        async with test_broker:
+            await test_broker.start()
+            assert [raw_msg, raw_msg] == await handler([message, message])
+
+            assert await handler([message, wrong_msg]) is None
+
+            with pytest.raises(ValidationError):
+                await handler([message, wrong_msg], reraise_exc=True)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_handler_calling(
+        self, queue: str, test_broker: BrokerUsecase
+    ):
+        @test_broker.handle(queue, max_concurrency=2)
+        async def handler(m: dict):
+            return m
+
+        raw_msg = {"msg": "hello!"}
+        message = self.build_message(raw_msg, queue)
+
+        async with test_broker:
+            await test_broker.start()
+            assert raw_msg == await handler(message)
+            assert test_broker.handlers[-1].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_publish(self, queue: str, test_broker: BrokerUsecase):
+        consumed: List[List[str]] = []
+
+        @test_broker.handle(queue, batch=True)
+        async def handler(m: List[str]):
+            consumed.append(m)
+            return m
+
+        async with test_broker:
+            await test_broker.start()
+            assert (
+                await test_broker.publish(
+                    "hello", queue, callback=True, callback_timeout=1
+                )
+                is None
+            )
+
+        assert consumed == [["hello"]]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "message",
+        (
+            "hello",
+            {"message": "hello!"},
+            [1, 2, 3],
+        ),
+    )
+    async def test_publish_codec(
+        self, message: Any, queue: str, test_broker: BrokerUsecase
+    ):
+        @test_broker.handle(queue)
+        async def handler(m: Any):
+            return m
+
+        async with test_broker:
+            await test_broker.start()
+            r = await test_broker.publish(
+                message, queue, callback=True, codec="application/msgpack"
+            )
+            assert r == message
+
+    @pytest.mark.asyncio
+    async def test_handler_codec(self, queue: str, test_broker: BrokerUsecase):
+        codec = MsgpackCodec()
+
+        @test_broker.handle(queue, codec=codec)
+        async def handler(m: dict):
+            return m
+
+        raw_msg = {"msg": "hello!"}
+        message = self.build_message(codec.encode(raw_msg), queue)
+
+        async with test_broker:
+            await test_broker.start()
+            assert raw_msg == await handler(message)
+
+    @pytest.mark.asyncio
+    async def test_bytes_handler_calling(self, queue: str, test_broker: BrokerUsecase):
+        @test_broker.handle(queue)
+        async def handler(m: bytes):
+            return m
+
+        raw_msg = {"msg": "hello!"}
+        message = self.build_message(raw_msg, queue)
+
+        async with test_broker:
+            await test_broker.start()
+            assert json.loads(await handler(message)) == raw_msg
+
+    @pytest.mark.asyncio
+    async def test_publish_batch(self, queue: str, test_broker: BrokerUsecase):
+        consumed = []
+
+        @test_broker.handle(queue)
+        async def handler(m: str):
+            consumed.append(m)
+
+        async with test_broker:
+            await test_broker.start()
+            results = await test_broker.publish_batch(["hello", "world"], queue)
+
+        assert all(r.ok for r in results)
+        assert [r.message for r in results] == ["hello", "world"]
+        assert consumed == ["hello", "world"]
+
+    @pytest.mark.asyncio
+    async def test_metrics(self, queue: str, test_broker: BrokerUsecase):
+        test_broker.metrics = metrics = Metrics()
+        test_broker._instrument_publish()
+
+        @test_broker.handle(queue)
+        async def handler(m: str):
+            if m == "error":
+                raise ValueError()
+            elif m == "skip":
+                raise SkipMessage()
+
+        async with test_broker:
+            await test_broker.start()
+            for m in ("hello", "error", "skip"):
+                await test_broker.publish(m, queue)
+
+        (h,) = metrics.handlers.values()
+        assert dict(h.labels)["handler"] == "handler"
+        assert queue in dict(h.labels).values()
+        assert (h.received, h.processed, h.failed, h.skipped) == (3, 1, 1, 1)
+        assert h.in_flight == 0
+        assert h.latency.count == 3
+
+        (p,) = metrics.publishers.values()
+        assert queue in dict(p.labels).values()
+        assert p.published == 3
+
+        assert f'"{queue}"' in metrics.export()
+
+    @pytest.mark.asyncio
+    async def test_reply_metrics(self, queue: str, test_broker: BrokerUsecase):
+        test_broker.metrics = metrics = Metrics()
+        test_broker._instrument_publish()
+
+        def build_request(i: int) -> PropanMessage:
+            return PropanMessage(
+                b"",
+                Mock(correlation_id=str(i)),
+                reply_to=f"{queue}.reply.{i}",
+                headers={"correlation_id": str(i)},
+            )
+
+        async with test_broker:
+            await test_broker.start()
+            await test_broker._reply(build_request(0), "ok")
+            publishers = len(metrics.publishers)
+
+            for i in range(1, 10):
+                await test_broker._reply(build_request(i), "ok")
+
+        assert len(metrics.publishers) == publishers
+        for p in metrics.publishers.values():
+            assert queue not in str(p.labels)
+
+    @pytest.mark.asyncio
+    async def test_log_sampling(self, queue: str, test_broker: BrokerUsecase):
+        test_broker.logger = logger = logging.getLogger("propan.test.sampling")
+        logger.setLevel(logging.INFO)
+        messages: List[str] = []
+        logger.log = lambda level, msg, *args, **kwargs: messages.append(msg)
+
+        @test_broker.handle(queue, log_sampling=LogSampling(rate=2))
+        async def handler(m: str):
+            if m == "error":
+                raise ValueError()
+
+        async with test_broker:
+            await test_broker.start()
+            for m in ("1", "2", "3", "4", "error"):
+                await test_broker.publish(m, queue)
+
+        assert len(messages) == 3, messages
+        assert messages[0].startswith("Processed in")
+        assert messages[1].startswith("Processed in")
+        assert messages[2] == "ValueError()"
+
+    @pytest.mark.asyncio
+    async def test_profiler(self, queue: str, test_broker: BrokerUsecase):
+        test_broker.profiler = profiler = Profiler()
+
+        @test_broker.handle(queue)
+        async def handler(m: int):
+            return m
+
+        async with test_broker:
+            await test_broker.start()
+            assert await test_broker.publish(1, queue, callback=True) == 1
+            assert await test_broker.publish("1", queue, callback=True) == 1
+
+            with pytest.raises(ValidationError):
+                await handler(self.build_message("a", queue), reraise_exc=True)
+
+        ((labels, profile),) = profiler.handlers.items()
+        assert dict(labels)["handler"] == "handler"
+
+        stages = profile.as_dict()
+        for stage in ("parse", "decode", "ack", "total"):
+            assert stages[stage]["count"] == 3
+        assert stages["validation"]["count"] == 3
+        assert stages["call"]["count"] == 2
+
+        assert "validation" in profiler.report()
+
+    @pytest.mark.asyncio
+    async def test_dead_letter(self, queue: str, test_broker: BrokerUsecase):
+        dead_letter = f"{queue}-dlq"
+        letters: List[PropanMessage] = []
+
+        @test_broker.handle(queue, dead_letter=dead_letter)
+        async def handler(m: str):
+            if m == "error":
+                raise ValueError("Boom")
+
+        @test_broker.handle(dead_letter, _raw=True)
+        async def dead_letter_handler(m):
+            letters.append(m)
+
+        async with test_broker:
+            await test_broker.start()
+            for m in ("1", "error", "2"):
+                await test_broker.publish(m, queue)
+            assert not letters
+
+            await test_broker._close_dead_letters()
+
+        (letter,) = letters
+        assert letter.body == b"error"
+        assert letter.headers[ERROR_HEADER] == "ValueError: Boom"
+        assert letter.headers[ERROR_TYPE_HEADER] == "ValueError"
+        assert letter.headers[HANDLER_HEADER] == "handler"
+
+    @pytest.mark.asyncio
+    async def test_redrive(self, queue: str, test_broker: BrokerUsecase):
+        dead_letter = f"{queue}-dlq"
+        messages: List[PropanMessage] = []
+
+        @test_broker.handle(queue, _raw=True)
+        async def handler(m):
+            messages.append(m)
+
+        test_broker.redrive(dead_letter, queue, rate=20)
+
+        async with test_broker:
+            await test_broker.start()
+            start = time.perf_counter()
+            for _ in range(3):
+                await test_broker.publish(
+                    "hello",
+                    dead_letter,
+                    headers={ERROR_HEADER: "Boom", "x-custom": "1"},
+                )
+            elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.09
+        assert len(messages) == 3
+        assert messages[0].body == b"hello"
+        assert messages[0].headers["x-custom"] == "1"
+        assert ERROR_HEADER not in messages[0].headers
+
+    @pytest.mark.asyncio
+    async def test_dedup(self, queue: str, test_broker: BrokerUsecase):
+        test_broker.metrics = metrics = Metrics()
+        dedup = Dedup("body.id")
+        calls: List[dict] = []
+
+        @test_broker.handle(queue, dedup=dedup)
+        async def handler(m: dict):
+            calls.append(m)
+            if m.get("fail"):
+                raise ValueError()
+
+        async with test_broker:
+            await test_broker.start()
+            for m in (
+                {"id": 1},
+                {"id": 1},
+                {"id": 2, "fail": True},
+                {"id": 2},
+                {"id": 2},
+                {"no": 1},
+                {"no": 1},
+            ):
+                await test_broker.publish(m, queue)
+
+        assert len(calls) == 5
+        assert (dedup.hits, dedup.misses) == (2, 3)
+        (handler_metrics,) = metrics.handlers.values()
+        assert handler_metrics.duplicates == 2
+
+    @pytest.mark.asyncio
+    async def test_result_cache(self, queue: str, test_broker: BrokerUsecase):
+        cache = ResultCache(headers=("x-tenant",))
+        calls: List[dict] = []
+
+        @test_broker.handle(queue, cache=cache)
+        async def handler(m: dict):
+            calls.append(m)
+            if m.get("fail"):
+                raise ValueError()
+            return len(calls)
+
+        async with test_broker:
+            await test_broker.start()
+
+            r = [
+                await test_broker.publish(
+                    m,
+                    queue,
+                    headers=headers,
+                    reply_to=f"{queue}-reply",
+                    callback=True,
+                    callback_timeout=1,
+                )
+                for m, headers in (
+                    ({"id": 1}, {"x-tenant": "a"}),
+                    ({"id": 1}, {"x-tenant": "a"}),
+                    ({"id": 1}, {"x-tenant": "b"}),
+                    ({"fail": True}, None),
+                    ({"fail": True}, None),
+                )
+            ]
+
+        assert r == [1, 1, 2, None, None]
+        assert len(calls) == 4
+        assert (cache.hits, cache.misses) == (1, 4)
+
+    @pytest.mark.asyncio
+    async def test_result_cache_rpc_only(self, queue: str, test_broker: BrokerUsecase):
+        cache = ResultCache()
+        calls: List[dict] = []
+
+        @test_broker.handle(queue, cache=cache)
+        async def handler(m: dict):
+            calls.append(m)
+            return len(calls)
+
+        async with test_broker:
+            await test_broker.start()
+            await test_broker.publish({"id": 1}, queue)
+            await test_broker.publish({"id": 1}, queue)
+
+        assert len(calls) == 2
+        assert (cache.hits, cache.misses) == (0, 0)
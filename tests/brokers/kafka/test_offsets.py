@@ -0,0 +1,180 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from aiokafka.structs import ConsumerRecord, TopicPartition
+
+from propan.brokers._model.utils import ConcurrentDispatcher
+from propan.brokers.kafka import KafkaBroker
+from propan.brokers.kafka.kafka_broker import OffsetsTracker
+from propan.brokers.kafka.schemas import Handler
+
+
+def build_record(offset: int) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic="test",
+        partition=0,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=None,
+        value=b"",
+        checksum=None,
+        serialized_key_size=0,
+        serialized_value_size=0,
+        headers=(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_commit_only_processed_sequence():
+    tracker = OffsetsTracker()
+    tp = TopicPartition("test", 0)
+
+    events = [asyncio.Event() for _ in range(3)]
+    tasks = [asyncio.create_task(e.wait()) for e in events]
+    for i, t in enumerate(tasks):
+        tracker.track((build_record(i),), t)
+
+    events[1].set()
+    await tasks[1]
+    assert tracker.get_offsets() == {tp: 0}
+
+    events[0].set()
+    await tasks[0]
+    assert tracker.get_offsets() == {tp: 2}
+
+    events[2].set()
+    await tasks[2]
+    assert tracker.get_offsets() == {tp: 3}
+
+
+def build_batch_consumer(polls: int) -> Mock:
+    batch = {TopicPartition("test", 0): [build_record(0), build_record(1)]}
+
+    consumer = Mock()
+    consumer.getmany = AsyncMock(
+        side_effect=(*(batch,) * polls, asyncio.CancelledError())
+    )
+    consumer.commit = AsyncMock()
+    return consumer
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fails", (1, 5))
+@pytest.mark.parametrize("max_concurrency", (None, 1))
+async def test_failed_batch_retried(fails: int, max_concurrency):
+    broker = KafkaBroker()
+    calls = []
+
+    @broker.handle(
+        "test",
+        batch=True,
+        retry=2,
+        max_concurrency=max_concurrency,
+        enable_auto_commit=False,
+    )
+    async def handler(m: list):
+        calls.append(m)
+        if len(calls) <= fails:
+            raise ValueError()
+
+    (h,) = broker.handlers
+    h.consumer = consumer = build_batch_consumer(1)
+    if max_concurrency is not None:
+        h.offsets = OffsetsTracker(commit_interval=0)
+
+    with pytest.raises(asyncio.CancelledError):
+        await broker._consume_batch(h)
+    if h.dispatcher is not None:
+        await h.dispatcher.wait_closed()
+        await h.offsets.commit(consumer, force=True)
+
+    # retried up to `retry` times, the batch is committed as processed anyway
+    assert len(calls) == min(fails + 1, 3)
+    consumer.commit.assert_awaited()
+    consumer.seek.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_not_committed():
+    tracker = OffsetsTracker()
+
+    task = asyncio.create_task(asyncio.sleep(1))
+    tracker.track((build_record(0),), task)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert tracker.get_offsets() == {}
+
+
+def test_concurrency_manual_commit():
+    broker = KafkaBroker()
+
+    broker.handle("test", max_concurrency=2)(lambda: None)
+    (handler,) = broker.handlers
+    assert handler.consumer_kwargs["enable_auto_commit"] is False
+    assert broker._get_offsets_tracker(handler) is not None
+
+    with pytest.raises(ValueError):
+        broker.handle("test", max_concurrency=2, enable_auto_commit=True)(lambda: None)
+
+
+def test_unlimited_retry():
+    with pytest.raises(ValueError):
+        KafkaBroker().handle("test", retry=True)(lambda: None)
+
+
+@pytest.mark.asyncio
+async def test_commit_on_idle_topic():
+    tp = TopicPartition("test", 0)
+    polls = iter(({tp: [build_record(0)]}, {}))
+
+    async def getmany(**kwargs):
+        await asyncio.sleep(0.01)
+        try:
+            return next(polls)
+        except StopIteration:
+            raise asyncio.CancelledError() from None
+
+    consumer = Mock()
+    consumer.getmany = getmany
+    consumer.commit = AsyncMock()
+
+    callback = AsyncMock()
+    handler = Handler(
+        callback=callback,
+        topics=["test"],
+        consumer=consumer,
+    )
+    handler.dispatcher = ConcurrentDispatcher(callback, 2)
+    handler.offsets = OffsetsTracker(commit_interval=0)
+
+    with pytest.raises(asyncio.CancelledError):
+        await KafkaBroker()._consume(handler)
+
+    consumer.commit.assert_awaited_once_with({tp: 1})
+
+
+@pytest.mark.asyncio
+async def test_force_commit():
+    tracker = OffsetsTracker(commit_interval=60)
+    consumer = Mock(commit=AsyncMock())
+
+    for i in range(2):
+        task = asyncio.create_task(asyncio.sleep(0))
+        tracker.track((build_record(i),), task)
+        await task
+        await tracker.commit(consumer)
+
+    assert consumer.commit.await_count == 1
+
+    await tracker.commit(consumer, force=True)
+    consumer.commit.assert_awaited_with({TopicPartition("test", 0): 2})
+
+
+@pytest.mark.asyncio
+async def test_message_id():
+    message = await KafkaBroker._parse_message(build_record(1))
+    assert message.message_id == "test-0-1"
@@ -1,8 +1,24 @@
 import pytest
 
+from propan import KafkaBroker
 from tests.brokers.base.rpc import BrokerRPCTestcase
 
 
 @pytest.mark.kafka
 class TestKafkaRPC(BrokerRPCTestcase):
-    pass
+    @pytest.mark.asyncio
+    async def test_rpc_timeout_cleanup(self, queue: str, full_broker: KafkaBroker):
+        @full_broker.handle(queue)
+        async def m():  # pragma: no cover
+            return "1"
+
+        async with full_broker:
+            await full_broker.start()
+
+            assert (
+                await full_broker.publish(
+                    "", queue + "1", callback=True, callback_timeout=0.1
+                )
+                is None
+            )
+            assert full_broker.responses.pending == 0
@@ -1,8 +1,32 @@
 import pytest
+from nats.errors import NoRespondersError
 
+from propan import NatsBroker
 from tests.brokers.base.rpc import BrokerRPCTestcase
 
 
 @pytest.mark.nats
 class TestNatsRPC(BrokerRPCTestcase):
-    pass
+    @pytest.mark.asyncio
+    async def test_rpc_inbox_reused(self, queue: str, full_broker: NatsBroker):
+        @full_broker.handle(queue)
+        async def m():  # pragma: no cover
+            return "1"
+
+        async with full_broker:
+            await full_broker.start()
+
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            subscription = full_broker._reply_subscription
+
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            assert full_broker._reply_subscription is subscription
+            assert not full_broker._reply_futures
+
+    @pytest.mark.asyncio
+    async def test_rpc_no_responders(self, queue: str, full_broker: NatsBroker):
+        async with full_broker:
+            with pytest.raises(NoRespondersError):
+                await full_broker.publish("", queue, callback=True)
+
+            assert not full_broker._reply_futures
@@ -0,0 +1,162 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import pytest
+
+from propan.brokers.exceptions import PublishError
+from propan.brokers.rabbit.channel_pool import ChannelPool
+
+
+class FakeExchange:
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self.published: List[str] = []
+        self.confirm: Optional["asyncio.Future[None]"] = None
+        self.confirms: Dict[str, "asyncio.Future[None]"] = {}
+
+    async def publish(self, message: str, **kwargs):
+        self.published.append(message)
+        confirm = self.confirms.get(message, self.confirm)
+        if confirm is not None:
+            await confirm
+
+
+class FakeChannel:
+    def __init__(self, publisher_confirms: bool) -> None:
+        self.publisher_confirms = publisher_confirms
+        self.default_exchange = FakeExchange()
+        self.closed = False
+
+    async def get_exchange(self, name: str, ensure: bool = True) -> FakeExchange:
+        return FakeExchange(name)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeConnection:
+    async def channel(self, publisher_confirms: bool = True) -> FakeChannel:
+        return FakeChannel(publisher_confirms)
+
+
+@pytest.mark.asyncio
+async def test_round_robin():
+    pool = ChannelPool(size=2)
+    await pool.open(FakeConnection())
+
+    for m in "abc":
+        await pool.publish(None, m)
+
+    first, second = (c.channel.default_exchange.published for c in pool.channels)
+    assert (first, second) == (["a", "c"], ["b"])
+
+    await pool.close()
+    assert not pool.channels
+
+
+@pytest.mark.asyncio
+async def test_least_busy():
+    pool = ChannelPool(size=2, strategy="least_busy")
+    await pool.open(FakeConnection())
+
+    busy = pool.channels[0]
+    busy.channel.default_exchange.confirm = asyncio.get_event_loop().create_future()
+    task = asyncio.create_task(pool.publish(None, "a"))
+    await asyncio.sleep(0)
+
+    await pool.publish(None, "b")
+    await pool.publish(None, "c")
+    assert pool.channels[1].channel.default_exchange.published == ["b", "c"]
+
+    busy.channel.default_exchange.confirm.set_result(None)
+    await task
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_confirms_off():
+    pool = ChannelPool(confirms="off")
+    await pool.open(FakeConnection())
+    assert pool.channels[0].channel.publisher_confirms is False
+
+
+@pytest.mark.asyncio
+async def test_exchange_reused():
+    pool = ChannelPool()
+    await pool.open(FakeConnection())
+
+    channel = pool.channels[0]
+    assert await channel.get_exchange("test") is await channel.get_exchange("test")
+
+
+@pytest.mark.asyncio
+async def test_batch_confirms():
+    pool = ChannelPool(confirms="batch", max_unconfirmed=2)
+    await pool.open(FakeConnection())
+    exchange = pool.channels[0].channel.default_exchange
+    exchange.confirm = asyncio.get_event_loop().create_future()
+
+    assert await pool.publish(None, "a") is None
+    await pool.publish(None, "b")
+    assert pool.channels[0].in_flight == 2
+
+    third = asyncio.create_task(pool.publish(None, "c"))
+    await asyncio.sleep(0)
+    assert not third.done()
+
+    exchange.confirm.set_result(None)
+    await third
+    await pool.wait_confirms()
+    assert pool.channels[0].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_confirms_free_slot():
+    pool = ChannelPool(confirms="batch", max_unconfirmed=2)
+    await pool.open(FakeConnection())
+    exchange = pool.channels[0].channel.default_exchange
+    loop = asyncio.get_event_loop()
+    exchange.confirms = {m: loop.create_future() for m in "abc"}
+
+    await pool.publish(None, "a")
+    await pool.publish(None, "b")
+
+    third = asyncio.create_task(pool.publish(None, "c"))
+    await asyncio.sleep(0)
+    assert not third.done()
+
+    exchange.confirms["b"].set_result(None)
+    await asyncio.wait_for(third, timeout=1)
+    assert pool.channels[0].in_flight == 2
+
+    for f in exchange.confirms.values():
+        if not f.done():
+            f.set_result(None)
+    await pool.wait_confirms()
+
+
+@pytest.mark.asyncio
+async def test_batch_confirms_error():
+    pool = ChannelPool(confirms="batch")
+    await pool.open(FakeConnection())
+    exchange = pool.channels[0].channel.default_exchange
+    exchange.confirm = asyncio.get_event_loop().create_future()
+    exchange.confirm.set_exception(ValueError())
+
+    await pool.publish(None, "a")
+
+    with pytest.raises(PublishError):
+        await pool.wait_confirms()
+
+    await pool.wait_confirms()
+
+
+def test_wrong_params():
+    with pytest.raises(ValueError):
+        ChannelPool(size=0)
+
+    with pytest.raises(ValueError):
+        ChannelPool(confirms="maybe")
+
+    with pytest.raises(ValueError):
+        ChannelPool().get()
@@ -4,6 +4,8 @@ from unittest.mock import Mock
 import pytest
 from aio_pika import Message
 
+from propan.annotations import RabbitMessage
+from propan.brokers.push_back_watcher import RETRIES_HEADER, RetryPolicy
 from propan.brokers.rabbit import RabbitBroker, RabbitExchange, RabbitQueue
 from tests.brokers.base.consume import BrokerConsumeTestcase
 
@@ -56,3 +58,28 @@ class TestRabbitConsume(BrokerConsumeTestcase):
             await wait_for(consume.wait(), 3)
 
         mock.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_consume_delayed_retry(
+        self,
+        queue: str,
+        full_broker: RabbitBroker,
+    ):
+        consume = Event()
+        tries = []
+
+        async def handler(m, message: RabbitMessage):
+            tries.append(message.headers.get(RETRIES_HEADER))
+            if len(tries) < 3:
+                raise ValueError()
+            consume.set()
+
+        async with full_broker:
+            full_broker.handle(
+                queue, retry=RetryPolicy(3, backoff="constant", base=0.1)
+            )(handler)
+            await full_broker.start()
+            await full_broker.publish("hello", queue=queue)
+            await wait_for(consume.wait(), 5)
+
+        assert tries == [None, 1, 2]
@@ -0,0 +1,49 @@
+import pytest
+
+from propan.brokers.rabbit import RabbitBroker, RabbitExchange, RabbitQueue
+from propan.brokers.rabbit.rabbit_broker import _get_declaration_key
+
+
+def test_declaration_key():
+    exchange = RabbitExchange("test", bind_to=RabbitExchange("parent"))
+
+    assert _get_declaration_key(exchange) == _get_declaration_key(
+        RabbitExchange("test", bind_to=RabbitExchange("parent"))
+    )
+    assert _get_declaration_key(exchange) != _get_declaration_key(
+        RabbitExchange("test", bind_to=RabbitExchange("parent", durable=True))
+    )
+    assert _get_declaration_key(RabbitQueue("test")) != _get_declaration_key(
+        RabbitQueue("test", routing_key="key")
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.rabbit
+async def test_exchange_declared_once(queue: str, full_broker: RabbitBroker):
+    exchange = RabbitExchange(queue, bind_to=RabbitExchange(queue + "1"))
+
+    async with full_broker:
+        await full_broker.publish("", queue, exchange)
+        declared = full_broker._exchanges.copy()
+        await full_broker.publish(
+            "", queue, RabbitExchange(queue, bind_to=RabbitExchange(queue + "1"))
+        )
+
+        assert full_broker._exchanges == declared
+        assert len(declared) == 1
+
+        full_broker._reset_declarations()
+        assert not full_broker._exchanges
+
+
+@pytest.mark.asyncio
+@pytest.mark.rabbit
+async def test_declare_disabled(queue: str, settings):
+    broker = RabbitBroker(settings.url, declare=False)
+
+    async with broker:
+        exchange = await broker._init_exchange(RabbitExchange(queue))
+        assert exchange.name == queue
+
+    await broker.close()
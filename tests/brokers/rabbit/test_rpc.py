@@ -1,8 +1,31 @@
 import pytest
 
+from propan import RabbitBroker
 from tests.brokers.base.rpc import BrokerRPCTestcase
 
 
 @pytest.mark.rabbit
 class TestRabbitRPC(BrokerRPCTestcase):
-    pass
+    @pytest.mark.asyncio
+    async def test_rpc_reply_queue_reused(self, queue: str, full_broker: RabbitBroker):
+        @full_broker.handle(queue)
+        async def m():  # pragma: no cover
+            return "1"
+
+        async with full_broker:
+            await full_broker.start()
+
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            reply_queue = full_broker._reply_queue
+            assert reply_queue.name.startswith("propan.reply.")
+
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            assert full_broker._reply_queue is reply_queue
+
+            assert (
+                await full_broker.publish(
+                    "", queue + "1", callback=True, callback_timeout=0
+                )
+                is None
+            )
+            assert not full_broker._reply_futures
@@ -1,8 +1,13 @@
 import asyncio
+from typing import List
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from pydantic import ValidationError, create_model
 
+from propan.brokers._model.schemas import PropanMessage
+from propan.brokers.dedup import Dedup
+from propan.brokers.metrics import Metrics
 from propan.brokers.rabbit import RabbitBroker, RabbitQueue
 from propan.test.rabbit import build_message
 
@@ -86,3 +91,63 @@ async def test_handler_calling(queue: RabbitQueue, test_broker: RabbitBroker):
 
         with pytest.raises(ValidationError):
             await handler(wrong_msg, reraise_exc=True)
+
+
+@pytest.mark.asyncio
+async def test_batch_handler_calling(queue: RabbitQueue, test_broker: RabbitBroker):
+    @test_broker.handle(queue, batch=True)
+    async def handler(m: List[dict]):
+        return m
+
+    raw_msg = {"msg": "hello!"}
+    message = build_message(raw_msg, queue)
+
+    wrong_msg = build_message("Hi!", queue)
+
+    async with test_broker:
+        await test_broker.start()
+        assert [raw_msg, raw_msg] == await handler([message, message])
+
+        with pytest.raises(ValidationError):
+            await handler([message, wrong_msg], reraise_exc=True)
+
+
+@pytest.mark.asyncio
+async def test_dedup_rpc_replied(queue: RabbitQueue, test_broker: RabbitBroker):
+    test_broker._send_reply = AsyncMock()
+    dedup = Dedup()
+
+    @test_broker.handle(queue, dedup=dedup)
+    async def handler(m):
+        return m
+
+    message = build_message("hello", queue)
+    object.__setattr__(message, "reply_to", "reply")  # the message is locked
+
+    async with test_broker:
+        await test_broker.start()
+        await handler(message)
+        await handler(message)
+
+    assert test_broker._send_reply.await_count == 2
+    assert dedup.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_reply_metrics(queue: RabbitQueue, test_broker: RabbitBroker):
+    test_broker.metrics = metrics = Metrics()
+    test_broker._instrument_publish()
+
+    async with test_broker:
+        await test_broker.start()
+        for i in range(10):
+            await test_broker._reply(
+                PropanMessage(
+                    b"", Mock(correlation_id=str(i)), reply_to=f"propan.reply.{i}"
+                ),
+                "ok",
+            )
+
+    (p,) = metrics.publishers.values()
+    assert p.published == 10
+    assert dict(p.labels)["queue"] == "reply"
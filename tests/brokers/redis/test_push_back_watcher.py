@@ -0,0 +1,21 @@
+import pytest
+
+from propan.brokers.redis import RedisBroker, RedisWatcherStore
+
+
+@pytest.mark.asyncio
+@pytest.mark.redis
+async def test_redis_store(broker: RedisBroker):
+    store = RedisWatcherStore(broker, prefix="propan:test:")
+
+    assert await store.incr("1") == 1
+    assert await store.incr("1") == 2
+    assert await RedisWatcherStore(broker, prefix="propan:test:").get("1") == 2
+
+    await store.delete("1")
+    assert await store.get("1") == 0
+
+
+def test_redis_store_validation(broker: RedisBroker):
+    with pytest.raises(ValueError):
+        RedisWatcherStore(broker, ttl=0)
@@ -1,8 +1,29 @@
 import pytest
 
+from propan import RedisBroker
 from tests.brokers.base.rpc import BrokerRPCTestcase
 
 
 @pytest.mark.redis
 class TestRedisRPC(BrokerRPCTestcase):
-    pass
+    @pytest.mark.asyncio
+    async def test_rpc_subscription_reused(self, queue: str, full_broker: RedisBroker):
+        @full_broker.handle(queue)
+        async def m():  # pragma: no cover
+            return "1"
+
+        async with full_broker:
+            await full_broker.start()
+            subscription = full_broker._reply_subscription
+
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            assert await full_broker.publish("", queue, callback=True) == "1"
+            assert full_broker._reply_subscription is subscription
+
+            assert (
+                await full_broker.publish(
+                    "", queue + "1", callback=True, callback_timeout=0
+                )
+                is None
+            )
+            assert not full_broker._reply_futures
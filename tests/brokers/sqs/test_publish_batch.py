@@ -0,0 +1,38 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from propan import SQSBroker
+from propan.brokers.exceptions import PublishError
+from propan.brokers.sqs.sqs_broker import chunk_batch_entries
+
+
+def build_entry(body: str):
+    return {"MessageBody": body, "MessageAttributes": {}}
+
+
+def test_chunk_by_entries_number():
+    chunks = chunk_batch_entries([build_entry("hi")] * 25)
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+
+def test_chunk_by_size():
+    chunks = chunk_batch_entries([build_entry("a" * 100 * 1024)] * 5)
+    assert [len(c) for c in chunks] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_partial_failure():
+    broker = SQSBroker()
+    broker._queues["test"] = "url"
+    broker._connection = AsyncMock()
+    broker._connection.send_message_batch.return_value = {
+        "Successful": [{"Id": "0", "MessageId": "1"}],
+        "Failed": [{"Id": "1", "Code": "InternalError", "Message": ""}],
+    }
+
+    results = await broker.publish_batch(["hello", "world"], "test")
+
+    assert results[0].ok
+    assert results[0].result == "1"
+    assert isinstance(results[1].error, PublishError)
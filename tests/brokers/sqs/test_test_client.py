@@ -1,6 +1,51 @@
+import pytest
+
+from propan import SQSBroker
+from propan.brokers.push_back_watcher import RetryPolicy
 from propan.test.sqs import build_message
 from tests.brokers.base.testclient import BrokerTestclientTestcase
 
 
 class TestSQSTestclient(BrokerTestclientTestcase):
     build_message = staticmethod(build_message)
+
+
+@pytest.mark.asyncio
+async def test_delayed_retry(test_broker: SQSBroker):
+    @test_broker.handle("test", retry=RetryPolicy(2, backoff="linear", base=10))
+    async def handler(m):
+        raise ValueError()
+
+    message = build_message("hello")
+    await handler(message)
+    test_broker.change_message_visibility.assert_awaited_once_with(message, 10)
+
+    message["Attributes"] = {"ApproximateReceiveCount": "2"}
+    await handler(message)
+    test_broker.change_message_visibility.assert_awaited_with(message, 20)
+    assert not test_broker.delete_message.called
+
+    message["Attributes"] = {"ApproximateReceiveCount": "3"}
+    await handler(message)
+    test_broker.delete_message.assert_awaited_once()
+
+    assert "ApproximateReceiveCount" in (
+        test_broker.handlers[0].consumer_params["AttributeNames"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_delayed_retry_batch(test_broker: SQSBroker):
+    @test_broker.handle("test", batch=True, retry=RetryPolicy(base=5))
+    async def handler(m):
+        raise ValueError()
+
+    messages = [build_message("hello"), build_message("world")]
+    await handler(messages)
+    test_broker.change_message_visibility_batch.assert_awaited_once()
+
+    (delayed,) = test_broker.change_message_visibility_batch.await_args.args
+    assert sorted(m["MessageId"] for m, _ in delayed) == sorted(
+        m["MessageId"] for m in messages
+    )
+    assert all(delay == 5 for _, delay in delayed)
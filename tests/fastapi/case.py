@@ -40,3 +40,12 @@ class FastAPITestcase:
                 "2", name2, callback=True, callback_timeout=0.5
             )
             assert r == "2"
+
+    def test_event_registration(self):
+        router = self.router_class()
+
+        @router.event(str(uuid4()))
+        async def hello(b: int):
+            return b
+
+        assert len(router.routes) == 1
@@ -53,3 +53,18 @@ class SomeModel:
 
     def __init__(self, field):
         self.field = field
+
+
+@pytest.mark.asyncio
+async def test_alias_resolves_changed_context(context: ContextRepo):
+    @apply_types
+    async def func(m=Context("model.field", default=None)):
+        return m
+
+    assert await func() is None
+
+    context.set_global("model", SomeModel(field=1))
+    assert await func() == 1
+
+    with context.scope("model", SomeModel(field=2)):
+        assert await func() == 2
@@ -133,3 +133,24 @@ def test_scope(context: ContextRepo):
 
     assert context.get("key") is None
     assert context.get("key2") is None
+
+
+def test_local_context_first(context: ContextRepo):
+    context.set_global("key", 1)
+
+    with context.scope("key", 2):
+        assert context.get("key") == 2
+
+    assert context.get("key") == 1
+    assert context.get("context") is context
+
+
+@pytest.mark.asyncio
+async def test_context_falsy_value(context: ContextRepo):
+    context.set_global("key", 0)
+
+    @apply_types
+    async def use(key=Context(), key2=Context("key", default=1)):
+        return key, key2
+
+    assert await use() == (0, 0)
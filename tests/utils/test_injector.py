@@ -0,0 +1,163 @@
+import threading
+from typing import Any, Dict
+
+import pytest
+from fast_depends.library import CustomField
+from fast_depends.provider import dependency_provider
+from pydantic import BaseModel, ValidationError
+
+from propan.utils import Context, ContextRepo, Depends
+from propan.utils.injector import compile_apply_types
+
+
+class Model(BaseModel):
+    a: int
+
+
+@pytest.mark.asyncio
+async def test_cast():
+    @compile_apply_types
+    async def func(a: int, b: Model, c: str = "default") -> str:
+        return f"{a}{b.a}{c}"
+
+    assert await func("1", {"a": "2"}) == "12default"
+    assert await func(1, b=Model(a=2), c=3) == "123"
+
+    with pytest.raises(ValidationError):
+        await func("a", {"a": 1})
+
+    with pytest.raises(ValidationError):
+        await func(1)
+
+
+@pytest.mark.asyncio
+async def test_mutable_default():
+    @compile_apply_types
+    async def func(a: dict = {}):  # noqa: B006
+        a["key"] = 1
+        return a
+
+    assert await func() == {"key": 1}
+    assert await func() == {"key": 1}
+    assert func.__wrapped__.__defaults__ == ({},)
+
+
+@pytest.mark.asyncio
+async def test_return_cast():
+    @compile_apply_types
+    async def func(a) -> int:
+        return a
+
+    assert await func("1") == 1
+
+    with pytest.raises(ValidationError):
+        await func("a")
+
+
+@pytest.mark.asyncio
+async def test_skip_raw_validation():
+    async def func(a: bytes, b: Dict[str, int], c: Any):
+        return a, b, c
+
+    validated = compile_apply_types(func)
+    assert await validated("a", {"k": "1"}, 1) == (b"a", {"k": 1}, 1)
+
+    raw = compile_apply_types(func, skip_raw_validation=True)
+    assert await raw("a", {"k": "1"}, 1) == ("a", {"k": 1}, 1)
+
+
+@pytest.mark.asyncio
+async def test_context(context: ContextRepo):
+    context.set_global("key", 1)
+
+    @compile_apply_types
+    async def func(a: int, key=Context(), k: int = Context("key", cast=True)):
+        return a, key, k
+
+    assert await func("1") == (1, 1, 1)
+
+
+class Thread(CustomField):
+    def use(self, **kwargs):
+        kwargs = super().use(**kwargs)
+        kwargs[self.param_name] = threading.get_ident()
+        return kwargs
+
+
+class AsyncThread(CustomField):
+    async def use(self, **kwargs):
+        kwargs = super().use(**kwargs)
+        kwargs[self.param_name] = threading.get_ident()
+        return kwargs
+
+
+@pytest.mark.asyncio
+async def test_custom_fields(context: ContextRepo):
+    context.set_global("key", 1)
+
+    @compile_apply_types
+    async def func(sync=Thread(), async_=AsyncThread(), key=Context()):  # noqa: B008
+        return sync, async_, key
+
+    sync, async_, key = await func()
+    # sync custom fields may block, so they are run in a threadpool
+    assert sync != threading.get_ident()
+    assert async_ == threading.get_ident()
+    assert key == 1
+
+
+@pytest.mark.asyncio
+async def test_depends():
+    calls = []
+
+    def sync_dep(a: int) -> int:
+        calls.append("sync")
+        return a + 1
+
+    async def async_dep(b=Depends(sync_dep)) -> int:
+        calls.append("async")
+        return b + 1
+
+    @compile_apply_types
+    async def func(a: int, b=Depends(sync_dep), c=Depends(async_dep)):
+        return a, b, c
+
+    assert await func("1") == (1, 2, 3)
+    # the cached `sync_dep` result is reused
+    assert calls == ["sync", "async"]
+
+
+@pytest.mark.asyncio
+async def test_generator_depends():
+    events = []
+
+    async def dep():
+        events.append("enter")
+        yield 1
+        events.append("exit")
+
+    @compile_apply_types
+    async def func(a=Depends(dep)):
+        events.append("call")
+        return a
+
+    assert await func() == 1
+    assert events == ["enter", "call", "exit"]
+
+
+@pytest.mark.asyncio
+async def test_dependency_overrides():
+    def dep():
+        return 1
+
+    @compile_apply_types
+    async def func(a=Depends(dep)):
+        return a
+
+    dependency_provider.override(dep, lambda: 2)
+    try:
+        assert await func() == 2
+    finally:
+        dependency_provider.clear()
+
+    assert await func() == 1